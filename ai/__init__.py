@@ -2,7 +2,14 @@
 Модуль `ai` предоставляет утилиты для оценки соответствия кандидата вакансии с помощью AI.
 """
 
-from .main import AIEvaluator
+from .main import AIEvaluator, PROMPT_TEMPLATE
+from .engine import EvaluationEngine, BATCH_PROMPT_TEMPLATE, candidate_experience
+from .cache import MatchCache, prompt_version
+
+# Версия меняется вместе с шаблонами промптов, что инвалидирует кэш оценок
+PROMPT_VERSION = prompt_version(PROMPT_TEMPLATE, BATCH_PROMPT_TEMPLATE)
 
 # Создаём экземпляр класса, чтобы его можно было использовать напрямую из `ai`
-ai_evaluator = AIEvaluator()
\ No newline at end of file
+match_cache = MatchCache(PROMPT_VERSION)
+ai_evaluator = AIEvaluator(cache=match_cache)
+evaluation_engine = EvaluationEngine(ai_evaluator)
@@ -0,0 +1,253 @@
+"""
+Модуль кэширования AI-оценок соответствия кандидата вакансии.
+
+Содержит класс MatchCache: оценка адресуется хэшем от модели, нормализованного
+описания вакансии и опыта кандидата и хранится в Redis с резервной копией в БД.
+Версия промпта входит в ключ, поэтому после изменения шаблона старые оценки
+не используются и удаляются при первом обращении к кэшу.
+"""
+
+import hashlib
+import re
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from config import conf
+from database.repository import AIMatchRepository
+from database.session import SessionLocal
+from redis_manager import redis_manager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def prompt_version(*templates: str) -> str:
+    """Возвращает короткий хэш шаблонов промпта — версию, входящую в ключи кэша."""
+    return hashlib.sha256("\x1f".join(templates).encode("utf-8")).hexdigest()[:12]
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Схлопывает пробелы и переводы строк, чтобы форматирование не влияло на ключ."""
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+class MatchCache:
+    """
+    Кэш AI-оценок соответствия.
+
+    Attributes:
+        version (str): Версия промпта.
+        model (str): Модель, которой получены оценки.
+        redis: Клиент Redis для версии промпта и счётчиков.
+        store (RedisManager): Хранилище оценок; значения сериализуются кодеком RedisManager.
+        ttl_seconds (int): Время жизни оценки в Redis.
+    """
+
+    KEY_PREFIX = "ai_match:"
+    VERSION_KEY = "ai_match_meta:version"
+    STATS_KEY = "ai_match_meta:stats"
+
+    def __init__(
+        self,
+        version: str,
+        model: Optional[str] = None,
+        redis_client=None,
+        session_factory=SessionLocal,
+        ttl_seconds: Optional[int] = None,
+        store=None,
+    ):
+        self.version = version
+        self.model = model or conf.DEEPSEEK_MODEL
+        self.redis = redis_client if redis_client is not None else redis_manager.client
+        self.store = store if store is not None else redis_manager
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds or conf.AI_CACHE_TTL
+        self._version_checked = False
+        self._lock = threading.Lock()
+
+    def make_key(self, candidate_exp: str, vacancy_description: str) -> str:
+        """Возвращает ключ Redis для пары (вакансия, кандидат)."""
+        digest = hashlib.sha256("\x1f".join([
+            self.model,
+            normalize_text(vacancy_description).lower(),
+            normalize_text(candidate_exp),
+        ]).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}{self.version}:{digest}"
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return key.rsplit(":", 1)[-1]
+
+    def _count(self, hits: int, misses: int) -> None:
+        try:
+            pipe = self.redis.pipeline()
+            if hits:
+                pipe.hincrby(self.STATS_KEY, "hits", hits)
+            if misses:
+                pipe.hincrby(self.STATS_KEY, "misses", misses)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[AI cache] Не удалось обновить счётчики: {e}")
+
+    def ensure_version(self) -> None:
+        """
+        Один раз за процесс сверяет версию промпта с сохранённой в Redis
+        и при расхождении удаляет оценки старых версий.
+        """
+        if self._version_checked:
+            return
+        with self._lock:
+            if self._version_checked:
+                return
+            try:
+                stored = self.redis.get(self.VERSION_KEY)
+            except Exception as e:
+                logger.warning(f"[AI cache] Не удалось прочитать версию промпта: {e}")
+                return
+            if stored != self.version:
+                logger.info(f"[AI cache] Версия промпта изменилась ({stored} -> {self.version}), очищаем кэш")
+                self.purge_stale()
+                self.redis.set(self.VERSION_KEY, self.version)
+            self._version_checked = True
+
+    def purge_stale(self) -> int:
+        """
+        Удаляет из Redis и БД оценки, полученные с другой версией промпта.
+
+        Returns:
+            int: Количество удалённых ключей Redis.
+        """
+        current_prefix = f"{self.KEY_PREFIX}{self.version}:"
+        deleted = 0
+        try:
+            stale = [key for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*", count=500)
+                     if not key.startswith(current_prefix)]
+            for i in range(0, len(stale), 500):
+                deleted += self.redis.delete(*stale[i:i + 500])
+        except Exception as e:
+            logger.warning(f"[AI cache] Не удалось очистить Redis: {e}")
+
+        db = self.session_factory()
+        try:
+            AIMatchRepository(db).delete_other_versions(self.version)
+        except Exception as e:
+            logger.warning(f"[AI cache] Не удалось очистить оценки в БД: {e}")
+        finally:
+            db.close()
+        return deleted
+
+    def get_many(self, pairs: Sequence[Tuple[str, str]]) -> Dict[int, Tuple[float, str]]:
+        """
+        Возвращает сохранённые оценки: сначала из Redis (одним MGET), затем из БД.
+        Найденные только в БД оценки возвращаются в Redis.
+
+        Args:
+            pairs (Sequence[tuple[str, str]]): Пары (опыт кандидата, описание вакансии).
+
+        Returns:
+            dict[int, tuple[float, str]]: Оценки по индексу пары.
+        """
+        if not pairs:
+            return {}
+        self.ensure_version()
+        keys = [self.make_key(candidate_exp, vacancy) for candidate_exp, vacancy in pairs]
+        found: Dict[int, Tuple[float, str]] = {}
+
+        try:
+            values = self.store.get_many(keys)
+            for index, key in enumerate(keys):
+                data = values.get(key)
+                if isinstance(data, dict):
+                    found[index] = (data["percent"], data["explanation"])
+        except Exception as e:
+            logger.warning(f"[AI cache] Ошибка чтения из Redis: {e}")
+
+        missing = {self._digest(keys[i]): i for i in range(len(keys)) if i not in found}
+        if missing:
+            db = self.session_factory()
+            try:
+                restored = {}
+                for row in AIMatchRepository(db).get_many(missing.keys()):
+                    if row.prompt_version != self.version:
+                        continue
+                    index = missing[row.key]
+                    found[index] = (row.match_percent, row.explanation or "")
+                    restored[keys[index]] = found[index]
+                self._set_redis(restored)
+            except Exception as e:
+                logger.warning(f"[AI cache] Ошибка чтения из БД: {e}")
+            finally:
+                db.close()
+
+        self._count(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def get(self, candidate_exp: str, vacancy_description: str) -> Optional[Tuple[float, str]]:
+        return self.get_many([(candidate_exp, vacancy_description)]).get(0)
+
+    def _set_redis(self, results: Dict[str, Tuple[float, str]]) -> None:
+        if not results:
+            return
+        try:
+            self.store.set_many(
+                {
+                    key: {"percent": percent, "explanation": explanation}
+                    for key, (percent, explanation) in results.items()
+                },
+                ttl=self.ttl_seconds,
+            )
+        except Exception as e:
+            logger.warning(f"[AI cache] Ошибка записи в Redis: {e}")
+
+    def set_many(self, items: Iterable[Tuple[str, str, float, str]]) -> None:
+        """
+        Сохраняет оценки в Redis и БД.
+
+        Args:
+            items (Iterable[tuple]): Кортежи (опыт кандидата, описание вакансии, процент, объяснение).
+        """
+        results = {
+            self.make_key(candidate_exp, vacancy): (percent, explanation)
+            for candidate_exp, vacancy, percent, explanation in items
+        }
+        if not results:
+            return
+        self._set_redis(results)
+
+        db = self.session_factory()
+        try:
+            AIMatchRepository(db).upsert_many(
+                {
+                    "key": self._digest(key),
+                    "prompt_version": self.version,
+                    "model": self.model,
+                    "match_percent": percent,
+                    "explanation": explanation,
+                }
+                for key, (percent, explanation) in results.items()
+            )
+        except Exception as e:
+            logger.warning(f"[AI cache] Ошибка записи в БД: {e}")
+        finally:
+            db.close()
+
+    def set(self, candidate_exp: str, vacancy_description: str, percent: float, explanation: str) -> None:
+        self.set_many([(candidate_exp, vacancy_description, percent, explanation)])
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Возвращает счётчики обращений к кэшу.
+
+        Returns:
+            dict: hits, misses и hit_rate (доля попаданий от 0 до 1).
+        """
+        try:
+            raw = self.redis.hgetall(self.STATS_KEY) or {}
+        except Exception as e:
+            logger.warning(f"[AI cache] Не удалось прочитать счётчики: {e}")
+            raw = {}
+        hits, misses = int(raw.get("hits", 0)), int(raw.get("misses", 0))
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 3) if total else 0.0}
@@ -0,0 +1,269 @@
+"""
+Модуль параллельной AI-оценки кандидатов.
+
+Содержит класс EvaluationEngine, который оценивает список кандидатов через пул потоков,
+при необходимости объединяя нескольких кандидатов в один запрос к модели,
+и возвращает оценки по мере готовности.
+"""
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from ai.main import AIEvaluator, build_prompt, parse_match
+from config import conf
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NO_DATA_RESULT = (0.0, "Недостаточно данных для анализа.")
+REQUEST_ERROR_RESULT = (0.0, "Ошибка при оценке соответствия.")
+PARSE_ERROR_RESULT = (0.0, "Ошибка при обработке ответа от системы.")
+
+BATCH_PROMPT_TEMPLATE = """
+Проанализируй опыт работы нескольких кандидатов и оцени, насколько каждый из них соответствует следующей вакансии:
+
+ВАКАНСИЯ:
+{vacancy_description}
+
+{candidates}
+ИНСТРУКЦИЯ:
+- Сначала выдели ключевые требования из описания вакансии.
+- Затем для каждого кандидата оцени, насколько его опыт явно покрывает эти требования.
+- Не делай предположений: если навык/опыт не указан — считай, что его нет.
+- Используй шкалу:
+  ∙ 90–100 — кандидат полностью соответствует;
+  ∙ 70–89 — соответствует, но есть незначительные пробелы;
+  ∙ 50–69 — частичное соответствие;
+  ∙ менее 50 — слабое соответствие.
+- Для каждого кандидата верни ровно одну строку: номер кандидата, двоеточие, процент соответствия со знаком процента и краткое заключение (до 250 символов).
+- Не добавляй лишних слов или форматирования.
+
+Пример:
+1: 75% Кандидат имеет опыт приготовления блюд, но не указано знание выпечки в тандыре.
+2: 40% Опыт кандидата связан с продажами, кухонных навыков не указано.
+
+"""
+
+CANDIDATE_BLOCK_TEMPLATE = "КАНДИДАТ {number}:\n{candidate_exp}\n\n"
+
+_BATCH_LINE_RE = re.compile(r"^\s*(?:КАНДИДАТ\s*)?(\d+)\s*[:.)\-]\s*(\d+(?:[.,]\d+)?)\s*%\s*(.*)$", re.IGNORECASE)
+
+
+def candidate_experience(resume: Dict[str, Any]) -> str:
+    """Собирает описания мест работы резюме в текст для оценки соответствия."""
+    candidate_exp = ""
+    exp_data = resume.get("experience", [])
+    if isinstance(exp_data, str):
+        try:
+            exp_data = json.loads(exp_data)
+        except json.JSONDecodeError:
+            exp_data = []
+    if exp_data:
+        for exp in exp_data:
+            if isinstance(exp, dict):
+                desc = (exp.get("description") or "").strip()
+                if desc:
+                    candidate_exp += desc + "\n"
+    return candidate_exp or "Опыт работы не указан."
+
+
+def build_batch_prompt(candidates: Sequence[str], vacancy_description: str) -> str:
+    """Формирует промпт оценки нескольких кандидатов одним запросом."""
+    blocks = "".join(
+        CANDIDATE_BLOCK_TEMPLATE.format(number=number, candidate_exp=candidate_exp)
+        for number, candidate_exp in enumerate(candidates, start=1)
+    )
+    return BATCH_PROMPT_TEMPLATE.format(vacancy_description=vacancy_description, candidates=blocks)
+
+
+def parse_batch(content: str, count: int) -> Dict[int, Tuple[float, str]]:
+    """
+    Разбирает ответ на пакетный промпт вида "1: 75% Заключение".
+
+    Args:
+        content (str): Ответ модели.
+        count (int): Количество кандидатов в запросе.
+
+    Returns:
+        dict[int, tuple[float, str]]: Оценки по позиции кандидата в пакете (с нуля).
+            Кандидаты, для которых строка не найдена, в результат не попадают.
+    """
+    results = {}
+    for line in content.splitlines():
+        match = _BATCH_LINE_RE.match(line)
+        if not match:
+            continue
+        position = int(match.group(1)) - 1
+        if 0 <= position < count and position not in results:
+            percent = float(match.group(2).replace(",", "."))
+            results[position] = (round(percent, 1), match.group(3).strip()[:250])
+    return results
+
+
+class EvaluationEngine:
+    """
+    Параллельная оценка соответствия кандидатов вакансии.
+
+    Attributes:
+        evaluator (AIEvaluator): Клиент модели.
+        max_workers (int): Количество одновременных запросов к модели.
+        batch_size (int): Сколько кандидатов передавать в одном запросе.
+        timeout (float): Таймаут одного запроса в секундах.
+        max_retries (int): Количество повторов при сетевых ошибках, 429 и 5xx.
+        backoff (float): Базовая задержка перед повтором (удваивается с каждой попыткой).
+        cache (MatchCache | None): Кэш оценок; по умолчанию берётся у evaluator.
+    """
+
+    def __init__(
+        self,
+        evaluator: Optional[AIEvaluator] = None,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff: float = 1.0,
+        cache=None,
+    ):
+        self.evaluator = evaluator or AIEvaluator()
+        self.cache = cache if cache is not None else self.evaluator.cache
+        self.max_workers = max(1, max_workers or conf.AI_WORKERS)
+        self.batch_size = max(1, batch_size or conf.AI_BATCH_SIZE)
+        self.timeout = timeout or conf.AI_TIMEOUT
+        self.max_retries = conf.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+
+    def _complete_with_retry(self, prompt: str, max_tokens: int) -> str:
+        """Выполняет запрос к модели с экспоненциальной задержкой между повторами."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.evaluator.complete(prompt, max_tokens=max_tokens, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                response = getattr(e, "response", None)
+                status = response.status_code if response is not None else None
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                logger.warning(f"[AI] Ошибка запроса ({status or e}). Повтор через {delay:.1f} сек")
+                time.sleep(delay)
+        raise RuntimeError("Недостижимо")  # pragma: no cover
+
+    def _evaluate_single(self, candidate_exp: str, vacancy_description: str) -> Tuple[float, str]:
+        try:
+            content = self._complete_with_retry(build_prompt(candidate_exp, vacancy_description), max_tokens=100)
+            return parse_match(content)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[AI] Ошибка запроса к API: {e}")
+            return REQUEST_ERROR_RESULT
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"[AI] Ошибка разбора ответа от API: {e}")
+            return PARSE_ERROR_RESULT
+
+    def _evaluate_batch(
+        self,
+        batch: List[Tuple[int, str]],
+        vacancy_description: str,
+    ) -> List[Tuple[int, float, str]]:
+        """
+        Оценивает пакет кандидатов одним запросом.
+        Кандидаты, которых модель пропустила в ответе, оцениваются по одному.
+        """
+        if len(batch) == 1:
+            index, candidate_exp = batch[0]
+            return [(index, *self._evaluate_single(candidate_exp, vacancy_description))]
+
+        prompt = build_batch_prompt([candidate_exp for _, candidate_exp in batch], vacancy_description)
+        try:
+            content = self._complete_with_retry(prompt, max_tokens=120 * len(batch))
+            parsed = parse_batch(content, len(batch))
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[AI] Ошибка пакетного запроса к API: {e}")
+            return [(index, *REQUEST_ERROR_RESULT) for index, _ in batch]
+        except (KeyError, IndexError) as e:
+            logger.error(f"[AI] Ошибка разбора пакетного ответа: {e}")
+            parsed = {}
+
+        results = []
+        for position, (index, candidate_exp) in enumerate(batch):
+            if position in parsed:
+                results.append((index, *parsed[position]))
+            else:
+                logger.warning(f"[AI] В пакетном ответе нет оценки кандидата {position + 1}, оцениваем отдельно")
+                results.append((index, *self._evaluate_single(candidate_exp, vacancy_description)))
+        return results
+
+    def _store(
+        self,
+        candidates: Sequence[str],
+        vacancy_description: str,
+        results: List[Tuple[int, float, str]],
+    ) -> None:
+        """Сохраняет в кэш успешные оценки (ошибки запроса и разбора не кэшируются)."""
+        if self.cache is None:
+            return
+        errors = (REQUEST_ERROR_RESULT, PARSE_ERROR_RESULT)
+        self.cache.set_many(
+            (candidates[index], vacancy_description, percent, explanation)
+            for index, percent, explanation in results
+            if (percent, explanation) not in errors
+        )
+
+    def iter_evaluate(
+        self,
+        candidates: Sequence[str],
+        vacancy_description: str,
+    ) -> Iterator[Tuple[int, float, str]]:
+        """
+        Оценивает кандидатов параллельно и отдаёт результаты по мере готовности.
+
+        Args:
+            candidates (Sequence[str]): Тексты опыта работы кандидатов.
+            vacancy_description (str): Описание вакансии.
+
+        Yields:
+            tuple[int, float, str]: Индекс кандидата, процент соответствия и объяснение.
+        """
+        pending = []
+        for index, candidate_exp in enumerate(candidates):
+            if not candidate_exp or not vacancy_description:
+                yield (index, *NO_DATA_RESULT)
+            else:
+                pending.append((index, candidate_exp))
+
+        if pending and self.cache is not None:
+            cached = self.cache.get_many([(candidate_exp, vacancy_description) for _, candidate_exp in pending])
+            for position, (percent, explanation) in cached.items():
+                yield (pending[position][0], percent, explanation)
+            pending = [item for position, item in enumerate(pending) if position not in cached]
+
+        if not pending:
+            return
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches)), thread_name_prefix="ai-eval")
+        try:
+            futures = [executor.submit(self._evaluate_batch, batch, vacancy_description) for batch in batches]
+            for future in as_completed(futures):
+                batch_results = future.result()
+                self._store(candidates, vacancy_description, batch_results)
+                for result in batch_results:
+                    yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def evaluate_many(self, candidates: Sequence[str], vacancy_description: str) -> List[Tuple[float, str]]:
+        """
+        Оценивает кандидатов параллельно и возвращает результаты в исходном порядке.
+
+        Returns:
+            list[tuple[float, str]]: Процент соответствия и объяснение для каждого кандидата.
+        """
+        results: List[Tuple[float, str]] = [NO_DATA_RESULT] * len(candidates)
+        for index, percent, explanation in self.iter_evaluate(candidates, vacancy_description):
+            results[index] = (percent, explanation)
+        return results
@@ -4,46 +4,16 @@
 
 import requests
 from utils.logger import setup_logger
+from utils import http
 import time
-from typing import Tuple
+from typing import Optional, Tuple
 from config import conf
 
 # Настройка логгера
 logger = setup_logger(__name__)
 
 
-class AIEvaluator:
-    """
-    Класс для оценки соответствия кандидата вакансии на основе анализа опыта работы и описания вакансии.
-
-    Methods:
-        evaluate_candidate_match: возвращает оценку соответствия кандидата вакансии.
-    """
-
-    def evaluate_candidate_match(self, candidate_exp: str, vacancy_description: str) -> Tuple[float, str]:
-        """
-        Оценивает соответствие кандидата вакансии.
-
-        Args:
-            candidate_exp (str): опыт работы кандидата.
-            vacancy_description (str): описание вакансии.
-
-        Returns:
-            Tuple[float, str]: процент соответствия и объяснение.
-        """
-        start_time = time.time()
-
-        # Укорачиваем текст для логов, чтобы не перегружать вывод
-        exp_short = (candidate_exp[:200] + '...') if len(candidate_exp) > 200 else candidate_exp
-        desc_short = (vacancy_description[:200] + '...') if len(vacancy_description) > 200 else vacancy_description
-
-        logger.debug(f"[AI] Начинаем оценку:\nВАКАНСИЯ: {desc_short}\nОПЫТ: {exp_short}")
-
-        if not candidate_exp or not vacancy_description:
-            logger.warning("[AI] Недостаточно данных для анализа")
-            return 0.0, "Недостаточно данных для анализа."
-
-        prompt = f"""
+PROMPT_TEMPLATE = """
 Проанализируй опыт работы кандидата и оцени, насколько он соответствует следующей вакансии:
 
 ВАКАНСИЯ:
@@ -70,31 +40,110 @@ class AIEvaluator:
 
 """
 
-        url = "https://api.deepseek.com/chat/completions" 
+
+def build_prompt(candidate_exp: str, vacancy_description: str) -> str:
+    """Формирует промпт оценки одного кандидата."""
+    return PROMPT_TEMPLATE.format(vacancy_description=vacancy_description, candidate_exp=candidate_exp)
+
+
+def parse_match(content: str) -> Tuple[float, str]:
+    """
+    Разбирает ответ модели вида "75% Заключение".
+
+    Raises:
+        ValueError: Если ответ не начинается с числа.
+    """
+    parts = content.strip().split(maxsplit=1)
+    percent = float(parts[0].replace("%", "").strip())
+    explanation = parts[1] if len(parts) > 1 else ""
+    return round(percent, 1), explanation[:250]
+
+
+class AIEvaluator:
+    """
+    Класс для оценки соответствия кандидата вакансии на основе анализа опыта работы и описания вакансии.
+
+    Methods:
+        evaluate_candidate_match: возвращает оценку соответствия кандидата вакансии.
+        complete: выполняет один запрос к модели и возвращает текст ответа.
+
+    Attributes:
+        cache (MatchCache | None): Кэш оценок; если задан, повторная оценка той же пары не запрашивается у модели.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    def complete(self, prompt: str, max_tokens: int = 100, timeout: Optional[float] = None) -> str:
+        """
+        Выполняет запрос к DeepSeek Chat Completions API.
+
+        Args:
+            prompt (str): Текст запроса.
+            max_tokens (int): Максимальная длина ответа.
+            timeout (float | None): Таймаут запроса в секундах.
+
+        Returns:
+            str: Текст ответа модели.
+
+        Raises:
+            requests.RequestException: При сетевой ошибке или ошибочном статусе ответа.
+        """
         headers = {
             "Authorization": f"Bearer {conf.DEEPSEEK_API_KEY}",
             "Content-Type": "application/json"
         }
         payload = {
-            "model": "deepseek-chat",
+            "model": conf.DEEPSEEK_MODEL,
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0.3,
-            "max_tokens": 100
+            "max_tokens": max_tokens
         }
+        response = http.post(conf.DEEPSEEK_API_URL, headers=headers, json=payload, timeout=timeout or conf.AI_TIMEOUT)
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'].strip()
+
+    def evaluate_candidate_match(self, candidate_exp: str, vacancy_description: str) -> Tuple[float, str]:
+        """
+        Оценивает соответствие кандидата вакансии.
+
+        Args:
+            candidate_exp (str): опыт работы кандидата.
+            vacancy_description (str): описание вакансии.
+
+        Returns:
+            Tuple[float, str]: процент соответствия и объяснение.
+        """
+        start_time = time.time()
+
+        # Укорачиваем текст для логов, чтобы не перегружать вывод
+        exp_short = (candidate_exp[:200] + '...') if len(candidate_exp) > 200 else candidate_exp
+        desc_short = (vacancy_description[:200] + '...') if len(vacancy_description) > 200 else vacancy_description
+
+        logger.debug(f"[AI] Начинаем оценку:\nВАКАНСИЯ: {desc_short}\nОПЫТ: {exp_short}")
+
+        if not candidate_exp or not vacancy_description:
+            logger.warning("[AI] Недостаточно данных для анализа")
+            return 0.0, "Недостаточно данных для анализа."
+
+        if self.cache is not None:
+            cached = self.cache.get(candidate_exp, vacancy_description)
+            if cached is not None:
+                logger.debug(f"[AI] Оценка найдена в кэше: {cached[0]}%")
+                return cached
+
+        prompt = build_prompt(candidate_exp, vacancy_description)
 
         try:
             logger.debug("[AI] Отправляем запрос к DeepSeek API")
-            response = requests.post(url, headers=headers, json=payload, timeout=15)
-            response.raise_for_status()
-            content = response.json()['choices'][0]['message']['content'].strip()
+            content = self.complete(prompt, max_tokens=100, timeout=conf.AI_TIMEOUT)
             duration = time.time() - start_time
             logger.debug(f"[AI] Получен ответ за {duration:.2f} сек: {content}")
 
-            parts = content.split(maxsplit=1)
-            percent = float(parts[0].replace("%", "").strip())
-            explanation = parts[1] if len(parts) > 1 else ""
-
-            return round(percent, 1), explanation[:250]
+            percent, explanation = parse_match(content)
+            if self.cache is not None:
+                self.cache.set(candidate_exp, vacancy_description, percent, explanation)
+            return percent, explanation
 
         except requests.exceptions.RequestException as e:
             duration = time.time() - start_time
@@ -0,0 +1,156 @@
+"""
+Локальный stub-сервер, имитирующий DeepSeek Chat Completions API.
+
+Используется для офлайн-тестов и замеров EvaluationEngine без обращения к DeepSeek:
+
+    python -m ai.stub_server --port 8089 --delay 0.5
+
+После запуска укажите в .env:
+
+    DEEPSEEK_API_URL=http://127.0.0.1:8089/chat/completions
+
+Оценка считается детерминированно — по доле слов вакансии, встречающихся в опыте кандидата.
+Поддерживаются как одиночные, так и пакетные промпты (блоки "КАНДИДАТ N:").
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+_WORD_RE = re.compile(r"\w{3,}", re.UNICODE)
+_CANDIDATE_RE = re.compile(r"КАНДИДАТ (\d+):\n(.*?)(?=\nКАНДИДАТ \d+:|\nИНСТРУКЦИЯ:)", re.S)
+
+
+def score_candidate(vacancy_description: str, candidate_exp: str) -> int:
+    """Возвращает процент слов вакансии, найденных в опыте кандидата."""
+    vacancy_words = {w.lower() for w in _WORD_RE.findall(vacancy_description)}
+    if not vacancy_words:
+        return 0
+    candidate_words = {w.lower() for w in _WORD_RE.findall(candidate_exp)}
+    return round(100 * len(vacancy_words & candidate_words) / len(vacancy_words))
+
+
+def _between(text: str, start: str, end: str) -> str:
+    head, _, tail = text.partition(start)
+    return tail.partition(end)[0].strip() if tail else ""
+
+
+def answer_prompt(prompt: str) -> str:
+    """Формирует ответ модели на одиночный или пакетный промпт."""
+    candidates: List[Tuple[str, str]] = _CANDIDATE_RE.findall(prompt)
+    if candidates:
+        vacancy = _between(prompt, "ВАКАНСИЯ:", "КАНДИДАТ 1:")
+        lines = []
+        for number, candidate_exp in candidates:
+            percent = score_candidate(vacancy, candidate_exp)
+            lines.append(f"{number}: {percent}% Совпадение ключевых слов с вакансией: {percent}%.")
+        return "\n".join(lines)
+
+    vacancy = _between(prompt, "ВАКАНСИЯ:", "ОПЫТ КАНДИДАТА:")
+    candidate_exp = _between(prompt, "ОПЫТ КАНДИДАТА:", "ИНСТРУКЦИЯ:")
+    percent = score_candidate(vacancy, candidate_exp)
+    return f"{percent}% Совпадение ключевых слов с вакансией: {percent}%."
+
+
+class StubLLMServer:
+    """
+    HTTP-сервер в фоновом потоке, отвечающий в формате DeepSeek Chat Completions.
+
+    Attributes:
+        delay (float): Искусственная задержка ответа в секундах.
+        fail_first (int): Сколько первых запросов завершить ответом 503.
+        requests_count (int): Количество обработанных запросов.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, fail_first: int = 0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/chat/completions"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело пишутся отдельно — без этого keep-alive упирается в delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                with stub._lock:
+                    stub.requests_count += 1
+                    request_number = stub.requests_count
+
+                if stub.delay:
+                    time.sleep(stub.delay)
+
+                if request_number <= stub.fail_first:
+                    self._send_json(503, {"error": {"message": "Service temporarily unavailable"}})
+                    return
+
+                messages = payload.get("messages") or [{}]
+                content = answer_prompt(messages[-1].get("content", ""))
+                self._send_json(200, {
+                    "id": f"stub-{request_number}",
+                    "object": "chat.completion",
+                    "model": payload.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                })
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub-сервер DeepSeek Chat Completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0.5, help="Задержка ответа в секундах")
+    args = parser.parse_args()
+
+    server = StubLLMServer(host=args.host, port=args.port, delay=args.delay)
+    print(f"Stub LLM server: {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -4,6 +4,8 @@ import time
 import logging
 from pprint import pprint
 from utils.logger import setup_logger
+from utils import http
+from utils.rate_limit import build_rate_limiter, parse_retry_after
 from config import conf
 
 # Создаем базовый логгер
@@ -20,6 +22,9 @@ class AvitoAPIClient:
         self.access_token = None
         self.token_expiry = 0
 
+        # Общий для всех процессов бюджет запросов к Avito API
+        self.rate_limiter = build_rate_limiter("avito", conf.AVITO_REQUESTS_PER_SECOND, conf.AVITO_BURST)
+
     def get_access_token(self):
         """Получение или обновление access token с кэшированием"""
         current_time = time.time()
@@ -31,7 +36,7 @@ class AvitoAPIClient:
             'client_id': self.client_id,
             'client_secret': self.client_secret,
         }
-        response = requests.post(self.token_url, data=data)
+        response = http.post(self.token_url, data=data)
 
         if response.status_code == 200:
             json_response = response.json()
@@ -43,6 +48,48 @@ class AvitoAPIClient:
             logger.error(f"Ошибка получения токена: {response.status_code}, {response.text}")
             raise Exception(f"Ошибка получения токена: {response.status_code}, {response.text}")
 
+    def _handle_rate_limited(self, response, default_delay: float) -> None:
+        """
+        Обрабатывает ответ 429: блокирует ограничитель на время из Retry-After
+        (или default_delay, если заголовка нет), чтобы все потоки и процессы подождали.
+        """
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        wait = retry_after if retry_after is not None else default_delay
+        logger.warning(f"Rate limit exceeded. Ждём {wait:.1f} сек")
+        self.rate_limiter.penalize(wait)
+
+    def _request_json(self, method: str, endpoint: str, params=None, json=None, retries: int = 3, delay: float = 5):
+        """
+        Выполняет одиночный запрос к Avito API через общий ограничитель и возвращает JSON ответа.
+        На 429 ограничитель блокируется по Retry-After для всех потоков и процессов,
+        после чего запрос повторяется (не более retries попыток).
+
+        Raises:
+            requests.HTTPError: При ошибочном статусе ответа или если 429 повторяется во всех попытках.
+            requests.RequestException: При сетевой ошибке во всех попытках.
+        """
+        url = f"{self.api_base_url}{endpoint}"
+        headers = {
+            'Authorization': f'Bearer {self.get_access_token()}',
+            'Content-Type': 'application/json'
+        }
+        for attempt in range(retries):
+            self.rate_limiter.acquire()
+            try:
+                response = http.request(method=method, url=url, headers=headers, params=params, json=json)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Network error: {e}")
+                if attempt == retries - 1:
+                    raise
+                time.sleep(delay * (attempt + 1))
+                continue
+            if response.status_code == 429:
+                self._handle_rate_limited(response, delay * (attempt + 1))
+                if attempt < retries - 1:
+                    continue
+            response.raise_for_status()
+            return response.json()
+
     def per_pager(self, total: int, per_page: int = 25):
         """
         Генератор для пагинации.
@@ -56,7 +103,8 @@ class AvitoAPIClient:
             yield page, per_page
 
     def make_api_request(self, endpoint, method='GET', params=None, data=None,
-                        retries=3, delay=5, total=None, per_page=25, expected_list_key: bool = True):
+                        retries=3, delay=5, total=None, per_page=25, expected_list_key: bool = True,
+                        on_page=None):
         """
         Выполнение запроса к API с поддержкой пагинации и агрегацией total результатов.
 
@@ -68,6 +116,7 @@ class AvitoAPIClient:
         :param delay: Задержка между повторными попытками
         :param total: Общее количество элементов, которые нужно собрать
         :param per_page: Кол-во элементов на странице (максимум 100)
+        :param on_page: Колбэк on_page(loaded, total), вызываемый после каждой загруженной страницы
         :return: dict с ключами 'found' и 'items'
         """
         url = f"{self.api_base_url}{endpoint}"
@@ -77,12 +126,11 @@ class AvitoAPIClient:
         }
 
         if total is None:
-            time.sleep(1.1)
             # Обычный однократный запрос, но всегда возвращаем dict
             for attempt in range(retries):
-                time.sleep(1.1)
+                self.rate_limiter.acquire()
                 try:
-                    response = requests.request(
+                    response = http.request(
                         method=method,
                         url=url,
                         headers=headers,
@@ -123,8 +171,7 @@ class AvitoAPIClient:
                         return result
 
                     elif response.status_code == 429:
-                        logger.warning("Rate limit exceeded. Waiting...")
-                        time.sleep(delay * (attempt + 1))
+                        self._handle_rate_limited(response, delay * (attempt + 1))
                     else:
                         logger.error(f"Ошибка API: {response.status_code}, {response.text}")
                         return {"found": 0, "items": []}
@@ -141,9 +188,9 @@ class AvitoAPIClient:
         page = 1
         per_page = min(per_page, 100)
         error_count = 0  # Счетчик ошибок подряд
+        last_page_reached = False
 
-        while len(aggregated_results) < total:
-            time.sleep(1.1)
+        while len(aggregated_results) < total and not last_page_reached:
             actual_params = params.copy() if params else {}
             actual_params.update({
                 'page': page,
@@ -152,9 +199,9 @@ class AvitoAPIClient:
 
             success = False
             for attempt in range(retries):
-                time.sleep(1.1)
+                self.rate_limiter.acquire()
                 try:
-                    response = requests.request(
+                    response = http.request(
                         method=method,
                         url=url,
                         headers=headers,
@@ -172,9 +219,13 @@ class AvitoAPIClient:
 
                         batch = json_data[key]
                         aggregated_results.extend(batch)
+                        if on_page:
+                            on_page(min(len(aggregated_results), total), total)
 
                         if len(batch) < per_page:
                             # Последняя страница
+                            last_page_reached = True
+                            success = True
                             break
 
                         page += 1
@@ -182,8 +233,7 @@ class AvitoAPIClient:
                         error_count = 0  # Сбросить счетчик ошибок
                         break
                     elif response.status_code == 429:
-                        logger.warning("Rate limit exceeded. Waiting...")
-                        time.sleep(delay * (attempt + 1))
+                        self._handle_rate_limited(response, delay * (attempt + 1))
                     else:
                         logger.error(f"Ошибка API: {response.status_code}, {response.text}")
                         break
@@ -218,7 +268,8 @@ class AvitoAPIClient:
         return result
 
     # --- Работа с резюме ---
-    def resumes(self, query="Программист", location=107620, total=1, per_page=25, experience=None, salary_min=None, schedule=None):
+    def resumes(self, query="Программист", location=107620, total=1, per_page=25, experience=None, salary_min=None, schedule=None,
+                on_page=None):
         """Поиск резюме по заданным параметрам"""
         endpoint = "/job/v1/resumes/"
         params = {'query': query, 'location': location}
@@ -229,7 +280,7 @@ class AvitoAPIClient:
         if schedule:
             params['schedule'] = schedule
 
-        return self.make_api_request(endpoint, params=params, total=total, per_page=per_page)
+        return self.make_api_request(endpoint, params=params, total=total, per_page=per_page, on_page=on_page)
     
     def resume(self, resume_id):
         """Получение данных резюме по resume_id"""
@@ -314,54 +365,33 @@ class AvitoAPIClient:
         """
         Получение списка вакансий через новый Avito API.
         """
-        endpoint = "/core/v1/items"
-        headers = {
-            'Authorization': f'Bearer {self.get_access_token()}'
-        }
-        url = f"{self.api_base_url}{endpoint}"
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Ошибка получения вакансий: {response.status_code}, {response.text}")
+        try:
+            return self._request_json('GET', "/core/v1/items")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Ошибка получения вакансий: {e}")
             return {"items": []}
 
     def get_application_ids(self, updated_at_from=None):
         """
         Получение всех ID откликов по вакансиям.
+
+        Raises:
+            requests.RequestException: Если ID откликов не удалось получить. Пустой список
+                вместо ошибки не возвращается, чтобы индекс откликов не терял отклики молча.
         """
-        endpoint = "/job/v1/applications/get_ids"
-        headers = {
-            'Authorization': f'Bearer {self.get_access_token()}'
-        }
         params = {}
         if updated_at_from:
             params['updatedAtFrom'] = updated_at_from
-        url = f"{self.api_base_url}{endpoint}"
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Ошибка получения ID откликов: {response.status_code}, {response.text}")
-            return {"applies": []}
+        return self._request_json('GET', "/job/v1/applications/get_ids", params=params)
 
     def get_applications_by_ids(self, app_ids):
         """
         Получение информации об откликах по их ID.
+
+        Raises:
+            requests.RequestException: Если детали откликов не удалось получить.
         """
-        endpoint = "/job/v1/applications/get_by_ids"
-        headers = {
-            'Authorization': f'Bearer {self.get_access_token()}',
-            'Content-Type': 'application/json'
-        }
-        url = f"{self.api_base_url}{endpoint}"
-        payload = {"ids": app_ids}
-        response = requests.post(url, headers=headers, json=payload)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Ошибка получения деталей откликов: {response.status_code}, {response.text}")
-            return {"applies": []}
+        return self._request_json('POST', "/job/v1/applications/get_by_ids", json={"ids": app_ids})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+"""
+Модуль кэширования ответов HeadHunter API.
+
+Содержит класс ResponseCache: время жизни ответа задаётся политикой эндпоинта
+(детали резюме хранятся долго, страницы поиска — недолго), значения хранятся
+в Redis через кодек RedisManager в сжатом виде, а устаревшие ответы
+с ETag/Last-Modified перепроверяются условным запросом вместо повторной
+загрузки. По каждому эндпоинту ведутся счётчики попаданий.
+"""
+
+import hashlib
+import re
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import conf
+from redis_manager import redis_manager
+from redis_manager.codec import CodecError
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ResponseCache:
+    """
+    Кэш ответов HH API с политиками по эндпоинтам.
+
+    Attributes:
+        redis: Клиент Redis для сжатых значений (без decode_responses).
+        stats_redis: Клиент Redis для счётчиков.
+        codec (RedisCodec): Кодек значений.
+        default_ttl (int): Время жизни ответов эндпоинтов без своей политики.
+        token_lookup (callable | None): Возвращает токен текущего запроса;
+            ответы эндпоинтов из TOKEN_SCOPED кэшируются отдельно для каждого токена.
+    """
+
+    KEY_PREFIX = "hh_api:"
+    STATS_KEY = "hh_api_meta:stats"
+
+    # (эндпоинт, шаблон пути, параметр конфигурации с TTL); проверяются по порядку
+    POLICIES = (
+        ("resume", re.compile(r"^/resumes/[^/]+$"), "HH_CACHE_TTL_RESUME"),
+        ("search", re.compile(r"^/resumes$"), "HH_CACHE_TTL_SEARCH"),
+        ("vacancies", re.compile(r"^/vacancies(/\d+)?$"), "HH_CACHE_TTL_VACANCIES"),
+        ("negotiations", re.compile(r"^/negotiations"), "HH_CACHE_TTL_NEGOTIATIONS"),
+        ("dictionaries", re.compile(r"^/(dictionaries|areas|industries|professional_roles|languages)"),
+         "HH_CACHE_TTL_DICTIONARIES"),
+    )
+    DEFAULT_ENDPOINT = "other"
+    # Ответы этих эндпоинтов зависят от токена (текущий менеджер и его лимиты)
+    TOKEN_SCOPED = re.compile(r"^/(me|employers/[^/]+/managers/[^/]+/limits)(/|$)")
+
+    def __init__(self, redis_client=None, stats_client=None, codec=None, default_ttl: int = 5,
+                 token_lookup: Optional[Callable[[], Optional[str]]] = None):
+        self.redis = redis_client if redis_client is not None else redis_manager.binary_client
+        self.stats_redis = stats_client if stats_client is not None else redis_manager.client
+        self.codec = codec or redis_manager.codec
+        self.default_ttl = default_ttl
+        self.token_lookup = token_lookup
+
+    def policy_for(self, url: str) -> Tuple[str, int]:
+        """
+        Возвращает имя эндпоинта и время жизни ответа для url.
+
+        Returns:
+            tuple[str, int]: (эндпоинт, TTL в секундах).
+        """
+        path = urlsplit(url).path.rstrip("/") or "/"
+        for endpoint, pattern, ttl_setting in self.POLICIES:
+            if pattern.search(path):
+                return endpoint, getattr(conf, ttl_setting)
+        return self.DEFAULT_ENDPOINT, self.default_ttl
+
+    def _token_fingerprint(self, url: str) -> str:
+        """Возвращает отпечаток токена для эндпоинтов, ответ которых зависит от токена."""
+        path = urlsplit(url).path.rstrip("/") or "/"
+        if not self.TOKEN_SCOPED.search(path):
+            return ""
+        token = self.token_lookup() if self.token_lookup else None
+        return hashlib.sha1((token or "").encode("utf-8")).hexdigest()[:16]
+
+    def make_key(self, url: str, params: Optional[dict]) -> str:
+        """Формирует ключ кэша на основе URL, параметров и, при необходимости, токена."""
+        endpoint, _ = self.policy_for(url)
+        sorted_params = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        fingerprint = self._token_fingerprint(url)
+        digest = hashlib.sha1(f"{url}?{sorted_params}#{fingerprint}".encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}{endpoint}:{digest}"
+
+    def _count(self, endpoint: str, event: str) -> None:
+        try:
+            self.stats_redis.hincrby(self.STATS_KEY, f"{endpoint}:{event}", 1)
+        except Exception as e:
+            logger.debug(f"Не удалось обновить счётчики кэша HH: {e}")
+
+    def lookup(self, url: str, params: Optional[dict]) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает сохранённую запись (в том числе устаревшую).
+
+        Returns:
+            dict | None: data, etag, last_modified, stored_at и признак fresh.
+        """
+        try:
+            entry = self.codec.decode(self.redis.get(self.make_key(url, params)))
+        except CodecError as e:
+            logger.warning(f"Повреждённая запись кэша HH: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"Ошибка чтения кэша HH: {e}")
+            return None
+        if not isinstance(entry, dict) or "data" not in entry:
+            return None
+        _, ttl = self.policy_for(url)
+        entry["fresh"] = time.time() - entry.get("stored_at", 0) < ttl
+        return entry
+
+    def get(self, url: str, params: Optional[dict]) -> Optional[Any]:
+        """
+        Возвращает ответ, если он ещё не устарел, и учитывает попадание или промах.
+        """
+        endpoint, _ = self.policy_for(url)
+        entry = self.lookup(url, params)
+        if entry and entry["fresh"]:
+            self._count(endpoint, "hits")
+            return entry["data"]
+        self._count(endpoint, "misses")
+        return None
+
+    def validators(self, url: str, params: Optional[dict]) -> Dict[str, str]:
+        """
+        Возвращает заголовки условного запроса (If-None-Match / If-Modified-Since)
+        для сохранённого ответа.
+        """
+        entry = self.lookup(url, params)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def set(self, url: str, params: Optional[dict], data: Any, response=None) -> None:
+        """
+        Сохраняет ответ вместе с его ETag/Last-Modified.
+        Ответы с валидаторами хранятся дольше TTL, чтобы их можно было перепроверить.
+
+        Args:
+            response (requests.Response | None): Ответ HH, из которого берутся заголовки.
+        """
+        headers = response.headers if response is not None else {}
+        self._store(url, params, data, headers.get("ETag"), headers.get("Last-Modified"))
+
+    def _store(self, url: str, params: Optional[dict], data: Any,
+               etag: Optional[str], last_modified: Optional[str]) -> None:
+        _, ttl = self.policy_for(url)
+        entry = {"data": data, "etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+        expire = ttl + conf.HH_CACHE_STALE_TTL if entry["etag"] or entry["last_modified"] else ttl
+        try:
+            self.redis.setex(self.make_key(url, params), expire, self.codec.encode(entry))
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить ответ HH в кэше: {e}")
+
+    def revalidate(self, url: str, params: Optional[dict], response=None) -> Optional[Any]:
+        """
+        Продлевает сохранённый ответ после 304 Not Modified.
+
+        Returns:
+            Any | None: Сохранённые данные или None, если запись уже удалена.
+        """
+        entry = self.lookup(url, params)
+        if entry is None:
+            return None
+        endpoint, _ = self.policy_for(url)
+        self._count(endpoint, "revalidated")
+        headers = response.headers if response is not None else {}
+        self._store(
+            url, params, entry["data"],
+            headers.get("ETag") or entry.get("etag"),
+            headers.get("Last-Modified") or entry.get("last_modified"),
+        )
+        return entry["data"]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Возвращает счётчики кэша по эндпоинтам.
+
+        Returns:
+            dict: Для каждого эндпоинта hits, misses, revalidated и hit_rate.
+        """
+        try:
+            raw = self.stats_redis.hgetall(self.STATS_KEY) or {}
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать счётчики кэша HH: {e}")
+            raw = {}
+        result: Dict[str, Dict[str, float]] = {}
+        for field, value in raw.items():
+            endpoint, _, event = field.rpartition(":")
+            result.setdefault(endpoint, {"hits": 0, "misses": 0, "revalidated": 0})[event] = int(value)
+        for counters in result.values():
+            total = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = round(counters["hits"] / total, 3) if total else 0.0
+        return result
+
@@ -0,0 +1,190 @@
+"""
+Модуль учёта лимитов просмотра резюме HeadHunter.
+
+Содержит класс ResumeLimitTracker, который хранит ID менеджера и остаток
+просмотров по каждому токену в Redis (с копией в памяти процесса), уменьшает
+остаток локально после каждого просмотра и синхронизируется с HH только
+периодически или после ответа 403.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import conf
+from redis_manager import redis_manager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ResumeLimitTracker:
+    """
+    Трекер лимитов просмотра резюме для токенов HH.
+
+    Attributes:
+        client: Клиент HH API (HHApiClient), через который выполняется синхронизация.
+        redis: Клиент Redis для хранения состояния, общего для всех процессов.
+        sync_interval (int): Период принудительной синхронизации с HH в секундах.
+    """
+
+    KEY_PREFIX = "hh_resume_limits:"
+    STATE_TTL = 60 * 60 * 24  # 24 часа
+
+    def __init__(self, client, redis_client=None, sync_interval: Optional[int] = None):
+        self.client = client
+        self.redis = redis_client if redis_client is not None else redis_manager.client
+        self.sync_interval = sync_interval if sync_interval is not None else conf.HH_LIMITS_SYNC_INTERVAL
+        self._local_state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def token_id(token: Optional[str]) -> str:
+        """Возвращает короткий идентификатор токена, чтобы не хранить сам токен в ключах."""
+        return hashlib.sha1((token or "").encode("utf-8")).hexdigest()[:16]
+
+    def _make_key(self, token: str) -> str:
+        return f"{self.KEY_PREFIX}{self.token_id(token)}"
+
+    @staticmethod
+    def _parse_state(raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not raw:
+            return None
+        try:
+            return {
+                "manager_id": raw.get("manager_id") or None,
+                "left": int(raw.get("left", 0)),
+                "limit": int(raw.get("limit", 0)),
+                "spent": int(raw.get("spent", 0)),
+                "synced_at": float(raw.get("synced_at", 0)),
+            }
+        except (TypeError, ValueError):
+            return None
+
+    def get_state(self, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает сохранённое состояние лимитов для токена.
+
+        Args:
+            token (str | None): Токен HH. По умолчанию — текущий токен клиента.
+
+        Returns:
+            dict | None: manager_id, left, limit, spent, synced_at или None, если данных нет.
+        """
+        token = token or self.client.access_token
+        try:
+            state = self._parse_state(self.redis.hgetall(self._make_key(token)))
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать лимиты из Redis: {e}")
+            state = None
+        return state or self._local_state.get(self.token_id(token))
+
+    def _save_state(self, token: str, state: Dict[str, Any]) -> None:
+        self._local_state[self.token_id(token)] = dict(state)
+        mapping = {k: ("" if v is None else v) for k, v in state.items()}
+        try:
+            key = self._make_key(token)
+            self.redis.hset(key, mapping=mapping)
+            self.redis.expire(key, self.STATE_TTL)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить лимиты в Redis: {e}")
+
+    def is_sync_due(self, state: Optional[Dict[str, Any]]) -> bool:
+        """Проверяет, пора ли синхронизировать состояние с HH."""
+        if not state:
+            return True
+        return time.time() - state.get("synced_at", 0) >= self.sync_interval
+
+    def sync(self) -> Optional[Dict[str, Any]]:
+        """
+        Запрашивает у HH актуальные лимиты для текущего токена клиента.
+        ID менеджера запрашивается только один раз и затем берётся из состояния.
+
+        Returns:
+            dict | None: Обновлённое состояние или None, если ID менеджера не получен.
+        """
+        token = self.client.access_token
+        with self._lock:
+            state = self.get_state(token) or {}
+            manager_id = state.get("manager_id")
+            if not manager_id:
+                manager = self.client.get_current_manager(use_cache=False)
+                manager_id = manager.get("manager", {}).get("id") if manager else None
+            if not manager_id:
+                logger.warning("Не удалось получить ID менеджера")
+                return None
+
+            limits = self.client.get_resume_limits(manager_id, use_cache=False)
+            state = {
+                "manager_id": manager_id,
+                "left": int(limits.get("left", {}).get("resume_view", 0) or 0),
+                "limit": int(limits.get("limits", {}).get("resume_view", 0) or 0),
+                "spent": int(limits.get("spend", {}).get("resume_view", 0) or 0),
+                "synced_at": time.time(),
+            }
+            self._save_state(token, state)
+            logger.debug(f"Лимиты токена {self.token_id(token)} синхронизированы: осталось {state['left']}")
+            return state
+
+    def ensure_available(self) -> bool:
+        """
+        Гарантирует, что у текущего токена клиента остались просмотры резюме.
+        Синхронизируется с HH только при отсутствии данных или по истечении sync_interval.
+        Если локальный счётчик достиг нуля — заранее переключается на токен из пула
+        с ненулевым остатком (исчерпанный токен не охлаждается: запросы без расхода
+        лимита он выполнять может).
+
+        Returns:
+            bool: True, если найден токен с ненулевым остатком.
+        """
+        tokens_count = max(1, len([t for t in conf.HH_ACCESS_TOKENS if t]))
+        for _ in range(tokens_count):
+            state = self.get_state()
+            if self.is_sync_due(state):
+                state = self.sync()
+            if state is None or state["left"] > 0:
+                return True
+            logger.warning("Лимит просмотра резюме исчерпан. Переключаем токен.")
+            self.client.use_next_token(cooldown=0, needs_quota=True)
+
+        logger.warning("Лимиты просмотра резюме исчерпаны на всех токенах")
+        return False
+
+    def consume(self, token: Optional[str] = None, count: int = 1) -> None:
+        """
+        Уменьшает остаток просмотров после успешного просмотра резюме.
+
+        Args:
+            token (str | None): Токен, которым выполнен просмотр.
+            count (int): Количество просмотров.
+        """
+        token = token or self.client.access_token
+        local = self._local_state.get(self.token_id(token))
+        if local:
+            local["left"] = max(0, local["left"] - count)
+            local["spent"] = local.get("spent", 0) + count
+        try:
+            key = self._make_key(token)
+            if self.redis.exists(key):
+                self.redis.hincrby(key, "left", -count)
+                self.redis.hincrby(key, "spent", count)
+        except Exception as e:
+            logger.warning(f"Не удалось обновить счётчик лимитов в Redis: {e}")
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Помечает состояние токена как устаревшее (например, после ответа 403),
+        чтобы следующая проверка заново синхронизировалась с HH.
+        """
+        token = token or self.client.access_token
+        local = self._local_state.get(self.token_id(token))
+        if local:
+            local["synced_at"] = 0
+        try:
+            # Без существующего состояния поле synced_at создало бы хэш без TTL и с нулевым остатком
+            key = self._make_key(token)
+            if self.redis.exists(key):
+                self.redis.hset(key, "synced_at", 0)
+        except Exception as e:
+            logger.warning(f"Не удалось сбросить состояние лимитов в Redis: {e}")
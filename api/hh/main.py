@@ -11,17 +11,22 @@
 """
 
 import re
+import threading
 import time
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 import requests
-import json
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from functools import wraps
 from config import conf
 from utils.logger import setup_logger
+from utils import http
 from redis_manager import redis_manager
 from ai import ai_evaluator
+from api.hh.cache import ResponseCache
+from api.hh.limits import ResumeLimitTracker
+from api.hh.token_pool import TokenPool
 
 logger = setup_logger(__name__)
 
@@ -29,6 +34,15 @@ def parse_keywords(keywords: str) -> List[str]:
     # Ищем либо "фразы в кавычках", либо отдельные слова
     return re.findall(r'"[^"]+"|\S+', keywords)
 
+def parse_hh_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Разбирает дату HH вида 2024-05-01T12:30:00+0300 (None — если разобрать не удалось)."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return None
+
 def retry_on_limit_exceeded(max_retries=3, delay=2, backoff=2):
     def decorator(func):
         @wraps(func)
@@ -69,6 +83,31 @@ def retry_on_limit_exceeded(max_retries=3, delay=2, backoff=2):
     return decorator
 
 
+def use_pooled_token(needs_quota: bool = False):
+    """
+    Декоратор аренды токена из общего пула на время вызова метода.
+    Вложенные вызовы (например, синхронизация лимитов внутри get_resume_details)
+    используют уже арендованный токен.
+
+    Args:
+        needs_quota (bool): Нужен токен с ненулевым остатком просмотров резюме.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            state = self._token_state
+            depth = getattr(state, "depth", 0)
+            if depth == 0:
+                self.lease_token(needs_quota=needs_quota)
+            state.depth = depth + 1
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                state.depth = depth
+        return wrapper
+    return decorator
+
+
 def refresh_token_if_needed(func):
     """
     Декоратор для проверки истечения срока действия токена.
@@ -90,11 +129,13 @@ class HHApiClient:
         base_url (str): Базовый URL API HH.
         client_id (str): ID клиента для OAuth.
         client_secret (str): Секретный ключ клиента.
-        access_token (str): Текущий токен доступа.
+        access_token (str): Токен, арендованный текущим потоком (по умолчанию ACCESS_TOKEN1).
         refresh_token (str): Токен для обновления доступа.
         redirect_uri (str): URI перенаправления после авторизации.
         token_expiry (datetime): Время истечения текущего токена.
-        cache_ttl (int): Время жизни кэша в секундах.
+        cache_ttl (int): Время жизни кэша для эндпоинтов без своей политики, в секундах.
+        response_cache (ResponseCache): Кэш ответов с политиками по эндпоинтам.
+        token_pool (TokenPool): Общий для всех процессов пул токенов.
     """
 
     CACHE_TTL = 5  # 5 секунд
@@ -103,43 +144,83 @@ class HHApiClient:
         self.base_url = "https://api.hh.ru" 
         self.client_id = conf.CLIENT_ID1
         self.client_secret = conf.CLIENT_SECRET1
-        self.access_token = conf.ACCESS_TOKEN1
+        # Токен хранится отдельно для каждого потока: параллельные запросы арендуют разные токены
+        self._token_state = threading.local()
+        self._default_token = conf.ACCESS_TOKEN1
         self.refresh_token = conf.REFRESH_TOKEN1
         self.redirect_uri = conf.REDIRECT_URI1
         self.token_expiry = datetime.utcnow() + timedelta(days=14)
         self.cache_ttl = self.CACHE_TTL
+        self.response_cache = ResponseCache(
+            default_ttl=self.cache_ttl, token_lookup=lambda: self.access_token
+        )
+        self.limit_tracker = ResumeLimitTracker(self)
+        self.token_pool = TokenPool(
+            quota_lookup=lambda token: (self.limit_tracker.get_state(token) or {}).get("left")
+        )
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return getattr(self._token_state, "token", None) or self._default_token
+
+    @access_token.setter
+    def access_token(self, value: Optional[str]) -> None:
+        self._token_state.token = value
+
+    def _get_cached_response(self, url: str, params: dict) -> Optional[Any]:
+        """Возвращает ответ из кэша, если он не устарел по политике эндпоинта."""
+        cached = self.response_cache.get(url, params)
+        if cached is not None:
+            logger.debug(f"Ответ взят из кэша: {url}")
+        return cached
+
+    def _save_to_cache(self, url: str, params: dict, data: Any, response=None) -> None:
+        """Сохраняет ответ в кэше вместе с его ETag/Last-Modified."""
+        self.response_cache.set(url, params, data, response)
+
+    def _fetch_json(self, url: str, params: Optional[dict] = None, headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Выполняет GET-запрос и сохраняет ответ в кэше.
+        Если в кэше есть устаревший ответ с ETag/Last-Modified, запрос выполняется условным;
+        при 304 Not Modified возвращается сохранённый ответ.
 
-    def _make_cache_key(self, url: str, params: dict, source: str = "hh") -> str:
-        """Формирует ключ кэша на основе URL и параметров."""
-        sorted_params = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-        return f"{source}_api:{url}?{sorted_params}"
+        Raises:
+            requests.HTTPError: При ошибочном статусе ответа HH.
+        """
+        data, _ = self._fetch_json_with_status(url, params, headers)
+        return data
 
-    def _get_cached_response(self, url: str, params: dict) -> Optional[Dict[str, Any]]:
-        """Получает закэшированный ответ из Redis."""
-        cache_key = self._make_cache_key(url, params)
-        cached = redis_manager.client.get(cache_key)
-        if cached:
-            logger.debug(f"Ответ взят из кэша: {cache_key}")
-            try:
-                if isinstance(cached, str):
-                    return json.loads(cached)
-                elif isinstance(cached, bytes):
-                    return json.loads(cached.decode('utf-8'))
-                else:
-                    return cached
-            except (json.JSONDecodeError, TypeError):
-                logger.warning(f"Ошибка декодирования кэша: {cache_key}")
-                return None
-        return None
+    def _fetch_json_with_status(
+        self, url: str, params: Optional[dict] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        То же, что _fetch_json, но дополнительно сообщает, получен ли ответ заново.
 
-    def _save_to_cache(self, url: str, params: dict, data: dict) -> None:
-        """Сохраняет ответ в Redis."""
-        cache_key = self._make_cache_key(url, params)
-        try:
-            redis_manager.client.setex(cache_key, self.cache_ttl, json.dumps(data, ensure_ascii=False))
-            logger.debug(f"Ответ сохранён в кэше: {cache_key}")
-        except Exception as e:
-            logger.warning(f"Не удалось сохранить ответ в кэше: {e}")
+        Returns:
+            tuple[Any, bool]: Данные и False, если ответ подтверждён через 304 Not Modified.
+        """
+        params = params or {}
+        headers = headers or self.get_headers()
+        conditional = self.response_cache.validators(url, params)
+        response = http.get(url, headers={**headers, **conditional}, params=params)
+        if response.status_code == 304:
+            data = self.response_cache.revalidate(url, params, response)
+            if data is not None:
+                logger.debug(f"Ответ не изменился, используем кэш: {url}")
+                return data, False
+            response = http.get(url, headers=headers, params=params)
+        response.raise_for_status()
+        data = response.json()
+        self._save_to_cache(url, params, data, response)
+        return data, True
+
+    def _get_json(self, url: str, params: Optional[dict] = None, use_cache: bool = True) -> Any:
+        """Возвращает ответ из кэша или загружает его из HH."""
+        if use_cache:
+            cached = self._get_cached_response(url, params or {})
+            if cached is not None:
+                return cached
+        return self._fetch_json(url, params)
 
     def is_token_expired(self) -> bool:
         """
@@ -149,22 +230,46 @@ class HHApiClient:
         """
         return datetime.utcnow() >= self.token_expiry
 
-    def use_next_token(self):
+    def lease_token(self, needs_quota: bool = False) -> Optional[str]:
+        """
+        Арендует наименее загруженный здоровый токен из пула для текущего потока.
+        Если все токены на охлаждении, остаётся на текущем.
+
+        Args:
+            needs_quota (bool): Нужен токен с ненулевым остатком просмотров резюме.
+
+        Returns:
+            str | None: Токен, которым будут выполняться запросы потока.
         """
-        Переключается на следующий токен из списка.
-        Работает только с access_token.
+        token = self.token_pool.acquire(needs_quota=needs_quota)
+        if token:
+            self.access_token = token
+        return self.access_token
+
+    def use_next_token(self, cooldown: Optional[float] = None, needs_quota: bool = False):
         """
-        tokens = [token for token in conf.HH_ACCESS_TOKENS if token is not None]
-        try:
-            current_index = tokens.index(self.access_token)
-        except ValueError:
-            logger.warning("Текущий токен не найден в списке")
-            current_index = -1
+        Переключается на другой токен из пула.
+        Текущий токен отправляется на охлаждение для всех процессов,
+        а поток арендует наименее загруженный из оставшихся.
 
-        next_index = (current_index + 1) % len(tokens)
-        self.access_token = tokens[next_index]
+        Args:
+            cooldown (float | None): Время охлаждения текущего токена в секундах
+                (по умолчанию conf.HH_TOKEN_COOLDOWN; 0 — без охлаждения).
+            needs_quota (bool): Нужен токен с ненулевым остатком просмотров резюме.
+        """
+        current = self.access_token
+        if cooldown is None:
+            cooldown = conf.HH_TOKEN_COOLDOWN
+        if cooldown and current:
+            self.token_pool.cooldown(current, cooldown)
+
+        token = self.token_pool.acquire(needs_quota=needs_quota, exclude=current)
+        if not token:
+            logger.warning("Нет свободных токенов, продолжаем с текущим")
+            return
+        self.access_token = token
         self.token_expiry = datetime.utcnow() + timedelta(days=14)
-        logger.info(f"Переключились на токен {next_index}: {self.access_token[:8]}...")
+        logger.info(f"Переключились на токен {ResumeLimitTracker.token_id(token)}")
 
     def refresh_access_token(self) -> None:
         """
@@ -185,7 +290,7 @@ class HHApiClient:
         }
 
         try:
-            response = requests.post(url, data=payload, headers=headers)
+            response = http.post(url, data=payload, headers=headers)
             response.raise_for_status()
             token_data = response.json()
             self.access_token = token_data["access_token"]
@@ -201,15 +306,20 @@ class HHApiClient:
 
     def get_headers(self) -> Dict[str, str]:
         """
-        Возвращает заголовки с текущим access_token.
+        Возвращает заголовки с токеном текущего потока.
+        Вне декорированных методов (например, в потоках загрузки страниц)
+        на каждый запрос арендуется токен из пула.
         Returns:
             dict: Заголовки для запросов к API.
         """
+        if getattr(self._token_state, "depth", 0) == 0:
+            self.lease_token()
         return {
             "Authorization": f"Bearer {self.access_token}",
             "User-Agent": "HH-User-Agent",
         }
 
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def get_all_resumes(
@@ -245,7 +355,25 @@ class HHApiClient:
         # Дополнительные фильтры
         order_by: Optional[str] = None,
         labels: Optional[List[str]] = None,
+        on_page: Optional[Callable[[int, int], None]] = None,
+        concurrency: Optional[int] = None,
     ) -> Dict[str, Any]:
+        """
+        Загружает результаты поиска резюме, пока не наберётся total.
+
+        При HH_PAGE_CONCURRENCY > 1 первая страница запрашивается отдельно, а остальные —
+        параллельно (их количество известно из поля pages первого ответа). Результаты
+        объединяются в порядке страниц; после первой неполной страницы следующие
+        не запрашиваются и не учитываются.
+
+        Args:
+            on_page (callable | None): Колбэк on_page(loaded, total), вызываемый после каждой страницы.
+            concurrency (int | None): Максимум одновременных запросов страниц.
+                По умолчанию conf.HH_PAGE_CONCURRENCY; 1 — последовательная загрузка.
+
+        Returns:
+            dict: found и items — найденные резюме.
+        """
         if per_page > 50:
             raise ValueError("Параметр 'per_page' не может быть больше 50.")
         if not keywords or not keywords.strip():
@@ -253,10 +381,77 @@ class HHApiClient:
         if region is None:
             raise ValueError("Параметр 'region' обязателен.")
 
-        all_items = []
-        page = 0
-        empty_or_few_count = 0  # Счётчик подряд идущих неполных страниц
+        base_params = self._build_search_params(
+            keywords=keywords,
+            region=region,
+            text_logic=text_logic,
+            text_field=text_field,
+            text_period=text_period,
+            salary_from=salary_from,
+            salary_to=salary_to,
+            currency=currency,
+            age_from=age_from,
+            age_to=age_to,
+            experience=experience,
+            education_levels=education_levels,
+            employment=employment,
+            schedule=schedule,
+            gender=gender,
+            job_search_status=job_search_status,
+            period=period,
+            date_from=date_from,
+            date_to=date_to,
+            relocation=relocation,
+            order_by=order_by,
+            labels=labels,
+        )
+
+        if concurrency is None:
+            concurrency = conf.HH_PAGE_CONCURRENCY
+        if concurrency > 1:
+            all_items, pages_loaded = self._fetch_pages_concurrently(base_params, total, per_page, concurrency, on_page)
+        else:
+            all_items, pages_loaded = self._fetch_pages_sequentially(base_params, total, per_page, on_page)
 
+        logger.info("=== ИТОГИ ПОИСКА ===")
+        logger.info(f"Всего загружено резюме: {len(all_items)}")
+        logger.info(f"Обработано страниц: {pages_loaded}")
+        logger.info(f"Запрошено резюме: {total}")
+        logger.info("=== КОНЕЦ ПОИСКА ===")
+        
+        return {"found": len(all_items), "items": all_items}
+
+    @staticmethod
+    def _build_search_params(
+        keywords: str,
+        region: List[str],
+        text_logic: Optional[str] = None,
+        text_field: Optional[str] = None,
+        text_period: Optional[str] = None,
+        salary_from: Optional[int] = None,
+        salary_to: Optional[int] = None,
+        currency: Optional[str] = None,
+        age_from: Optional[int] = None,
+        age_to: Optional[int] = None,
+        experience: Optional[List[str]] = None,
+        education_levels: Optional[List[str]] = None,
+        employment: Optional[List[str]] = None,
+        schedule: Optional[List[str]] = None,
+        gender: Optional[str] = None,
+        job_search_status: Optional[List[str]] = None,
+        period: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        relocation: Optional[str] = None,
+        order_by: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Формирует параметры запроса /resumes (без page и per_page).
+
+        Returns:
+            dict: Параметры запроса к HH API.
+        """
         # Определяем параметр relocation
         if relocation is None:
             relocation = "living_or_relocation"
@@ -265,163 +460,214 @@ class HHApiClient:
         if job_search_status is None:
             job_search_status = ["active_search", "looking_for_offers"]
 
-        while len(all_items) < total:
-            remaining = total - len(all_items)
-            current_per_page = min(per_page, remaining)
-            keywords_list = parse_keywords(keywords)
-            keywords_query = ' '.join(keywords_list)
-
-            params = {
-                "text": keywords_query,
-                "relocation": relocation,
-                "job_search_status": job_search_status,
-                "area": region,
-                "page": page,
-                "per_page": current_per_page
-            }
+        keywords_list = parse_keywords(keywords)
+        keywords_query = ' '.join(keywords_list)
 
-            # Параметры текстового поиска
-            if text_logic:
-                params["text.logic"] = text_logic
-            if text_field:
-                params["text.field"] = text_field
-            if text_period:
-                params["text.period"] = text_period
-
-            # Параметры зарплаты
-            if salary_from is not None:
-                params["salary_from"] = salary_from
-            if salary_to is not None:
-                params["salary_to"] = salary_to
-            if currency:
-                params["currency"] = currency
-
-            # Параметры фильтрации
-            if age_from is not None:
-                params["age_from"] = age_from
-            if age_to is not None:
-                params["age_to"] = age_to
-            if experience:
-                params["experience"] = experience
-            if education_levels:
-                params["education_levels"] = education_levels
-            if employment:
-                params["employment"] = employment
-            if schedule:
-                params["schedule"] = schedule
-            if gender:
-                params["gender"] = gender
-
-            # Параметры дат
-            if period is not None:
-                params["period"] = period
-            if date_from:
-                params["date_from"] = date_from
-            if date_to:
-                params["date_to"] = date_to
-
-            # Дополнительные фильтры
-            if order_by:
-                params["order_by"] = order_by
-            if labels:
-                params["label"] = labels
-
-            # Автоматически добавляем label для зарплаты если указана
-            if salary_from is not None or salary_to is not None:
-                if "label" not in params:
-                    params["label"] = []
-                if isinstance(params["label"], str):
-                    params["label"] = [params["label"]]
-                if "only_with_salary" not in params["label"]:
-                    params["label"].append("only_with_salary")
-
-            url = f"{self.base_url}/resumes"
-            encoded_params = urlencode(params, doseq=True)
-            full_url = f"{url}?{encoded_params}"
-            logger.info(f"Выполняется GET-запрос к API HeadHunter: {full_url}")
-            logger.info(f"Параметры запроса: {params}")
-
-            cached = self._get_cached_response(url, params)
-            if cached:
-                logger.info(f"Получены данные из кэша для страницы {page}")
-                items = cached.get("items", [])
-                all_items.extend(items)
-                page += 1
-                # Проверка количества возвращённых резюме
-                if len(items) < current_per_page:
-                    empty_or_few_count += 1
-                    logger.info(f"Неполная страница {page}: получено {len(items)} из {current_per_page}")
-                else:
-                    empty_or_few_count = 0
-                if empty_or_few_count >= 3:
-                    logger.info("Три подряд неполные страницы — завершаем загрузку.")
-                    break
-                continue
+        params = {
+            "text": keywords_query,
+            "relocation": relocation,
+            "job_search_status": job_search_status,
+            "area": region,
+        }
 
-            headers = self.get_headers()
-            try:
-                logger.info(f"Отправляем HTTP запрос к HH API (страница {page})")
-                response = requests.get(url, headers=headers, params=params)
-                logger.info(f"Получен ответ от HH API: статус {response.status_code}")
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                # Логируем статистику ответа
-                items = result.get("items", [])
-                found = result.get("found", 0)
-                pages = result.get("pages", 0)
-                per_page_actual = result.get("per_page", 0)
-                
-                logger.info(f"Статистика ответа HH API:")
-                logger.info(f"  - Найдено всего: {found}")
-                logger.info(f"  - Страниц: {pages}")
-                logger.info(f"  - На странице: {per_page_actual}")
-                logger.info(f"  - Получено резюме: {len(items)}")
-                
-                all_items.extend(items)
-                self._save_to_cache(url, params, result)
-                page += 1
+        # Параметры текстового поиска
+        if text_logic:
+            params["text.logic"] = text_logic
+        if text_field:
+            params["text.field"] = text_field
+        if text_period:
+            params["text.period"] = text_period
 
-                if len(items) < current_per_page:
-                    empty_or_few_count += 1
-                else:
-                    empty_or_few_count = 0
+        # Параметры зарплаты
+        if salary_from is not None:
+            params["salary_from"] = salary_from
+        if salary_to is not None:
+            params["salary_to"] = salary_to
+        if currency:
+            params["currency"] = currency
 
-                if empty_or_few_count >= 3:
-                    logger.info("Три подряд неполные страницы — завершаем загрузку.")
-                    break
+        # Параметры фильтрации
+        if age_from is not None:
+            params["age_from"] = age_from
+        if age_to is not None:
+            params["age_to"] = age_to
+        if experience:
+            params["experience"] = experience
+        if education_levels:
+            params["education_levels"] = education_levels
+        if employment:
+            params["employment"] = employment
+        if schedule:
+            params["schedule"] = schedule
+        if gender:
+            params["gender"] = gender
 
+        # Параметры дат
+        if period is not None:
+            params["period"] = period
+        if date_from:
+            params["date_from"] = date_from
+        if date_to:
+            params["date_to"] = date_to
+
+        # Дополнительные фильтры
+        if order_by:
+            params["order_by"] = order_by
+        if labels:
+            params["label"] = list(labels)
+
+        # Автоматически добавляем label для зарплаты если указана
+        if salary_from is not None or salary_to is not None:
+            if "label" not in params:
+                params["label"] = []
+            if isinstance(params["label"], str):
+                params["label"] = [params["label"]]
+            if "only_with_salary" not in params["label"]:
+                params["label"].append("only_with_salary")
+
+        return params
+
+    def _fetch_resume_page(self, base_params: Dict[str, Any], page: int, per_page: int) -> Dict[str, Any]:
+        """
+        Загружает одну страницу поиска резюме (с учётом кэша ответов).
+
+        Raises:
+            requests.HTTPError: При ошибочном статусе ответа HH.
+        """
+        url = f"{self.base_url}/resumes"
+        params = {**base_params, "page": page, "per_page": per_page}
+
+        cached = self._get_cached_response(url, params)
+        if cached is not None:
+            logger.info(f"Получены данные из кэша для страницы {page}")
+            return cached
+
+        logger.info(f"Выполняется GET-запрос к API HeadHunter: {url}?{urlencode(params, doseq=True)}")
+        result = self._fetch_json(url, params)
+
+        logger.info(
+            f"Страница {page}: найдено всего {result.get('found', 0)}, страниц {result.get('pages', 0)}, "
+            f"получено резюме {len(result.get('items', []))}"
+        )
+        return result
+
+    def _fetch_pages_sequentially(
+        self,
+        base_params: Dict[str, Any],
+        total: int,
+        per_page: int,
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Загружает страницы по одной, пока не наберётся total или не придут три неполные страницы подряд."""
+        all_items = []
+        page = 0
+        empty_or_few_count = 0  # Счётчик подряд идущих неполных страниц
+
+        while len(all_items) < total:
+            current_per_page = min(per_page, total - len(all_items))
+            try:
+                items = self._fetch_resume_page(base_params, page, current_per_page).get("items", [])
             except Exception as e:
                 logger.error(f"Ошибка при запросе страницы {page}: {e}")
                 raise
 
-        logger.info("=== ИТОГИ ПОИСКА ===")
-        logger.info(f"Всего загружено резюме: {len(all_items)}")
-        logger.info(f"Обработано страниц: {page}")
-        logger.info(f"Запрошено резюме: {total}")
-        logger.info("=== КОНЕЦ ПОИСКА ===")
-        
-        return {"found": len(all_items), "items": all_items}
+            all_items.extend(items)
+            if on_page:
+                on_page(min(len(all_items), total), total)
+            page += 1
+
+            if len(items) < current_per_page:
+                empty_or_few_count += 1
+                logger.info(f"Неполная страница {page}: получено {len(items)} из {current_per_page}")
+            else:
+                empty_or_few_count = 0
+
+            if empty_or_few_count >= 3:
+                logger.info("Три подряд неполные страницы — завершаем загрузку.")
+                break
+
+        return all_items, page
+
+    def _fetch_pages_concurrently(
+        self,
+        base_params: Dict[str, Any],
+        total: int,
+        per_page: int,
+        concurrency: int,
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Загружает первую страницу, затем остальные — параллельно.
+
+        Число потоков ограничено concurrency и HH_PAGE_WORKERS_PER_TOKEN на каждый токен,
+        чтобы не упираться в ограничение частоты запросов одного токена.
+        Страницы после первой неполной отменяются, а их результаты отбрасываются.
+        """
+        # Размер страницы должен быть одинаковым, иначе смещения страниц разойдутся
+        page_size = max(1, min(per_page, total))
+        first = self._fetch_resume_page(base_params, 0, page_size)
+        pages_by_number = {0: first.get("items", [])}
+        loaded = len(pages_by_number[0])
+        if on_page:
+            on_page(min(loaded, total), total)
+
+        pages_needed = min(-(-total // page_size), int(first.get("pages") or 1))
+        if loaded < page_size or pages_needed <= 1:
+            return pages_by_number[0][:total], 1
+
+        tokens_count = max(1, len([t for t in conf.HH_ACCESS_TOKENS if t]))
+        workers = max(1, min(concurrency, conf.HH_PAGE_WORKERS_PER_TOKEN * tokens_count, pages_needed - 1))
+        logger.info(f"Загружаем страницы 1..{pages_needed - 1} параллельно в {workers} потоков")
+
+        last_page = pages_needed - 1  # Номер последней страницы, которую нужно учитывать
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hh-pages")
+        try:
+            futures = {
+                executor.submit(self._fetch_resume_page, base_params, page, page_size): page
+                for page in range(1, pages_needed)
+            }
+            for future in as_completed(futures):
+                page = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    items = future.result().get("items", [])
+                except Exception as e:
+                    logger.error(f"Ошибка при запросе страницы {page}: {e}")
+                    raise
+
+                pages_by_number[page] = items
+                if page <= last_page:
+                    loaded += len(items)
+                    if on_page:
+                        on_page(min(loaded, total), total)
+
+                if len(items) < page_size and page < last_page:
+                    # Дальше результатов нет — отменяем ещё не начатые запросы
+                    logger.info(f"Неполная страница {page}: получено {len(items)} из {page_size}")
+                    last_page = page
+                    for other, other_page in futures.items():
+                        if other_page > last_page:
+                            other.cancel()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        all_items = []
+        for page in range(0, last_page + 1):
+            all_items.extend(pages_by_number.get(page, []))
+        return all_items[:total], len([p for p in pages_by_number if p <= last_page])
 
     def check_and_handle_resume_limit(self):
         """
         Проверяет текущие лимиты просмотра резюме.
         Если лимит исчерпан — автоматически переключается на следующий токен.
-        """
-        manager = self.get_current_manager()
-        manager_id = manager.get("manager", {}).get("id")
-        if not manager_id:
-            logger.warning("Не удалось получить ID менеджера")
-            return
-
-        limits = self.get_resume_limits(manager_id)
-        resume_left = limits.get("left", {}).get("resume_view", 0)
 
-        if resume_left <= 0:
-            logger.warning("Лимит просмотра резюме исчерпан. Переключаем токен.")
-            self.use_next_token()
+        Лимиты берутся из локального счётчика ResumeLimitTracker; запросы к HH
+        выполняются только при периодической синхронизации или после ответа 403.
+        """
+        self.limit_tracker.ensure_available()
 
+    @use_pooled_token(needs_quota=True)
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def get_resume_details(self, resume_id: str) -> Optional[Dict[str, Any]]:
@@ -434,27 +680,30 @@ class HHApiClient:
         Returns:
             dict | None: Полные данные резюме или None, если не найдено или ошибка доступа.
         """
-        self.check_and_handle_resume_limit()
         url = f"{self.base_url}/resumes/{resume_id}"
-        headers = self.get_headers()
         params = {}
 
         logger.info(f"Запрос деталей резюме: {resume_id}")
 
         # Шаг 1: Проверяем кэш
         cached = self._get_cached_response(url, params)
-        if cached:
+        if cached is not None:
             logger.info(f"Резюме {resume_id} получено из кэша")
             return cached
 
+        # Просмотр расходует лимит — проверяем его только перед реальным запросом
+        self.check_and_handle_resume_limit()
+        token = self.access_token
+        headers = self.get_headers()
+
         # Шаг 2: Делаем запрос
         try:
             logger.info(f"Отправляем HTTP запрос для резюме {resume_id}")
-            response = requests.get(url, headers=headers, params=params)
-            logger.info(f"Получен ответ для резюме {resume_id}: статус {response.status_code}")
-            
-            response.raise_for_status()
-            resume_data = response.json()
+            resume_data, fetched = self._fetch_json_with_status(url, params, headers)
+            logger.info(f"Получен ответ для резюме {resume_id}")
+            # Подтверждение кэша через 304 не считается новым просмотром
+            if fetched:
+                self.limit_tracker.consume(token)
             
             # Логируем основную информацию о резюме
             title = resume_data.get("title", "Без названия")
@@ -467,16 +716,17 @@ class HHApiClient:
             logger.info(f"  - Регион: {area}")
             logger.info(f"  - Зарплата: {salary_amount}")
 
-            # Шаг 3: Сохраняем в кэш
-            self._save_to_cache(url, params, resume_data)
+            # Ответ сохранён в кэш в _fetch_json
             logger.info(f"Резюме {resume_id} сохранено в кэш")
             return resume_data
         except requests.HTTPError as e:
-            if response.status_code == 404:
+            status = e.response.status_code if e.response is not None else None
+            if status == 404:
                 logger.warning(f"Резюме не найдено: {resume_id}")
                 return None
-            elif response.status_code == 403:
+            elif status == 403:
                 logger.warning(f"Нет доступа к резюме {resume_id}: лимит просмотров исчерпан")
+                self.limit_tracker.invalidate(token)
                 return None
             else:
                 logger.error(f"Ошибка при получении данных резюме {resume_id}: {e}")
@@ -485,6 +735,7 @@ class HHApiClient:
             logger.error(f"Сетевая ошибка при получении резюме {resume_id}: {e}")
             raise
 
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def get_employer_vacancies(self, employer_id: int, per_page: int = 50) -> List[Dict[str, Any]]:
@@ -513,23 +764,13 @@ class HHApiClient:
 
             logger.debug(f"Запрашиваем страницу {page}")
 
-            # Попробуем получить из кэша
-            cached = self._get_cached_response(url, params)
-            if cached and isinstance(cached, dict):
-                items = cached.get("items", [])
-                all_vacancies.extend(items)
-                logger.debug(f"Из кэша получено {len(items)} вакансий, всего: {len(all_vacancies)}")
-                page += 1
-                continue
-
-            # Запрос к API
+            # Попробуем получить из кэша, иначе — запрос к API
             try:
-                response = requests.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = self._get_cached_response(url, params)
+                if not isinstance(data, dict):
+                    data = self._fetch_json(url, params, headers)
                 items = data.get("items", [])
                 all_vacancies.extend(items)
-                self._save_to_cache(url, params, data)
 
                 logger.debug(f"Получено {len(items)} вакансий со страницы {page}, всего: {len(all_vacancies)}")
 
@@ -545,6 +786,7 @@ class HHApiClient:
 
         return all_vacancies
 
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def get_vacancy_by_id(self, vacancy_id: int):
@@ -552,14 +794,9 @@ class HHApiClient:
         Получение данных о вакансии по ID
         """
         url = f"{self.base_url}/vacancies/{vacancy_id}"
-        headers = self.get_headers()
-        
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        vacancy = response.json()
-        
-        return vacancy
+        return self._get_json(url)
 
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def get_negotiations_by_vacancy(self, vacancy_id: int, per_page: int = 50) -> List[Dict[str, Any]]:
@@ -590,23 +827,13 @@ class HHApiClient:
 
             logger.debug(f"Запрашиваем страницу {page} для вакансии {vacancy_id}")
 
-            # Попробуем получить из кэша
-            cached = self._get_cached_response(url, params)
-            if cached and isinstance(cached, dict):
-                items = cached.get("items", [])
-                all_negotiations.extend(items)
-                logger.debug(f"Из кэша получено {len(items)} откликов со страницы {page}, всего: {len(all_negotiations)}")
-                page += 1
-                continue
-
-            # Делаем запрос к API
+            # Попробуем получить из кэша, иначе — запрос к API
             try:
-                response = requests.get(url, headers=headers, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = self._get_cached_response(url, params)
+                if not isinstance(data, dict):
+                    data = self._fetch_json(url, params, headers)
                 items = data.get("items", [])
                 all_negotiations.extend(items)
-                self._save_to_cache(url, params, data)
 
                 logger.debug(f"Получено {len(items)} откликов со страницы {page}, всего: {len(all_negotiations)}")
 
@@ -624,6 +851,68 @@ class HHApiClient:
 
         return all_negotiations
 
+    @use_pooled_token()
+    @retry_on_limit_exceeded(max_retries=5, delay=2)
+    @refresh_token_if_needed
+    def get_negotiations_updated_since(
+        self, vacancy_id: int, updated_since: Optional[str], per_page: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Получает отклики по вакансии, изменённые после указанного момента.
+
+        Отклики запрашиваются от новых к старым; загрузка страниц прекращается на первом
+        отклике старше updated_since, поэтому при отсутствии изменений выполняется один
+        (условный, по ETag) запрос. Кэш свежих ответов не используется.
+
+        Отклики с updated_at, равным updated_since, возвращаются повторно: отклик мог
+        измениться в ту же секунду уже после прошлой синхронизации. Повторы по ID
+        (при сдвиге откликов между страницами) отбрасываются.
+
+        Args:
+            vacancy_id (int): ID вакансии.
+            updated_since (str | None): updated_at последнего учтённого отклика (None — все отклики).
+            per_page (int): Сколько откликов запрашивать за раз (максимум 50).
+
+        Returns:
+            dict: {"found": общее число откликов, "items": изменённые отклики}.
+        """
+        url = f"{self.base_url}/negotiations/response"
+        headers = self.get_headers()
+        params = {
+            "vacancy_id": vacancy_id,
+            "per_page": per_page,
+            "order_by": "updated_at",
+        }
+        since = parse_hh_datetime(updated_since)
+
+        changed = []
+        seen = set()
+        found = 0
+        page = 0
+        while True:
+            params["page"] = page
+            data = self._fetch_json(url, params, headers)
+            items = data.get("items", [])
+            found = data.get("found", found)
+
+            for item in items:
+                updated_at = parse_hh_datetime(item.get("updated_at"))
+                if since and updated_at and updated_at < since:
+                    logger.debug(f"Вакансия {vacancy_id}: новых откликов {len(changed)}, всего {found}")
+                    return {"found": found, "items": changed}
+                if item.get("id") in seen:
+                    continue
+                seen.add(item.get("id"))
+                changed.append(item)
+
+            if len(items) < per_page:
+                break
+            page += 1
+
+        logger.debug(f"Вакансия {vacancy_id}: новых откликов {len(changed)}, всего {found}")
+        return {"found": found, "items": changed}
+
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def get_new_negotiations_by_vacancy(self, vacancy_id: int, per_page: int = 50) -> List[Dict[str, Any]]:
@@ -639,15 +928,17 @@ class HHApiClient:
         all_negotiations = self.get_negotiations_by_vacancy(vacancy_id, per_page=per_page)
         return [n for n in all_negotiations if n.get("has_updates", False)]
 
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
-    def get_resume_limits(self, manager_id: int) -> Dict[str, Any]:
+    def get_resume_limits(self, manager_id: int, use_cache: bool = True) -> Dict[str, Any]:
         """
         Получает информацию о лимитах на просмотр резюме у менеджера.
-        Если лимит исчерпан (left.resume_view == 0), автоматически переключается на следующий токен.
+        Переключение токена при исчерпании лимита выполняет ResumeLimitTracker.
 
         Args:
             manager_id (int): ID менеджера.
+            use_cache (bool): Использовать ли кэш ответов в Redis.
 
         Returns:
             dict: Информация о лимитах.
@@ -656,35 +947,29 @@ class HHApiClient:
         headers = self.get_headers()
         params = {}
 
-        cached = self._get_cached_response(url, params)
+        cached = self._get_cached_response(url, params) if use_cache else None
         if cached:
             return cached
 
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            limits_data = response.json()
+            limits_data = self._fetch_json(url, params, headers)
             logger.debug(f"Получены лимиты просмотра резюме: {limits_data}")
-
-            # Проверяем, не исчерпан ли лимит
-            resume_left = limits_data.get("left", {}).get("resume_view", 0)
-            if resume_left == 0:
-                logger.warning("Лимит просмотра резюме исчерпан. Переключаем токен.")
-                self.use_next_token()  # Меняем токен глобально
-
-            self._save_to_cache(url, params, limits_data)
             return limits_data
 
         except requests.RequestException as e:
             logger.error(f"Ошибка при получении лимитов просмотра резюме: {e}")
             raise
 
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
-    def get_current_manager(self) -> Dict[str, Any]:
+    def get_current_manager(self, use_cache: bool = True) -> Dict[str, Any]:
         """
         Получает информацию о текущем пользователе (менеджере).
 
+        Args:
+            use_cache (bool): Использовать ли кэш ответов в Redis.
+
         Returns:
             dict: Информация о менеджере.
         """
@@ -692,21 +977,19 @@ class HHApiClient:
         headers = self.get_headers()
         params = {}
 
-        cached = self._get_cached_response(url, params)
+        cached = self._get_cached_response(url, params) if use_cache else None
         if cached:
             return cached
 
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            manager_data = response.json()
+            manager_data = self._fetch_json(url, params, headers)
             logger.debug(f"Получены данные текущего менеджера")
-            self._save_to_cache(url, params, manager_data)
             return manager_data
         except requests.RequestException as e:
             logger.error(f"Ошибка при получении данных о менеджере: {e}")
             raise
     
+    @use_pooled_token()
     @retry_on_limit_exceeded(max_retries=5, delay=2)
     @refresh_token_if_needed
     def read_negotiations(self, negotiation_ids: List[int]) -> bool:
@@ -718,7 +1001,7 @@ class HHApiClient:
         headers = self.get_headers()
         params = {"topic_id": negotiation_ids}
 
-        response = requests.post(url, headers=headers, params=params)
+        response = http.post(url, headers=headers, params=params)
         
         if response.status_code == 204:
             return True  # Успешно
@@ -0,0 +1,215 @@
+"""
+Модуль распределения запросов между токенами HH.
+
+Содержит класс TokenPool: для каждого токена в Redis хранятся число запросов
+в текущем окне, время последнего использования и время окончания «охлаждения»
+после 403/429. Каждый запрос арендует наименее загруженный здоровый токен, поэтому
+все процессы и потоки равномерно распределяют нагрузку между токенами, а не
+упираются одновременно в один исчерпанный.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from api.hh.limits import ResumeLimitTracker
+from config import conf
+from redis_manager import redis_manager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TokenPool:
+    """
+    Пул токенов HH с общим для всех процессов состоянием в Redis.
+    При недоступности Redis временно работает по локальному состоянию.
+
+    Attributes:
+        redis: Клиент Redis.
+        window (int): Окно подсчёта частоты запросов в секундах.
+    """
+
+    KEY_PREFIX = "hh_token_pool:"
+    STATE_TTL = 60 * 60 * 24  # 24 часа
+    WINDOW = 10
+    FALLBACK_SECONDS = 30
+
+    # KEYS: сначала ключи состояния пула, затем ключи лимитов (ResumeLimitTracker) тех же токенов.
+    # ARGV: now, window, needs_quota (1/0), exclude (номер токена, 0 — без исключения), ttl.
+    # Возвращает номер выбранного токена (с 1) или 0, если здоровых токенов нет.
+    ACQUIRE_SCRIPT = """
+    local n = #KEYS / 2
+    local now = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local needs_quota = ARGV[3] == '1'
+    local exclude = tonumber(ARGV[4])
+    local best, best_count, best_used = 0, 0, 0
+    for i = 1, n do
+        local state = redis.call('HMGET', KEYS[i], 'cooldown_until', 'window_start', 'window_count', 'last_used')
+        local cooldown_until = tonumber(state[1]) or 0
+        local count = tonumber(state[3]) or 0
+        local used = tonumber(state[4]) or 0
+        if now - (tonumber(state[2]) or 0) >= window then
+            count = 0
+        end
+        local healthy = cooldown_until <= now and i ~= exclude
+        if healthy and needs_quota then
+            local left = redis.call('HGET', KEYS[n + i], 'left')
+            if left and tonumber(left) <= 0 then
+                healthy = false
+            end
+        end
+        if healthy and (best == 0 or count < best_count or (count == best_count and used < best_used)) then
+            best, best_count, best_used = i, count, used
+        end
+    end
+    if best == 0 then
+        return 0
+    end
+    local key = KEYS[best]
+    if now - (tonumber(redis.call('HGET', key, 'window_start')) or 0) >= window then
+        redis.call('HSET', key, 'window_start', tostring(now), 'window_count', 1)
+    else
+        redis.call('HINCRBY', key, 'window_count', 1)
+    end
+    redis.call('HSET', key, 'last_used', tostring(now))
+    redis.call('HINCRBY', key, 'total', 1)
+    redis.call('EXPIRE', key, tonumber(ARGV[5]))
+    return best
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        tokens_provider: Optional[Callable[[], List[str]]] = None,
+        quota_lookup: Optional[Callable[[str], Optional[int]]] = None,
+    ):
+        """
+        Args:
+            redis_client: Клиент Redis (по умолчанию общий redis_manager.client).
+            tokens_provider (callable | None): Возвращает список токенов (по умолчанию conf.HH_ACCESS_TOKENS).
+            quota_lookup (callable | None): Возвращает остаток просмотров резюме для токена
+                в локальном режиме (без Redis).
+        """
+        self.redis = redis_client if redis_client is not None else redis_manager.client
+        self.tokens_provider = tokens_provider or (lambda: [t for t in conf.HH_ACCESS_TOKENS if t])
+        self.quota_lookup = quota_lookup
+        self.window = self.WINDOW
+        self._local_state: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._fallback_until = 0.0
+        self._script = None
+
+    def _make_key(self, token: str) -> str:
+        return f"{self.KEY_PREFIX}{ResumeLimitTracker.token_id(token)}"
+
+    def _use_local(self, error: Exception) -> None:
+        if time.monotonic() >= self._fallback_until:
+            logger.warning(f"Redis недоступен для пула токенов HH, используем локальное состояние: {error}")
+        self._fallback_until = time.monotonic() + self.FALLBACK_SECONDS
+
+    def _acquire_redis(self, tokens: List[str], needs_quota: bool, exclude: int) -> Optional[int]:
+        if self._script is None:
+            self._script = self.redis.register_script(self.ACQUIRE_SCRIPT)
+        keys = [self._make_key(t) for t in tokens]
+        keys += [f"{ResumeLimitTracker.KEY_PREFIX}{ResumeLimitTracker.token_id(t)}" for t in tokens]
+        index = int(self._script(
+            keys=keys,
+            args=[time.time(), self.window, 1 if needs_quota else 0, exclude, self.STATE_TTL],
+        ))
+        return index - 1 if index else None
+
+    def _acquire_local(self, tokens: List[str], needs_quota: bool, exclude: int) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            best = None
+            for i, token in enumerate(tokens):
+                state = self._local_state.setdefault(token, {})
+                count = state.get("window_count", 0) if now - state.get("window_start", 0) < self.window else 0
+                healthy = state.get("cooldown_until", 0) <= now and i + 1 != exclude
+                if healthy and needs_quota and self.quota_lookup:
+                    left = self.quota_lookup(token)
+                    healthy = left is None or left > 0
+                if healthy and (best is None or (count, state.get("last_used", 0)) < best[1]):
+                    best = (i, (count, state.get("last_used", 0)))
+            if best is None:
+                return None
+
+            state = self._local_state[tokens[best[0]]]
+            if now - state.get("window_start", 0) >= self.window:
+                state["window_start"], state["window_count"] = now, 0
+            state["window_count"] = state.get("window_count", 0) + 1
+            state["last_used"] = now
+            state["total"] = state.get("total", 0) + 1
+            return best[0]
+
+    def acquire(self, needs_quota: bool = False, exclude: Optional[str] = None) -> Optional[str]:
+        """
+        Арендует наименее загруженный токен, не находящийся на охлаждении.
+
+        Args:
+            needs_quota (bool): Нужен токен с ненулевым остатком просмотров резюме.
+            exclude (str | None): Токен, который не следует выбирать (например, только что отказавший).
+
+        Returns:
+            str | None: Токен или None, если все токены на охлаждении или без остатка.
+        """
+        tokens = self.tokens_provider()
+        if not tokens:
+            return None
+        exclude_index = tokens.index(exclude) + 1 if exclude in tokens and len(tokens) > 1 else 0
+
+        index = None
+        if time.monotonic() >= self._fallback_until:
+            try:
+                index = self._acquire_redis(tokens, needs_quota, exclude_index)
+            except Exception as e:
+                self._use_local(e)
+                index = self._acquire_local(tokens, needs_quota, exclude_index)
+        else:
+            index = self._acquire_local(tokens, needs_quota, exclude_index)
+
+        if index is None:
+            logger.warning("Нет доступных токенов HH: все на охлаждении или исчерпали лимит")
+            return None
+        return tokens[index]
+
+    def cooldown(self, token: str, seconds: float) -> None:
+        """
+        Выводит токен из ротации на seconds секунд (после 403/429) для всех процессов.
+        """
+        until = time.time() + seconds
+        with self._lock:
+            self._local_state.setdefault(token, {})["cooldown_until"] = until
+        try:
+            key = self._make_key(token)
+            self.redis.hset(key, "cooldown_until", until)
+            self.redis.expire(key, self.STATE_TTL)
+        except Exception as e:
+            self._use_local(e)
+        logger.info(f"Токен {ResumeLimitTracker.token_id(token)} на охлаждении {seconds:.0f} сек")
+
+    def stats(self) -> List[Dict[str, float]]:
+        """
+        Возвращает состояние токенов: частоту запросов, охлаждение и общее число запросов.
+
+        Returns:
+            list[dict]: token_id, rate (запросов в секунду за окно), cooldown_left, total.
+        """
+        now = time.time()
+        result = []
+        for token in self.tokens_provider():
+            try:
+                state = self.redis.hgetall(self._make_key(token)) or {}
+            except Exception:
+                state = self._local_state.get(token, {})
+            window_start = float(state.get("window_start", 0) or 0)
+            count = float(state.get("window_count", 0) or 0) if now - window_start < self.window else 0.0
+            result.append({
+                "token_id": ResumeLimitTracker.token_id(token),
+                "rate": round(count / self.window, 2),
+                "cooldown_left": max(0.0, round(float(state.get("cooldown_until", 0) or 0) - now, 1)),
+                "total": int(float(state.get("total", 0) or 0)),
+            })
+        return result
@@ -10,17 +10,21 @@
 """
 
 from datetime import datetime
+from typing import Optional
 import json
-from urllib.parse import urlencode
-from flask import Flask, request, render_template, redirect, url_for, send_file, g
+import os
+from urllib.parse import urlencode, urlsplit, urlunsplit
+from flask import Flask, Response, request, render_template, redirect, url_for, send_file, g, stream_with_context
 from markupsafe import Markup
+from werkzeug.exceptions import HTTPException
 from data_manager import dm
+from database.session import ScopedSession
 from redis_manager import redis_manager
 from utils.logger import setup_logger
 from utils.decorators import log_function_call
 from config import conf
 from data_manager.exporters import CSVExporter, XLSXExporter, EStaffExporter
-from ai import ai_evaluator
+from ai import evaluation_engine, match_cache, candidate_experience
 from helpers import area_manager
 from apscheduler.schedulers.background import BackgroundScheduler
 import atexit
@@ -30,40 +34,54 @@ import pytz
 
 logger = setup_logger(__name__)
 app = Flask(__name__)
-regions = area_manager.areas
 scheduler = None
+DEFAULT_REGION_ID = "2019"
 
 
 
+def search_form_regions():
+    """
+    Регионы, выбранные в форме поиска (или регион по умолчанию).
+    Остальные регионы форма подгружает через /api/regions по мере ввода.
+    """
+    return area_manager.get_many(request.args.getlist("region") or [DEFAULT_REGION_ID])
+
 def init_scheduler():
     global scheduler
     scheduler = BackgroundScheduler()
     scheduler.add_job(dm.update_vacancies_cache, 'cron', hour=8)
     scheduler.add_job(dm.update_vacancies_cache_avito, 'cron', hour=8)
+    scheduler.add_job(dm.sync_vacancies_cache, 'interval', seconds=conf.VACANCY_SYNC_INTERVAL)
+    scheduler.add_job(dm.sync_vacancies_cache_avito, 'interval', seconds=conf.VACANCY_SYNC_INTERVAL)
+    scheduler.add_job(
+        dm.refresh_limits_snapshot,
+        'interval',
+        seconds=conf.LIMITS_SNAPSHOT_INTERVAL,
+        next_run_time=datetime.now(),
+    )
+    scheduler.add_job(redis_manager.clear_old_tasks, 'interval', seconds=conf.TASK_CLEANUP_INTERVAL)
     scheduler.start()
     atexit.register(lambda: scheduler.shutdown())
 
 def check_and_update_vacancies_cache_on_startup():
     """
     Проверяет, есть ли в Redis кэш вакансий.
-    Если его нет или он был создан до 8:00 утра текущего дня — обновляет его.
+    Если его нет или он был создан до 8:00 утра текущего дня — запускает обновление в фоне,
+    не задерживая старт приложения.
     """
-    cache_key = "cached_company_vacancies"
     current_time = datetime.now(pytz.timezone("Europe/Moscow"))
     today_8am = current_time.replace(hour=8, minute=0, second=0, microsecond=0)
 
-    cached_data = dm.redis_manager.client.get(cache_key)
-
-    if not cached_data:
+    if dm.vacancies_cache.get_state() is None:
         logger.warning("Кэш вакансий не найден. Запуск фонового обновления...")
-        dm.update_vacancies_cache()
+        dm.start_vacancies_cache_refresh()
         return
 
     try:
-        ttl = dm.redis_manager.client.ttl(cache_key)
+        ttl = dm.vacancies_cache.remaining_ttl()
         if ttl < 0:
             logger.warning("Ключ в Redis просрочен. Обновляем кэш...")
-            dm.update_vacancies_cache()
+            dm.start_vacancies_cache_refresh()
         # elif current_time > today_8am and ttl < (24 * 60 * 60 - 5 * 60):
         #     logger.info("Кэш существует, но возможно устарел относительно сегодняшнего 8:00. Обновляем...")
         #     dm.update_vacancies_cache()
@@ -71,7 +89,7 @@ def check_and_update_vacancies_cache_on_startup():
             logger.info("Кэш вакансий актуален.")
     except Exception as e:
         logger.error(f"Ошибка при проверке актуальности кэша: {e}. Выполняем принудительное обновление...")
-        dm.update_vacancies_cache()
+        dm.start_vacancies_cache_refresh()
 
 
 @log_function_call
@@ -158,21 +176,21 @@ def search():
     
     # Если это режим редактирования, показываем форму без валидации
     if edit_mode:
-        return render_template("search.html", regions=regions)
+        return render_template("search.html", regions=search_form_regions())
     
     # Валидация обязательных параметров
     if not keywords:
-        return render_template("search.html", error="Введите ключевые слова для поиска", regions=regions)
+        return render_template("search.html", error="Введите ключевые слова для поиска", regions=search_form_regions())
 
     if not region:
-        return render_template("search.html", error="Выберите регион для поиска", regions=regions)
+        return render_template("search.html", error="Выберите регион для поиска", regions=search_form_regions())
     
     # Валидация лимитов
     if total > 2000:
-        return render_template("search.html", error="Количество резюме не может превышать 2000", regions=regions)
+        return render_template("search.html", error="Количество резюме не может превышать 2000", regions=search_form_regions())
     
     if per_page > 100:
-        return render_template("search.html", error="Количество резюме на страницу не может превышать 100", regions=regions)
+        return render_template("search.html", error="Количество резюме на страницу не может превышать 100", regions=search_form_regions())
 
     try:
         task_id = dm.search_resumes(
@@ -242,15 +260,55 @@ def search():
         
         # Сохраняем параметры поиска в Redis с TTL 1 час
         search_params_key = f"search_params:{task_id}"
-        dm.redis_manager.client.setex(search_params_key, 3600, json.dumps(search_params, ensure_ascii=False))
+        dm.redis_manager.set_value(search_params_key, search_params, 3600)
         
-        return redirect(url_for("search_preview", task_id=task_id, source=source))
+        # Поиск выполняется в фоне — показываем прогресс и по завершении открываем preview
+        return redirect(url_for(
+            "task_progress",
+            task_id=task_id,
+            next=url_for("search_preview", task_id=task_id, source=source),
+        ))
     except ValueError as e:
         logger.warning(f"Ошибка валидации: {e}")
-        return render_template("search.html", error=str(e), regions=regions)
+        return render_template("search.html", error=str(e), regions=search_form_regions())
     except Exception as e:
         logger.error(f"Неожиданная ошибка при поиске: {e}")
-        return render_template("search.html", error="Произошла ошибка при выполнении поиска", regions=regions)
+        return render_template("search.html", error="Произошла ошибка при выполнении поиска", regions=search_form_regions())
+
+# Страницы, на которые можно перейти со страницы ожидания фоновой задачи
+TASK_NEXT_ENDPOINTS = {"show_resumes", "search_preview", "download_export"}
+
+def safe_next_url(next_url: str) -> Optional[str]:
+    """
+    Проверяет адрес перехода после фоновой задачи.
+
+    Браузеры считают обратную косую черту прямой ("/\\evil.com" — это "//evil.com"),
+    поэтому адрес разбирается после замены; допускается только путь без схемы и хоста,
+    ведущий на одну из страниц TASK_NEXT_ENDPOINTS.
+
+    Returns:
+        str | None: Безопасный относительный адрес или None.
+    """
+    parts = urlsplit(next_url.replace("\\", "/"))
+    if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+        return None
+    try:
+        endpoint, _ = app.url_map.bind("localhost").match(parts.path, method="GET")
+    except HTTPException:
+        return None
+    if endpoint not in TASK_NEXT_ENDPOINTS:
+        return None
+    return urlunsplit(("", "", parts.path, parts.query, ""))
+
+@log_function_call
+@app.route("/tasks/<task_id>")
+def task_progress(task_id: str):
+    """
+    Страница ожидания фоновой задачи.
+    По завершении перенаправляет на адрес из параметра next (по умолчанию /resumes/<task_id>).
+    """
+    next_url = safe_next_url(request.args.get("next", "")) or url_for("show_resumes", task_id=task_id)
+    return render_template("task_progress.html", task_id=task_id, next_url=next_url)
 
 @log_function_call
 @app.route("/search_preview/<task_id>")
@@ -261,20 +319,27 @@ def search_preview(task_id: str, source: str = "hh"):
     """
     source = request.args.get("source", "hh")
     
-    # Получаем данные задачи
-    task_data = dm.redis_manager.get_task_data(task_id)
+    # Данные задачи и параметры поиска читаем из Redis одним запросом
+    search_params_key = f"search_params:{task_id}"
+    task_data, values = dm.redis_manager.get_task_meta_with_values(task_id, [search_params_key])
     if not task_data:
         return render_template("search_preview.html", 
                               error="Задача не найдена или истекло время жизни",
                               found=0)
     
-    resume_ids = task_data.get("resume_ids", [])
-    found = len(resume_ids)
+    # Поиск ещё выполняется в фоне — возвращаем на страницу прогресса
+    if task_data.get("status") in ("queued", "searching"):
+        return redirect(url_for("task_progress", task_id=task_id, next=request.full_path))
+
+    if task_data.get("status") == "failed":
+        return render_template("search.html",
+                              error=task_data.get("error") or "Произошла ошибка при выполнении поиска",
+                              regions=search_form_regions())
+
+    found = task_data.get("resume_count", 0)
     description = task_data.get("description", "")
     
-    # Получаем параметры поиска из Redis
-    search_params_key = f"search_params:{task_id}"
-    cached_params = dm.redis_manager.client.get(search_params_key)
+    cached_params = values.get(search_params_key)
     
     # Формируем информацию для отображения
     region_names = "Не указан"
@@ -290,7 +355,7 @@ def search_preview(task_id: str, source: str = "hh"):
     # Попытка получить параметры из кэша
     if cached_params:
         try:
-            params = json.loads(cached_params)
+            params = cached_params
             keywords = params.get("keywords", "Не указаны")
             source = params.get("source", source)
             source_name = "HeadHunter" if source == "hh" else "Avito"
@@ -298,26 +363,7 @@ def search_preview(task_id: str, source: str = "hh"):
             # Получаем названия регионов
             region_ids = params.get("region", [])
             if region_ids:
-                region_names_list = []
-                for region_id in region_ids:
-                    # Handle both dict and object formats for regions
-                    region_obj = None
-                    for r in regions:
-                        if hasattr(r, 'id'):
-                            if str(r.id) == str(region_id):
-                                region_obj = r
-                                break
-                        elif isinstance(r, dict) and str(r.get('id')) == str(region_id):
-                            region_obj = r
-                            break
-                    
-                    if region_obj:
-                        if hasattr(region_obj, 'name'):
-                            region_names_list.append(region_obj.name)
-                        elif isinstance(region_obj, dict):
-                            region_names_list.append(region_obj.get('name', str(region_id)))
-                        else:
-                            region_names_list.append(str(region_id))
+                region_names_list = [area["name"] for area in area_manager.get_many(region_ids)]
                 region_names = ", ".join(region_names_list) if region_names_list else "Не указан"
             
             # Параметры зарплаты
@@ -392,24 +438,20 @@ def vacancies():
     """
     Отображает список вакансий из кэша Redis.
     """
-    cache_key = "cached_company_vacancies"
-    cached_data = dm.redis_manager.client.get(cache_key)
+    vacancy_list = dm.get_cached_vacancies()
+    # Пока идёт обновление, страница показывает уже готовые вакансии и ход обновления
+    refresh = dm.get_vacancies_refresh_status()
 
-    if cached_data:
-        try:
-            vacancy_list = json.loads(cached_data)
-            return render_template("vacancies.html", vacancies=vacancy_list)
-        except json.JSONDecodeError as e:
-            logger.error(f"Ошибка декодирования JSON из кэша: {e}")
-            return render_template("vacancies.html", error="Не удалось загрузить кэшированные данные")
+    if vacancy_list is not None:
+        return render_template("vacancies.html", vacancies=vacancy_list, refresh=refresh)
     else:
-        return render_template("vacancies.html", error="Данные о вакансиях ещё не загружены. Попробуйте позже.")
+        return render_template("vacancies.html", error="Данные о вакансиях ещё не загружены. Попробуйте позже.", refresh=refresh)
     
 @app.route("/update-vacancies-cache")
 def manual_update_vacancies():
-    """Ручное обновление кэша вакансий."""
-    dm.update_vacancies_cache()
-    return "Кэш вакансий обновлён."
+    """Ручное обновление кэша вакансий (выполняется в фоне)."""
+    dm.start_vacancies_cache_refresh()
+    return "Обновление кэша вакансий запущено."
 
 @log_function_call
 @app.route("/vacancies/<int:vacancy_id>")
@@ -437,16 +479,10 @@ def vacancies_avito():
     """
     Отображает список вакансий Avito из кэша Redis.
     """
-    cache_key = "cached_company_vacancies_avito"
-    cached_data = dm.redis_manager.client.get(cache_key)
+    vacancy_list = dm.vacancies_cache_avito.get_rows()
 
-    if cached_data:
-        try:
-            vacancy_list = json.loads(cached_data)
-            return render_template("vacancies_avito.html", vacancies=vacancy_list)
-        except json.JSONDecodeError as e:
-            logger.error(f"Ошибка декодирования JSON из кэша Avito: {e}")
-            return render_template("vacancies_avito.html", error="Не удалось загрузить кэшированные данные")
+    if vacancy_list is not None:
+        return render_template("vacancies_avito.html", vacancies=vacancy_list)
     else:
         return render_template("vacancies_avito.html", error="Данные о вакансиях Avito ещё не загружены. Попробуйте позже.")
     
@@ -497,11 +533,9 @@ def show_resumes(task_id: str, source: str = "hh"):
     search_params_query = None
     try:
         search_params_key = f"search_params:{task_id}"
-        search_params_json = dm.redis_manager.client.get(search_params_key)
-        # Redis returns str or None (decode_responses=True)
-        if search_params_json and isinstance(search_params_json, str):
+        params_dict = dm.redis_manager.get_value(search_params_key)
+        if params_dict and isinstance(params_dict, dict):
             import urllib.parse
-            params_dict = json.loads(search_params_json)
             # Remove None values and lists with no values
             params_dict = {k: v for k, v in params_dict.items() if v not in [None, [], ""]}
             
@@ -580,78 +614,120 @@ def export_resumes(task_id: str, format: str):
     if not selected_ids:
         return "Не указаны ID резюме", 400
 
-    # Получаем полные данные из БД по task_id и фильтруем по ID
-    full_resumes = dm.export_resumes(task_id)
-    full_resumes_dict = {r["id"]: r for r in full_resumes}
-
-    # Добавляем опыт и другие данные из БД в each resume
-    enriched_resumes = []
-    for resume in all_resumes:
-        resume_id = resume.get("id")
-        if resume_id in full_resumes_dict:
-            # Сохраняем существующие поля из all_resumes и дополняем данными из БД
-            enriched = {**resume, **full_resumes_dict[resume_id]}
-            enriched_resumes.append(enriched)
-        else:
-            # Если не найдено в БД — оставляем как есть (или можно пропустить)
-            enriched_resumes.append(resume)
-
-    # Проверяем наличие данных после enrich
-    if not enriched_resumes:
-        return "Нет данных для экспорта после дополнения", 400
-
-    # Экспортируем
-    exporter = None
-    if format == "csv":
-        exporter = CSVExporter(data=enriched_resumes)
-        file_path = f"{conf.OUTPUT_DIR}/resumes_{task_id}.csv"
-    elif format == "xlsx":
-        exporter = XLSXExporter(data=enriched_resumes)
-        file_path = f"{conf.OUTPUT_DIR}/resumes_{task_id}.xlsx"
-    elif format == "estaff":
-        exporter = EStaffExporter.export(resume_ids=selected_ids)
+    if format == "estaff":
+        EStaffExporter.export(resume_ids=selected_ids)
         return "Экспортировано в E-Staff", 200
-    else:
+    exporter_class = {"csv": CSVExporter, "xlsx": XLSXExporter}.get(format)
+    if exporter_class is None:
         return "Неподдерживаемый формат", 400
 
-    exporter.save(file_path)
-    return send_file(file_path, as_attachment=True)
+    source = request.form.get("source", "hh")
+
+    # Большие выгрузки формируются в фоне целиком, включая загрузку данных резюме и оценок:
+    # показываем прогресс и по готовности скачиваем файл
+    if len(all_resumes) > conf.EXPORT_ASYNC_THRESHOLD:
+        export_task_id = dm.start_export_task(
+            exporter_class, task_id, all_resumes, source=source,
+            description=f"Экспорт {len(all_resumes)} резюме",
+        )
+        return redirect(url_for(
+            "task_progress",
+            task_id=export_task_id,
+            next=url_for("download_export", task_id=export_task_id, format=format),
+        ))
+
+    # Полные данные загружаем из БД только для выбранных резюме, одним запросом
+    exporter = exporter_class(data=dm.build_export_rows(task_id, all_resumes, source=source))
+
+    # Файл отдаётся потоком по мере формирования, без сохранения на диск
+    filename = f"resumes_{task_id}.{exporter.EXTENSION}"
+    return Response(
+        stream_with_context(exporter.stream()),
+        mimetype=exporter.MIMETYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+@log_function_call
+@app.route("/export/download/<task_id>/<format>")
+def download_export(task_id: str, format: str):
+    """
+    Отдаёт файл, сформированный фоновой задачей экспорта.
+    """
+    task_data = dm.redis_manager.get_task_meta(task_id)
+    if not task_data:
+        return "Задача не найдена или истекло время жизни", 404
+    if task_data.get("status") != "completed":
+        return redirect(url_for("task_progress", task_id=task_id, next=request.full_path))
+    file_path = dm.export_file_path(task_id, format)
+    if format not in ("csv", "xlsx") or not os.path.exists(file_path):
+        return "Файл экспорта не найден", 404
+    return send_file(file_path, as_attachment=True, download_name=f"resumes_{task_id}.{format}")
 
 #   <== API-эндпоинты ==>
 @log_function_call
 @app.route("/api/limits")
 def get_resume_limits():
-    manager_id = dm.get_current_manager_id()
-    if not manager_id:
-        return {"error": "Не найден ID менеджера"}
-    raw_limits = dm.get_resume_limits(manager_id)
-    
-    # Упрощённая структура
-    simplified = {
-        "used": raw_limits.get("spend", {}).get("resume_view", 0),
-        "total": raw_limits.get("limits", {}).get("resume_view", 0),
-        "left": raw_limits.get("left", {}).get("resume_view", 0),
+    """
+    Возвращает снимок лимитов просмотра резюме из Redis.
+    Снимок обновляется фоновой задачей, поэтому запрос не обращается к HH.
+    """
+    snapshot = dm.get_limits_snapshot()
+    if not snapshot:
+        return {"error": "Лимиты ещё не загружены"}
+    return snapshot
+
+@log_function_call
+@app.route("/api/regions")
+def search_regions():
+    """
+    Автодополнение регионов для формы поиска по началу слов названия.
+    """
+    query = request.args.get("q", "")
+    limit = min(request.args.get("limit", 20, type=int), 100)
+    return {"items": area_manager.search(query, limit=limit)}
+
+@log_function_call
+@app.route("/api/cache/stats")
+def get_cache_stats():
+    """
+    Возвращает счётчики попаданий в кэш ответов HH (по эндпоинтам) и в кэш AI-оценок,
+    а также статистику очистки устаревших задач.
+    """
+    return {
+        "hh": dm.hh_client.response_cache.stats(),
+        "ai_match": match_cache.stats(),
+        "tasks_cleanup": redis_manager.cleanup_stats(),
     }
 
+@log_function_call
+@app.route("/api/tasks/<task_id>")
+def get_task_status(task_id: str):
+    """
+    Возвращает статус и прогресс фоновой задачи.
+    """
+    task_data = dm.redis_manager.get_task_meta(task_id)
+    if not task_data:
+        return {"error": "Задача не найдена или истекло время жизни", "status": "not_found", "progress": 0}, 404
     return {
-        "token_used": dm.hh_client.access_token[:8] + "...",
-        "manager_id": manager_id,
-        "limits": simplified
+        "task_id": task_id,
+        "status": task_data.get("status", "in_progress"),
+        "progress": task_data.get("progress", 0),
+        "found": task_data.get("resume_count", 0),
+        "error": task_data.get("error"),
     }
 
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """Закрывает сессию БД потока, обработавшего запрос."""
+    ScopedSession.remove()
+
 @log_function_call
 @app.before_request
 def load_resume_limits():
-    try:
-        manager_id = dm.get_current_manager_id()
-        if manager_id:
-            limits = dm.get_resume_limits(manager_id)
-            g.resume_limits = limits
-        else:
-            g.resume_limits = {"error": "Нет ID менеджера"}
-    except Exception as e:
-        logger.warning(f"Не удалось загрузить лимиты: {e}")
-        g.resume_limits = {"error": "Ошибка загрузки лимитов"}
+    if request.endpoint == "static":
+        return
+    snapshot = dm.get_limits_snapshot()
+    g.resume_limits = snapshot or {"error": "Лимиты ещё не загружены"}
 
 @log_function_call
 @app.route("/api/resumes/<task_id>")
@@ -665,48 +741,32 @@ def get_resumes_json(task_id: str):
         except Exception:
             negotiation_map = None
 
-    responses = None
-    if source == "avito" and negotiation_map:
-        # Собираем все response_id и получаем отклики через DataManager
-        response_ids = list(negotiation_map.values())
-        # Получаем все отклики (responses) по этим ID
-        # Используем метод AvitoAPIClient.get_applications_by_ids
-        responses_data = None
-        if response_ids:
-            responses_data = dm.avito_client.get_applications_by_ids(response_ids)
-            responses = responses_data.get("applies", []) if responses_data else []
-
-    result = dm.get_task_resumes(task_id=task_id, offset=0, limit=1000, source=source, negotiation_map=negotiation_map, responses=responses)
+    # Страница ограничена по размеру, чтобы первая порция отдавалась быстро при любом размере задачи
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = min(max(1, request.args.get("limit", conf.RESUMES_PAGE_SIZE, type=int)), conf.RESUMES_PAGE_MAX)
+
+    task_data = redis_manager.get_task_meta(task_id)
+    if not task_data:
+        return {"error": "Задача не найдена или истекло время жизни", "items": [], "found": 0, "next_offset": None}, 404
+    description = task_data.get("description", "")
+    found = task_data.get("resume_count", 0)
+
+    # Отклики Avito get_task_resumes берёт из индекса откликов по ID.
+    # Список строится из краткой выдачи поиска: полные данные (/resumes/{id}) не запрашиваются
+    result = dm.get_task_resumes(task_id=task_id, offset=offset, limit=limit, source=source, negotiation_map=negotiation_map)
     resumes = result.get("items", [])
-    
-    # Получаем description из Redis
-    task_data = redis_manager.get_task_data(task_id)
-    description = task_data.get("description", "") if task_data else ""
+
+    # Запросов к модели здесь нет: берутся только уже рассчитанные оценки резюме с полными
+    # данными, остальные страница запрашивает отдельно через /api/resumes/<task_id>/scores
+    full_indexes = [index for index, resume in enumerate(resumes) if resume.get("tier") != "summary"]
+    cached_scores = match_cache.get_many(
+        [(candidate_experience(resumes[index]), description) for index in full_indexes]
+    ) if description else {}
+    matches = {full_indexes[position]: score for position, score in cached_scores.items()}
 
     processed_resumes = []
-    count=1
-    for resume in resumes:
-        candidate_exp = ""
-        exp_data = resume.get("experience", [])
-        if isinstance(exp_data, str):
-            try:
-                exp_data = json.loads(exp_data)
-            except json.JSONDecodeError:
-                exp_data = []
-        if exp_data:
-            for exp in exp_data:
-                if isinstance(exp, dict):
-                    desc = exp.get("description", "").strip()
-                    if desc:
-                        candidate_exp += desc + "\n"
-        if not candidate_exp:
-            candidate_exp = "Опыт работы не указан."
-
-        match_percent, match_reason = ai_evaluator.evaluate_candidate_match(
-            candidate_exp=candidate_exp,
-            vacancy_description=description
-        )
-        
+    for index, resume in enumerate(resumes):
+        match_percent, match_reason = matches.get(index, (None, None))
         if source == "hh":
             link = resume.get("alternate_url") or resume.get("link")
             if not link:
@@ -721,8 +781,6 @@ def get_resumes_json(task_id: str):
             link = f"{link}"
             total_experience_months = \
                                 resume.get("total_experience", {}).get("months", 0) if resume.get("total_experience") else 0
-        
-        count += 1
 
         processed_resumes.append({
             "id": resume.get("id"),
@@ -736,9 +794,39 @@ def get_resumes_json(task_id: str):
             "total_experience": total_experience_months,
             "match_percent": match_percent,
             "link": link,
+            "tier": resume.get("tier", "full"),
         })
 
-    return {"items": processed_resumes, "found": len(processed_resumes)}
+    next_offset = offset + limit if offset + limit < found else None
+    return {"items": processed_resumes, "found": found, "offset": offset, "next_offset": next_offset}
+
+@log_function_call
+@app.route("/api/resumes/<task_id>/scores", methods=["POST"])
+def score_resumes(task_id: str):
+    """
+    Оценивает соответствие выбранных резюме описанию задачи.
+    Полные данные резюме, которых ещё нет в кэше, загружаются из API только здесь.
+    """
+    data = request.get_json() or {}
+    # Объём работы одного запроса ограничен размером страницы, больше ID страница отправляет частями
+    resume_ids = [str(resume_id) for resume_id in data.get("resume_ids", [])][:conf.RESUMES_PAGE_MAX]
+    source = data.get("source", "hh")
+    if not resume_ids:
+        return {"error": "Не переданы resume_ids"}, 400
+
+    task_data = redis_manager.get_task_meta(task_id)
+    if not task_data:
+        return {"error": "Задача не найдена или истекло время жизни"}, 404
+    description = task_data.get("description", "")
+
+    resumes = dm.get_full_resumes(resume_ids, source=source)
+    matches = evaluation_engine.evaluate_many([candidate_experience(resume) for resume in resumes], description)
+    return {
+        "scores": {
+            str(resume.get("id")): {"match_percent": match_percent, "match_reason": match_reason}
+            for resume, (match_percent, match_reason) in zip(resumes, matches)
+        }
+    }
 
 @log_function_call
 @app.route("/api/read_negotiations", methods=["POST"])
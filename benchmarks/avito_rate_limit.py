@@ -0,0 +1,113 @@
+"""
+Бенчмарк: фиксированные паузы time.sleep(1.1) перед запросом и перед каждой попыткой
+(прежнее поведение AvitoAPIClient) против token bucket на stub-сервере Avito,
+который сам ограничивает частоту и отвечает 429 с Retry-After.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.avito_rate_limit --lookups 6 --rate 2 --burst 3
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import conf
+from utils.rate_limit import TokenBucket
+
+
+def make_handler(server_bucket: TokenBucket, stats: dict):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload: dict, headers: dict = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._send(200, {"access_token": "stub", "expires_in": 3600})
+
+        def do_GET(self):
+            # Сервер не ждёт, а сразу отказывает, если бюджет исчерпан
+            wait = server_bucket._reserve(1)
+            if wait > 0:
+                stats["rejected"] += 1
+                self._send(429, {"error": "rate limit"}, {"Retry-After": str(math.ceil(wait))})
+                return
+            stats["served"] += 1
+            resume_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+            self._send(200, {"id": resume_id, "title": "Повар", "url": f"/resume/{resume_id}"})
+
+    return Handler
+
+
+def start_stub(rate: float, burst: float):
+    stats = {"served": 0, "rejected": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(TokenBucket(rate, burst), stats))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def make_client(base_url: str, rate: float, burst: float, legacy: bool):
+    from api.avito.main import AvitoAPIClient
+
+    client = AvitoAPIClient()
+    client.token_url = f"{base_url}/token"
+    client.api_base_url = base_url
+    client.rate_limiter = TokenBucket(rate, burst)
+    if legacy:
+        # Воспроизводим прежние паузы: 1.1 с перед циклом и 1.1 с перед каждой попыткой
+        limiter_acquire = client.rate_limiter.acquire
+
+        def legacy_acquire(tokens=1):
+            time.sleep(2.2)
+            return limiter_acquire(tokens)
+
+        client.rate_limiter = TokenBucket(1000, 1000)
+        client.rate_limiter.acquire = legacy_acquire
+    return client
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение фиксированных пауз и token bucket для Avito API")
+    parser.add_argument("--lookups", type=int, default=6, help="Сколько резюме запросить")
+    parser.add_argument("--rate", type=float, default=2.0, help="Лимит stub-сервера, запросов в секунду")
+    parser.add_argument("--burst", type=float, default=3.0, help="Запас stub-сервера для всплеска")
+    args = parser.parse_args()
+
+    conf.RATE_LIMIT_BACKEND = "local"
+    scenarios = (
+        ("time.sleep(1.1) x2", True, args.rate),
+        ("token bucket", False, args.rate),
+        # Лимит клиента завышен — сервер отвечает 429, клиент подстраивается по Retry-After
+        ("token bucket, 429", False, args.rate * 5),
+    )
+    for name, legacy, client_rate in scenarios:
+        server, stats = start_stub(args.rate, args.burst)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        client = make_client(base_url, client_rate, args.burst, legacy)
+        client.get_access_token()
+
+        started = time.perf_counter()
+        for i in range(args.lookups):
+            client.resume(str(i))
+        elapsed = time.perf_counter() - started
+
+        print(f"{name:<20} {args.lookups} резюме за {elapsed:6.2f} с "
+              f"({elapsed / args.lookups:5.2f} с на резюме), отказов 429: {stats['rejected']}")
+        server.shutdown()
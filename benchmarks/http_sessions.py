@@ -0,0 +1,74 @@
+"""
+Бенчмарк: запросы через requests.get (новое соединение на каждый запрос)
+против общей сессии из utils.http (keep-alive пул) на локальном stub-сервере.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.http_sessions --requests 500 --threads 8
+"""
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import requests
+
+from utils import http
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело пишутся отдельно — без этого keep-alive упирается в delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({"items": [{"id": str(i)} for i in range(20)]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run(fetch, url: str, count: int, threads: int) -> list:
+    def timed(_):
+        started = time.perf_counter()
+        fetch(url).raise_for_status()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(timed, range(count)))
+
+
+def report(name: str, latencies: list, elapsed: float) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<22} всего {elapsed:6.2f} с | среднее {statistics.mean(latencies) * 1000:6.2f} мс | "
+          f"p95 {p95 * 1000:6.2f} мс | {len(latencies) / elapsed:7.1f} запр/с")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сравнение requests.get и пула сессий utils.http")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/resumes"
+
+    for name, fetch in (("requests.get", requests.get), ("utils.http (пул)", http.get)):
+        run(fetch, url, min(20, args.requests), args.threads)  # прогрев
+        started = time.perf_counter()
+        latencies = run(fetch, url, args.requests, args.threads)
+        report(name, latencies, time.perf_counter() - started)
+
+    server.shutdown()
@@ -24,6 +24,12 @@ class Config:
     REDIS_DB = int(os.getenv("REDIS_DB", "0"))
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
     REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "hh_app_")
+    # Сжатие значений кэша в Redis: zstd (при установленном zstandard), zlib или none
+    REDIS_COMPRESSION = os.getenv("REDIS_COMPRESSION", "zstd")
+    # Значения меньше этого размера (в байтах) сохраняются без сжатия
+    REDIS_COMPRESS_MIN_SIZE = int(os.getenv("REDIS_COMPRESS_MIN_SIZE", "512"))
+    # Период фоновой очистки устаревших задач в Redis (в секундах)
+    TASK_CLEANUP_INTERVAL = int(os.getenv("TASK_CLEANUP_INTERVAL", "3600"))
 
     # === PostgreSQL ===
     DB_NAME = os.getenv("DB_NAME")
@@ -53,6 +59,16 @@ class Config:
 
     # === DeepSeek AI ===
     DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
+    DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/chat/completions")
+    DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+    AI_TIMEOUT = int(os.getenv("AI_TIMEOUT", "15"))
+    AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
+    # Количество одновременных запросов к модели
+    AI_WORKERS = int(os.getenv("AI_WORKERS", "8"))
+    # Сколько кандидатов оценивать одним запросом (1 — по одному)
+    AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "1"))
+    # Время жизни закэшированной оценки в Redis (сек), по умолчанию 30 дней
+    AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", str(60 * 60 * 24 * 30)))
 
     # === Flask App ===
     SECRET_KEY = os.getenv("SECRET_KEY")
@@ -67,9 +83,67 @@ class Config:
 
     # === Лимиты и таймауты ===
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "15"))
+    # Таймаут установки соединения для HH, Avito и DeepSeek (сек)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    # Максимум keep-alive соединений в пуле на один хост
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+    # Повторы при сетевых ошибках и 502/503 (только GET)
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "5"))
     TTL_HOURS = int(os.getenv("TTL_HOURS", "48"))
 
+    # === Параллельная загрузка резюме ===
+    # Число одновременных запросов деталей резюме на один токен HH
+    HH_DETAIL_WORKERS_PER_TOKEN = int(os.getenv("HH_DETAIL_WORKERS_PER_TOKEN", "2"))
+    # Avito ограничивает частоту запросов, поэтому по умолчанию — один поток
+    AVITO_DETAIL_WORKERS = int(os.getenv("AVITO_DETAIL_WORKERS", "1"))
+    # Максимум одновременных запросов страниц поиска HH (1 — последовательная загрузка)
+    HH_PAGE_CONCURRENCY = int(os.getenv("HH_PAGE_CONCURRENCY", "4"))
+    # Число одновременных запросов страниц поиска на один токен HH
+    HH_PAGE_WORKERS_PER_TOKEN = int(os.getenv("HH_PAGE_WORKERS_PER_TOKEN", "2"))
+    # Ограничение частоты запросов к Avito API: запросов в секунду и запас для всплеска
+    AVITO_REQUESTS_PER_SECOND = float(os.getenv("AVITO_REQUESTS_PER_SECOND", "0.9"))
+    AVITO_BURST = float(os.getenv("AVITO_BURST", "3"))
+    # Отклики Avito: сколько ID запрашивать за раз, сколько пачек одновременно
+    # и через сколько секунд перезагружать индекс откликов за 30 дней
+    AVITO_APPLICATIONS_CHUNK = int(os.getenv("AVITO_APPLICATIONS_CHUNK", "100"))
+    AVITO_APPLICATION_WORKERS = int(os.getenv("AVITO_APPLICATION_WORKERS", "2"))
+    AVITO_APPLICATIONS_TTL = int(os.getenv("AVITO_APPLICATIONS_TTL", "300"))
+    # Где хранить состояние ограничителей: redis (общее для всех процессов) или local
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "redis")
+    # Количество поисков, выполняемых в фоне одновременно
+    SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))
+    # Количество выгрузок, формируемых в фоне одновременно
+    EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+    # Количество вакансий, обрабатываемых одновременно при обновлении кэша вакансий
+    VACANCY_REFRESH_WORKERS = int(os.getenv("VACANCY_REFRESH_WORKERS", "4"))
+    # Период инкрементальной синхронизации кэша вакансий и откликов (в секундах)
+    VACANCY_SYNC_INTERVAL = int(os.getenv("VACANCY_SYNC_INTERVAL", "300"))
+    # Время жизни блокировки обновления кэша вакансий (в секундах); пока обновление идёт, она продлевается
+    VACANCY_REFRESH_LOCK_TTL = int(os.getenv("VACANCY_REFRESH_LOCK_TTL", "120"))
+    # Сколько секунд полное обновление кэша вакансий ждёт завершения идущей синхронизации
+    VACANCY_FULL_REFRESH_WAIT = int(os.getenv("VACANCY_FULL_REFRESH_WAIT", "900"))
+    # Выгрузки с большим числом резюме формируются фоновой задачей с прогрессом
+    EXPORT_ASYNC_THRESHOLD = int(os.getenv("EXPORT_ASYNC_THRESHOLD", "1000"))
+    # Размер страницы /api/resumes по умолчанию и максимальный
+    RESUMES_PAGE_SIZE = int(os.getenv("RESUMES_PAGE_SIZE", "50"))
+    RESUMES_PAGE_MAX = int(os.getenv("RESUMES_PAGE_MAX", "100"))
+
+    # Период синхронизации лимитов просмотра резюме с HH (в секундах)
+    HH_LIMITS_SYNC_INTERVAL = int(os.getenv("HH_LIMITS_SYNC_INTERVAL", "300"))
+    # Время жизни ответов HH API в кэше по эндпоинтам (в секундах)
+    HH_CACHE_TTL_RESUME = int(os.getenv("HH_CACHE_TTL_RESUME", str(60 * 60 * 24)))
+    HH_CACHE_TTL_SEARCH = int(os.getenv("HH_CACHE_TTL_SEARCH", "300"))
+    HH_CACHE_TTL_VACANCIES = int(os.getenv("HH_CACHE_TTL_VACANCIES", "3600"))
+    HH_CACHE_TTL_NEGOTIATIONS = int(os.getenv("HH_CACHE_TTL_NEGOTIATIONS", "60"))
+    HH_CACHE_TTL_DICTIONARIES = int(os.getenv("HH_CACHE_TTL_DICTIONARIES", str(60 * 60 * 24 * 7)))
+    # Сколько ещё хранить устаревший ответ с ETag/Last-Modified для условной перепроверки
+    HH_CACHE_STALE_TTL = int(os.getenv("HH_CACHE_STALE_TTL", str(60 * 60 * 24 * 7)))
+    # На сколько секунд токен HH выводится из ротации после ответа 403/429
+    HH_TOKEN_COOLDOWN = int(os.getenv("HH_TOKEN_COOLDOWN", "60"))
+    # Период обновления снимка лимитов для шапки сайта и /api/limits (в секундах)
+    LIMITS_SNAPSHOT_INTERVAL = int(os.getenv("LIMITS_SNAPSHOT_INTERVAL", "60"))
+
     # === Вакансии ===
     DEFAULT_EMPLOYER_ID = int(os.getenv("DEFAULT_EMPLOYER_ID", "104309"))
 
@@ -0,0 +1,172 @@
+"""
+Хранилище откликов Avito.
+
+Avito отдаёт отклики не по вакансии, а сразу по всем вакансиям компании
+(ID за период + детали по списку ID). Хранилище загружает окно за последние
+30 дней один раз — пачками и параллельно — и индексирует отклики по vacancy_id
+и по ID отклика, чтобы все запросы по отдельным вакансиям обслуживались из индекса.
+
+Индекс заменяется только целиком: если хотя бы одна пачка не загрузилась,
+остаётся прежний индекс, а загрузка повторяется через REFRESH_RETRY_DELAY секунд.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from config import conf
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AvitoApplicationStore:
+    """
+    Индекс откликов Avito за последние window_days дней.
+
+    Attributes:
+        avito_client (AvitoAPIClient): Клиент Avito API.
+        window_days (int): Глубина окна загрузки откликов в днях.
+        ttl (int): Через сколько секунд индекс загружается заново.
+        chunk_size (int): Сколько ID откликов запрашивать за один вызов get_by_ids.
+        workers (int): Сколько пачек загружать одновременно.
+    """
+
+    REFRESH_RETRY_DELAY = 30
+
+    def __init__(
+        self,
+        avito_client,
+        window_days: int = 30,
+        ttl: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        workers: Optional[int] = None,
+    ):
+        self.avito_client = avito_client
+        self.window_days = window_days
+        self.ttl = conf.AVITO_APPLICATIONS_TTL if ttl is None else ttl
+        self.chunk_size = max(1, chunk_size or conf.AVITO_APPLICATIONS_CHUNK)
+        self.workers = max(1, workers or conf.AVITO_APPLICATION_WORKERS)
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_vacancy: Dict[str, List[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _window_start(self) -> str:
+        return (datetime.now() - timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+
+    def fetch_by_ids(self, application_ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Загружает детали откликов пачками по chunk_size, не более workers пачек одновременно.
+
+        Raises:
+            requests.RequestException: Если хотя бы одна пачка не загрузилась.
+        """
+        application_ids = list(application_ids)
+        chunks = [application_ids[i:i + self.chunk_size] for i in range(0, len(application_ids), self.chunk_size)]
+        if not chunks:
+            return []
+
+        def fetch(chunk):
+            return self.avito_client.get_applications_by_ids(chunk).get('applies', [])
+
+        if len(chunks) == 1 or self.workers == 1:
+            results = [fetch(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)), thread_name_prefix="avito-apps") as executor:
+                results = list(executor.map(fetch, chunks))
+        return [app for applies in results for app in applies]
+
+    def fetch_updated_since(self, updated_at_from: str) -> List[Dict[str, Any]]:
+        """
+        Загружает отклики по всем вакансиям, изменённые начиная с updated_at_from,
+        и обновляет ими индекс.
+
+        Raises:
+            requests.RequestException: Если отклики загрузились не полностью; индекс не меняется.
+        """
+        application_list = self.avito_client.get_application_ids(updated_at_from=updated_at_from).get('applies', [])
+        applications = self.fetch_by_ids(app['id'] for app in application_list)
+        with self._lock:
+            self._merge(applications)
+        return applications
+
+    def _merge(self, applications: List[Dict[str, Any]]) -> None:
+        for app in applications:
+            app_id = str(app.get('id'))
+            if app_id not in self._by_id:
+                self._by_vacancy.setdefault(str(app.get('vacancy_id')), []).append(app_id)
+            self._by_id[app_id] = app
+
+    def refresh(self) -> None:
+        """Загружает окно откликов заново и перестраивает индексы."""
+        application_list = self.avito_client.get_application_ids(updated_at_from=self._window_start()).get('applies', [])
+        applications = self.fetch_by_ids(app['id'] for app in application_list)
+        with self._lock:
+            self._by_id = {}
+            self._by_vacancy = {}
+            self._merge(applications)
+            self._loaded_at = time.monotonic()
+        logger.info(f"Индекс откликов Avito обновлён: {len(applications)} откликов")
+
+    def _is_stale(self) -> bool:
+        if time.monotonic() < self._retry_at:
+            return False
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_fresh(self) -> None:
+        # Окно загружает один поток, остальные ждут его результата
+        if not self._is_stale():
+            return
+        with self._refresh_lock:
+            if not self._is_stale():
+                return
+            try:
+                self.refresh()
+            except requests.exceptions.RequestException as e:
+                self._retry_at = time.monotonic() + self.REFRESH_RETRY_DELAY
+                logger.error(
+                    f"Индекс откликов Avito не обновлён, используется прежний "
+                    f"({len(self._by_id)} откликов): {e}"
+                )
+
+    def get_by_vacancy(self, vacancy_id, unread_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Возвращает отклики по вакансии.
+
+        Args:
+            vacancy_id: ID вакансии Avito.
+            unread_only (bool): Только непросмотренные отклики.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            applications = [self._by_id[app_id] for app_id in self._by_vacancy.get(str(vacancy_id), [])]
+        if unread_only:
+            applications = [app for app in applications if not app.get('is_viewed', False)]
+        return applications
+
+    def get_many(self, application_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает отклики по ID (ключи — строковые ID). Отклики, которых нет
+        в индексе (например, старше окна), догружаются по ID.
+        """
+        application_ids = [str(app_id) for app_id in application_ids]
+        with self._lock:
+            found = {app_id: self._by_id[app_id] for app_id in application_ids if app_id in self._by_id}
+        missing = [app_id for app_id in application_ids if app_id not in found]
+        if missing:
+            try:
+                fetched = self.fetch_by_ids(missing)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Не удалось загрузить {len(missing)} откликов Avito: {e}")
+                return found
+            with self._lock:
+                self._merge(fetched)
+            found.update({str(app.get('id')): app for app in fetched})
+        return found
@@ -5,15 +5,19 @@
 """
 
 import csv
+import io
 import json
-from typing import List, Dict, Any, Optional
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from pathlib import Path
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
 from redis_manager import redis_manager
 from data_manager.resume_processor import ResumeProcessor
 from database.repository import ResumeRepository
-from database.session import get_db
+from database.session import ScopedSession
 from utils.logger import setup_logger
 from estaffbot.estaff import EStaffBot 
 
@@ -25,14 +29,21 @@ class Exporter:
     """
     Базовый класс для экспорта резюме в различные форматы.
 
+    Данные читаются и записываются построчно, поэтому data может быть генератором:
+    память не растёт с количеством резюме.
+
     Attributes:
-        data (list): Список резюме для экспорта.
+        data (Iterable[dict]): Резюме для экспорта (список или генератор).
         resume_repo (ResumeRepository): Репозиторий для работы с БД.
     """
 
-    def __init__(self, data: List[Dict[str, Any]] = None):
+    FIELDNAMES = ["ID", "ФИО", "Возраст", "Город", "Должность", "Зарплата", "Опыт", "Соответствие (%)", "Ссылка"]
+    MIMETYPE = "application/octet-stream"
+    EXTENSION = ""
+
+    def __init__(self, data: Optional[Iterable[Dict[str, Any]]] = None):
         self.data = data or []
-        self.resume_repo = ResumeRepository(next(get_db()))
+        self.resume_repo = ResumeRepository(ScopedSession)
 
     def load_from_cache(self, task_id: str) -> None:
         """
@@ -46,245 +57,266 @@ class Exporter:
             logger.warning(f"Задача {task_id} не найдена или истекло время жизни")
             return
 
-        items = []
-        for resume_id in resume_ids:
-            cached = self._get_cached_resume(resume_id)
-            if cached:
-                items.append(cached)
+        self.data = self._get_cached_resumes(resume_ids)
 
-        self.data = items
-
-    def _get_cached_resume(self, resume_id: str) -> Optional[Dict[str, Any]]:
+    def _get_cached_resumes(self, resume_ids: List[str]) -> List[Dict[str, Any]]:
         """
-        Получает резюме из кэша или из БД.
+        Получает обработанные резюме из Redis одним MGET, недостающие — из БД
+        одним запросом, и сохраняет их в Redis одним конвейером.
 
         Args:
-            resume_id (str): ID резюме.
+            resume_ids (list[str]): ID резюме.
 
         Returns:
-            dict | None: Обработанные данные резюме.
+            list[dict]: Обработанные данные резюме в исходном порядке.
         """
-        # Попробуем получить из Redis
-        cache_key = f"processed_resume:{resume_id}"
-        cached = redis_manager.client.get(cache_key)
-        if cached:
-            try:
-                return json.loads(cached)
-            except Exception as e:
-                logger.warning(f"Не удалось расшифровать кэш {cache_key}: {e}")
-
-        # Если нет — получаем из БД
-        resume_url = f"https://hh.ru/resume/{resume_id}" 
-        db_resume = self.resume_repo.get_by_link(resume_url)
-        if not db_resume:
-            logger.warning(f"Резюме {resume_id} не найдено в БД")
-            return None
-
-        # Обрабатываем и сохраняем в кэш
+        keys = {resume_id: f"processed_resume:{resume_id}" for resume_id in resume_ids}
+        cached = redis_manager.get_many(list(keys.values()))
+        found = {resume_id: cached[key] for resume_id, key in keys.items() if key in cached}
+
+        missing = [resume_id for resume_id in resume_ids if resume_id not in found]
+        to_cache = {}
+        if missing:
+            db_resumes = {str(r.id): r for r in self.resume_repo.get_many(source="hh", resume_ids=missing)}
+            for resume_id in missing:
+                db_resume = db_resumes.get(str(resume_id))
+                if not db_resume:
+                    logger.warning(f"Резюме {resume_id} не найдено в БД")
+                    continue
+                try:
+                    processed = ResumeProcessor(db_resume.__dict__, use_cache=False).process()
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке резюме {resume_id}: {e}")
+                    continue
+                found[resume_id] = processed
+                to_cache[keys[resume_id]] = processed
+
         try:
-            processed = ResumeProcessor(db_resume.__dict__).process()
-            redis_manager.client.setex(cache_key, 86400, json.dumps(processed))
-            return processed
+            redis_manager.set_many(to_cache, ResumeProcessor.CACHE_TTL)
         except Exception as e:
-            logger.error(f"Ошибка при обработке резюме {resume_id}: {e}")
-            return None
+            logger.warning(f"Не удалось сохранить резюме в Redis: {e}")
 
-    def prepare_data(self) -> List[Dict[str, Any]]:
+        return [found[resume_id] for resume_id in resume_ids if resume_id in found]
+
+    def iter_rows(self) -> Iterator[Dict[str, str]]:
         """
-        Подготавливает данные для экспорта — оставляет только нужные поля,
+        Построчно подготавливает данные для экспорта — оставляет только нужные поля,
         корректно обрабатывает зарплату и город, вместо пустого значения ставит "—".
+
+        Yields:
+            dict: Запись с колонками FIELDNAMES.
         """
-        result = []
         for item in self.data:
-            # --- Опыт работы ---
-            experience = item.get("experience", "")
-            experience_text = ""
+            yield self._simplify(item)
 
-            if isinstance(experience, str):
-                try:
-                    # Попробуем распарсить JSON, если это возможно
-                    parsed_exp = json.loads(experience)
-                    if isinstance(parsed_exp, list):
-                        experience = parsed_exp
-                    else:
-                        experience = []
-                except json.JSONDecodeError:
-                    experience = []
+    def prepare_data(self) -> List[Dict[str, Any]]:
+        """
+        Подготавливает все данные для экспорта списком (см. iter_rows).
+        """
+        return list(self.iter_rows())
 
-            if isinstance(experience, list):
-                for exp in experience:
-                    if isinstance(exp, dict):
-                        company = exp.get("company", "").strip()
-                        position = exp.get("position", "").strip()
-                        description = exp.get("description", "").strip()
-
-                        if company or position or description:
-                            experience_text += f"Компания: {company}\n"
-                            experience_text += f"Должность: {position}\n"
-                            experience_text += f"Описание: {description}\n\n"
-
-            # --- ФИО ---
-            full_name = f"{item.get('first_name', '')} {item.get('last_name', '')}".strip()
-
-            # --- Город ---
-            area = item.get("area", None)
-            city = "—"
-            if isinstance(area, dict):
-                city = area.get("name", "—").strip()
-            elif isinstance(area, str):
-                try:
-                    area_dict = json.loads(area)
-                    if isinstance(area_dict, dict):
-                        city = area_dict.get("name", "—").strip()
-                except json.JSONDecodeError:
-                    pass
-
-            # --- Зарплата ---
-            salary_data = item.get("salary", None)
-            salary = "—"
-            if isinstance(salary_data, dict):
-                amount = salary_data.get("amount")
-                currency = salary_data.get("currency")
-                if amount is not None and currency:
-                    salary = f"{amount} {currency}"
-            elif isinstance(salary_data, str) and salary_data.strip():
-                try:
-                    salary_dict = json.loads(salary_data)
-                    if isinstance(salary_dict, dict):
-                        amount = salary_dict.get("amount")
-                        currency = salary_dict.get("currency")
-                        if amount is not None and currency:
-                            salary = f"{amount} {currency}"
-                except json.JSONDecodeError:
-                    pass
-
-            # --- Возраст ---
-            age = str(item.get("age", "")).strip() or "—"
-
-            # --- Должность ---
-            title = str(item.get("title", "")).strip() or "—"
-
-            # --- Ссылка на резюме ---
-            link = (item.get("link") or "").strip()
-
-            # --- Соответствие (%) ---
-            match_percent = str(item.get("match_percent", "")).strip() or "—"
-
-            # --- Формируем запись ---
-            simplified = {
-                "ID": str(item.get("id", "")).strip() or "—",
-                "ФИО": full_name or "—",
-                "Возраст": age,
-                "Город": city,
-                "Должность": title,
-                "Зарплата": salary,
-                "Опыт": experience_text.strip(),
-                "Соответствие (%)": match_percent,
-                "Ссылка": link,
-            }
-
-            result.append(simplified)
-        return result
+    @staticmethod
+    def _simplify(item: Dict[str, Any]) -> Dict[str, str]:
+        """Приводит резюме к записи с колонками FIELDNAMES."""
+        # --- Опыт работы ---
+        experience = item.get("experience", "")
+        experience_text = ""
 
-    def save(self, path: str) -> None:
+        if isinstance(experience, str):
+            try:
+                # Попробуем распарсить JSON, если это возможно
+                parsed_exp = json.loads(experience)
+                if isinstance(parsed_exp, list):
+                    experience = parsed_exp
+                else:
+                    experience = []
+            except json.JSONDecodeError:
+                experience = []
+
+        if isinstance(experience, list):
+            for exp in experience:
+                if isinstance(exp, dict):
+                    company = exp.get("company", "").strip()
+                    position = exp.get("position", "").strip()
+                    description = exp.get("description", "").strip()
+
+                    if company or position or description:
+                        experience_text += f"Компания: {company}\n"
+                        experience_text += f"Должность: {position}\n"
+                        experience_text += f"Описание: {description}\n\n"
+
+        # --- ФИО ---
+        full_name = f"{item.get('first_name', '')} {item.get('last_name', '')}".strip()
+
+        # --- Город ---
+        area = item.get("area", None)
+        city = "—"
+        if isinstance(area, dict):
+            city = area.get("name", "—").strip()
+        elif isinstance(area, str):
+            try:
+                area_dict = json.loads(area)
+                if isinstance(area_dict, dict):
+                    city = area_dict.get("name", "—").strip()
+            except json.JSONDecodeError:
+                pass
+
+        # --- Зарплата ---
+        salary_data = item.get("salary", None)
+        salary = "—"
+        if isinstance(salary_data, dict):
+            amount = salary_data.get("amount")
+            currency = salary_data.get("currency")
+            if amount is not None and currency:
+                salary = f"{amount} {currency}"
+        elif isinstance(salary_data, str) and salary_data.strip():
+            try:
+                salary_dict = json.loads(salary_data)
+                if isinstance(salary_dict, dict):
+                    amount = salary_dict.get("amount")
+                    currency = salary_dict.get("currency")
+                    if amount is not None and currency:
+                        salary = f"{amount} {currency}"
+            except json.JSONDecodeError:
+                pass
+
+        # --- Возраст ---
+        age = str(item.get("age", "")).strip() or "—"
+
+        # --- Должность ---
+        title = str(item.get("title", "")).strip() or "—"
+
+        # --- Ссылка на резюме ---
+        link = (item.get("link") or "").strip()
+
+        # --- Соответствие (%) ---
+        match_percent = str(item.get("match_percent", "")).strip() or "—"
+
+        # --- Формируем запись ---
+        return {
+            "ID": str(item.get("id", "")).strip() or "—",
+            "ФИО": full_name or "—",
+            "Возраст": age,
+            "Город": city,
+            "Должность": title,
+            "Зарплата": salary,
+            "Опыт": experience_text.strip(),
+            "Соответствие (%)": match_percent,
+            "Ссылка": link,
+        }
+
+    def stream(self) -> Iterator[bytes]:
         """
-        Сохраняет данные в файл. Должен быть реализован в дочернем классе.
-
-        Args:
-            path (str): Путь к файлу.
+        Отдаёт содержимое файла по частям. Должен быть реализован в дочернем классе.
         """
         raise NotImplementedError("Метод должен быть реализован в дочернем классе")
 
-
-class CSVExporter(Exporter):
-    """
-    Экспортирует резюме в формат CSV.
-    """
-
     def save(self, path: str) -> None:
         """
-        Сохраняет данные в CSV-файл.
+        Сохраняет данные в файл.
 
         Args:
             path (str): Путь к файлу.
         """
-        data = self.prepare_data()
-        if not data:
-            logger.warning("Нет данных для экспорта в CSV")
-            return
-
-        fieldnames = data[0].keys() if data else []
-
         file_path = Path(path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            with open(file_path, mode="w", encoding="utf-8", newline="", errors="replace") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
-            logger.info(f"CSV-файл успешно сохранён: {file_path}")
+            with open(file_path, mode="wb") as f:
+                for chunk in self.stream():
+                    f.write(chunk)
+            logger.info(f"Файл экспорта успешно сохранён: {file_path}")
         except Exception as e:
-            logger.error(f"Ошибка при сохранении CSV: {e}")
+            logger.error(f"Ошибка при сохранении файла экспорта: {e}")
             raise
 
 
-class XLSXExporter(Exporter):
+class CSVExporter(Exporter):
     """
-    Экспортирует резюме в формат Excel (XLSX).
+    Экспортирует резюме в формат CSV.
     """
 
-    def save(self, path: str) -> None:
+    MIMETYPE = "text/csv; charset=utf-8"
+    EXTENSION = "csv"
+    CHUNK_ROWS = 200
+
+    def stream(self) -> Iterator[bytes]:
         """
-        Сохраняет данные в XLSX-файл.
+        Отдаёт CSV по частям: строки кодируются и отдаются пачками по CHUNK_ROWS.
 
-        Args:
-            path (str): Путь к файлу.
+        Yields:
+            bytes: Очередная часть файла в UTF-8.
         """
-        data = self.prepare_data()
-        if not data:
-            logger.warning("Нет данных для экспорта в Excel")
-            return
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.FIELDNAMES)
+        writer.writeheader()
+        for index, row in enumerate(self.iter_rows(), start=1):
+            writer.writerow(row)
+            if index % self.CHUNK_ROWS == 0:
+                yield buffer.getvalue().encode("utf-8", errors="replace")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8", errors="replace")
 
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Резюме"
-
-        # Заголовки
-        headers = list(data[0].keys())
-        ws.append(headers)
-        ws.row_dimensions[1].font = Font(bold=True)
-        for col in ws.columns:
-            for cell in col:
-                cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-
-        # Данные
-        for row in data:
-            ws.append([str(value) if not isinstance(value, list) else ", ".join(value) for value in row.values()])
-
-        # Автоподбор ширины колонок
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            ws.column_dimensions[column].width = min(adjusted_width, 50)
-
-        # Сохранение
-        file_path = Path(path)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        try:
-            wb.save(file_path)
-            logger.info(f"XLSX-файл успешно сохранён: {file_path}")
-        except Exception as e:
-            logger.error(f"Ошибка при сохранении XLSX: {e}")
-            raise
+class XLSXExporter(Exporter):
+    """
+    Экспортирует резюме в формат Excel (XLSX).
+
+    Используется write-only книга openpyxl: строки не хранятся в памяти целиком.
+    Ширина колонок подбирается за один проход по заголовку и первым SAMPLE_ROWS
+    строкам, так как в write-only режиме её нужно задать до записи данных.
+    """
+
+    MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    EXTENSION = "xlsx"
+    SAMPLE_ROWS = 200
+    MAX_COLUMN_WIDTH = 50
+    CHUNK_SIZE = 64 * 1024
+
+    def _column_widths(self, rows: List[Dict[str, str]]) -> List[int]:
+        widths = [len(header) for header in self.FIELDNAMES]
+        for row in rows:
+            for index, header in enumerate(self.FIELDNAMES):
+                widths[index] = max(widths[index], len(row[header]))
+        return [min(width + 2, self.MAX_COLUMN_WIDTH) for width in widths]
+
+    def stream(self) -> Iterator[bytes]:
+        """
+        Формирует XLSX и отдаёт его по частям, не создавая файла на диске.
+
+        Yields:
+            bytes: Очередная часть файла.
+        """
+        rows = self.iter_rows()
+        sample = list(islice(rows, self.SAMPLE_ROWS))
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Резюме")
+        for index, width in enumerate(self._column_widths(sample), start=1):
+            ws.column_dimensions[get_column_letter(index)].width = width
+
+        header_font = Font(bold=True)
+        header_alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+        header = []
+        for title in self.FIELDNAMES:
+            cell = WriteOnlyCell(ws, value=title)
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header.append(cell)
+        ws.append(header)
+
+        for row in chain(sample, rows):
+            ws.append([row[header] for header in self.FIELDNAMES])
+
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
 
 class EStaffExporter:
     def __init__():
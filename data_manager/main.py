@@ -4,15 +4,21 @@
 Содержит класс DataManager — точку входа для всех операций с данными.
 """
 
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from api.hh.main import HHApiClient
+import requests
+from api.hh.main import HHApiClient, parse_hh_datetime
 from api.avito.main import AvitoAPIClient
+from ai import match_cache, candidate_experience
 from data_manager.resume_processor import ResumeProcessor
 from data_manager.search_engine import SearchEngine
+from data_manager.vacancy_cache import RefreshLock, VacancyCacheStore
 from database.repository import ResumeRepository
 from redis_manager import RedisManager
-from database.session import get_db
+from database.session import ScopedSession
+from config import conf
 from utils.logger import setup_logger
 from threading import Thread
 
@@ -28,14 +34,32 @@ class DataManager:
         search_engine (SearchEngine): Логика поиска и кэширования.
         resume_repo (ResumeRepository): Работа с резюме в базе данных.
         redis_manager (RedisManager): Для хранения задач и прогресса.
+        search_executor (ThreadPoolExecutor): Пул фоновых поисков.
+        export_executor (ThreadPoolExecutor): Пул фоновых выгрузок.
+        vacancies_cache (VacancyCacheStore): Кэш вакансий HH с курсорами синхронизации.
+        vacancies_cache_avito (VacancyCacheStore): Кэш вакансий Avito с курсорами синхронизации.
     """
 
+    LIMITS_SNAPSHOT_KEY = "resume_limits_snapshot"
+    VACANCIES_CACHE_KEY = "cached_company_vacancies"
+    VACANCIES_CACHE_TTL = 60 * 60 * 24  # 24 часа
+    VACANCIES_REFRESH_KEY = "cached_company_vacancies_refresh"
+    VACANCIES_REFRESH_LOCK_KEY = "cached_company_vacancies_refresh_lock"
+    VACANCIES_AVITO_CACHE_KEY = "cached_company_vacancies_avito"
+    VACANCIES_AVITO_REFRESH_LOCK_KEY = "cached_company_vacancies_avito_refresh_lock"
+
     def __init__(self):
         self.hh_client = HHApiClient()
         self.avito_client = AvitoAPIClient()
         self.search_engine = SearchEngine(self.hh_client)
-        self.resume_repo = ResumeRepository(next(get_db()))
+        self.resume_repo = ResumeRepository(ScopedSession)
         self.redis_manager = RedisManager()
+        self.search_executor = ThreadPoolExecutor(max_workers=conf.SEARCH_WORKERS, thread_name_prefix="search")
+        self.export_executor = ThreadPoolExecutor(max_workers=conf.EXPORT_WORKERS, thread_name_prefix="export")
+        self.vacancies_cache = VacancyCacheStore(self.redis_manager, self.VACANCIES_CACHE_KEY, self.VACANCIES_CACHE_TTL)
+        self.vacancies_cache_avito = VacancyCacheStore(
+            self.redis_manager, self.VACANCIES_AVITO_CACHE_KEY, self.VACANCIES_CACHE_TTL
+        )
 
     def search_resumes(
     self,
@@ -73,58 +97,88 @@ class DataManager:
     labels: Optional[List[str]] = None,
 ) -> str:
         """
-        Синхронно выполняет поиск резюме и сохраняет результаты.
-        Возвращает task_id для последующего получения результата.
+        Ставит поиск резюме в фоновый пул и сразу возвращает task_id.
+        Прогресс задачи обновляется после каждой загруженной страницы,
+        по завершении в задачу записываются ID найденных резюме.
         """
         task_id = self.redis_manager.create_task([], description=description)
+        self.redis_manager.update_task_progress(task_id, 0, "queued")
+
+        search_kwargs = dict(
+            keywords=keywords,
+            source=source,
+            region=region,
+            total=total,
+            per_page=per_page,
+            # Параметры текстового поиска
+            text_logic=text_logic,
+            text_field=text_field,
+            text_period=text_period,
+            # Параметры зарплаты
+            salary_from=salary_from,
+            salary_to=salary_to,
+            currency=currency,
+            # Параметры фильтрации
+            age_from=age_from,
+            age_to=age_to,
+            experience=experience,
+            education_levels=education_levels,
+            employment=employment,
+            schedule=schedule,
+            gender=gender,
+            job_search_status=job_search_status,
+            # Параметры дат
+            period=period,
+            date_from=date_from,
+            date_to=date_to,
+            # Параметры переезда
+            relocation=relocation,
+            # Дополнительные фильтры
+            order_by=order_by,
+            labels=labels,
+        )
+        self.search_executor.submit(self._run_search, task_id, search_kwargs)
+        return task_id
+
+    def _run_search(self, task_id: str, search_kwargs: Dict[str, Any]) -> None:
+        """
+        Выполняет поиск в фоновом потоке и записывает результат в задачу.
 
+        Args:
+            task_id (str): ID задачи.
+            search_kwargs (dict): Параметры SearchEngine.search.
+        """
+        def report_page(loaded: int, total: int) -> None:
+            # 100% выставляется только после сохранения результата
+            percent = min(99, int(loaded * 100 / total)) if total else 0
+            self.redis_manager.update_task_progress(task_id, percent, "searching")
+
+        self.redis_manager.update_task_progress(task_id, 0, "searching")
         try:
-            resumes = self.search_engine.search(
-                keywords=keywords,
-                source=source,
-                region=region,
-                total=total,
-                per_page=per_page,
-                # Параметры текстового поиска
-                text_logic=text_logic,
-                text_field=text_field,
-                text_period=text_period,
-                # Параметры зарплаты
-                salary_from=salary_from,
-                salary_to=salary_to,
-                currency=currency,
-                # Параметры фильтрации
-                age_from=age_from,
-                age_to=age_to,
-                experience=experience,
-                education_levels=education_levels,
-                employment=employment,
-                schedule=schedule,
-                gender=gender,
-                job_search_status=job_search_status,
-                # Параметры дат
-                period=period,
-                date_from=date_from,
-                date_to=date_to,
-                # Параметры переезда
-                relocation=relocation,
-                # Дополнительные фильтры
-                order_by=order_by,
-                labels=labels,
-            )
+            resumes = self.search_engine.search(on_page=report_page, **search_kwargs)
             if not isinstance(resumes, list):
                 logger.error("Ошибка поиска: ожидался список резюме")
                 resumes = []
 
             resume_ids = [r.get("id") for r in resumes if r.get("id")]
+            # Краткие данные из выдачи сохраняются с задачей: по ним строится список кандидатов
+            source = search_kwargs.get("source", "hh")
+            self.redis_manager.set_task_summaries(task_id, {
+                str(r["id"]): self.search_engine.summarize_resume(r, source) for r in resumes if r.get("id")
+            })
             self.redis_manager.update_task_resume_ids(task_id, resume_ids)
             self.redis_manager.update_task_progress(task_id, 100, "completed")
+        except ValueError as e:
+            logger.warning(f"Ошибка валидации параметров поиска: {e}")
+            self.redis_manager.update_task_progress(task_id, 0, "failed", error=str(e))
         except Exception as e:
-            logger.error(f"Ошибка при выполнении поиска: {e}")
-            self.redis_manager.update_task_progress(task_id, 0, "failed")
-            raise  # Перебрасываем ошибку, чтобы Flask мог обработать её
-
-        return task_id
+            logger.error(f"Ошибка при выполнении поиска: {e}", exc_info=True)
+            self.redis_manager.update_task_progress(
+                task_id, 0, "failed", error="Произошла ошибка при выполнении поиска"
+            )
+        finally:
+            # Поток пула переиспользуется: сессия БД этого поиска закрывается
+            ScopedSession.remove()
 
     def get_task_resumes(
         self,
@@ -134,16 +188,21 @@ class DataManager:
         source: str = "hh",  # Возможные значения: 'hh' или 'avito'
         negotiation_map: Optional[Dict[str, str]] = None,
         responses: Optional[List[Dict[str, Any]]] = None,
+        detail: str = "summary",
     ) -> Dict[str, Any]:
         """
         Возвращает список резюме по task_id.
+        detail="summary" — для списка кандидатов: полные данные берутся только из кэша БД,
+        остальные резюме — из краткой выдачи поиска, сохранённой с задачей (без запросов
+        /resumes/{id}); detail="full" — полные данные всех резюме страницы.
         Для Avito:
-          - если есть negotiation_map и responses — формирует список только из responses (отклики)
+          - если есть negotiation_map — формирует список только из откликов; отклики берутся
+            из responses, а если они не переданы — из индекса откликов Avito по ID
           - иначе — ищет резюме по id (поиск по ключевым словам)
         Для HH — прежняя логика.
         """
-        task_data = self.redis_manager.get_task_data(task_id)
-        if not task_data or "resume_ids" not in task_data:
+        paginated_ids = self.redis_manager.get_task_resume_ids(task_id, offset=offset, limit=limit)
+        if paginated_ids is None:
             logger.warning(f"Задача {task_id} не найдена или просрочена")
             return {
                 "error": "Задача не найдена или истекло время жизни",
@@ -151,26 +210,26 @@ class DataManager:
                 "items": []
             }
 
-        resume_ids = task_data["resume_ids"]
-        found = len(resume_ids)
-        paginated_ids = resume_ids[offset:offset + limit]
-
         items = []
-        count = 1
 
         # --- AVITO: если есть negotiation_map и responses — только из откликов ---
-        if source == "avito" and negotiation_map and responses:
+        if source == "avito" and negotiation_map:
+            page_response_ids = [negotiation_map[str(r_id)] for r_id in paginated_ids if str(r_id) in negotiation_map]
+            if responses is not None:
+                responses_by_id = {str(r.get("id")): r for r in responses}
+            else:
+                responses_by_id = self.search_engine.avito_applications.get_many(page_response_ids)
             logger.info(f"AVITO DEBUG: режим откликов (responses)")
-            logger.info(f"AVITO DEBUG: resume_ids={resume_ids}")
+            logger.info(f"AVITO DEBUG: resume_ids={paginated_ids}")
             logger.info(f"AVITO DEBUG: negotiation_map={negotiation_map}")
-            logger.info(f"AVITO DEBUG: responses count={len(responses)}")
+            logger.info(f"AVITO DEBUG: responses count={len(responses_by_id)}")
             for resume_id in paginated_ids:
                 str_resume_id = str(resume_id)
                 if str_resume_id not in negotiation_map:
                     logger.warning(f"AVITO DEBUG: resume_id {str_resume_id} not in negotiation_map")
                     continue
                 response_id = negotiation_map[str_resume_id]
-                response = next((r for r in responses if r.get("id") == response_id), None)
+                response = responses_by_id.get(str(response_id))
                 if not response:
                     logger.warning(f"AVITO DEBUG: response_id {response_id} not found in responses")
                     continue
@@ -212,53 +271,19 @@ class DataManager:
                 "task_id": task_id
             }
 
-        # --- HH и Avito-поиск по ключевым словам (старая логика) ---
-        for resume_id in paginated_ids:
-            str_resume_id = str(resume_id)
-            if str_resume_id.startswith("hh_"):
-                current_source = "hh"
-                clean_id = str_resume_id.replace("hh_", "")
-            elif str_resume_id.startswith("avito_"):
-                current_source = "avito"
-                clean_id = str_resume_id.replace("avito_", "")
-            else:
-                current_source = source
-                clean_id = str_resume_id
-
-            logger.info(f"Обрабатываем резюме ID: {clean_id}, источник: {current_source} — {count}/{len(paginated_ids)}")
-            count = count + 1
-
-            # Проверяем кэш
-            cached_resume = self.search_engine.get_cached_resume(clean_id, source=current_source)
-            if cached_resume:
-                items.append(cached_resume)
-                continue
-
-            # Загружаем полные данные в зависимости от источника
-            full_resume = None
-            if current_source == "hh":
-                full_resume = self.hh_client.get_resume_details(clean_id)
-            elif current_source == "avito":
-                full_resume = self.avito_client.resume(clean_id)
-                # Форматируем зарплату, если есть
-                if full_resume and 'salary' in full_resume:
-                    full_resume['salary'] = self.avito_client.format_salary(full_resume['salary'])
-                if full_resume:
-                    params = full_resume.get("params", {})
-                    experience = params.get("experience", 0) if params else 0
-                    full_resume['total_experience'] = {'months': experience * 12}
-                    full_resume['link'] = f"{full_resume.get('url', '')}" #avito.ru
-            else:
-                logger.warning(f"Неизвестный источник резюме: {current_source}")
-                continue
-
-            if not full_resume:
-                logger.warning(f"Не удалось получить полные данные резюме {clean_id} ({current_source})")
-                continue
-            
-            # Сохраняем в кэш и добавляем в результаты
-            self.search_engine.save_to_cache(full_resume, source=current_source)
-            items.append(full_resume)
+        # --- HH и Avito-поиск по ключевым словам ---
+        refs = [self.search_engine.split_resume_id(resume_id, default_source=source) for resume_id in paginated_ids]
+        if detail == "summary":
+            items = self.search_engine.resolve_resume_list(
+                refs,
+                self.redis_manager.get_task_summaries(task_id, [resume_id for resume_id, _ in refs]),
+                on_progress=self._make_progress_reporter(task_id),
+            )
+        else:
+            items = self.search_engine.resolve_resumes(
+                refs,
+                on_progress=self._make_progress_reporter(task_id),
+            )
 
         return {
             "found": len(items),
@@ -266,6 +291,33 @@ class DataManager:
             "task_id": task_id
         }
 
+    def _make_progress_reporter(self, task_id: str, step: int = 5):
+        """
+        Создаёт колбэк для отчёта о прогрессе загрузки резюме страницы результатов.
+
+        Прогресс записывается в поле details_progress задачи (статус поиска не меняется)
+        и только при изменении не менее чем на step процентов, чтобы не перезаписывать
+        задачу на каждое резюме.
+
+        Args:
+            task_id (str): ID задачи.
+            step (int): Минимальный шаг изменения прогресса в процентах.
+
+        Returns:
+            callable: Функция on_progress(done, total).
+        """
+        last_reported = {"percent": -step}
+
+        def report(done: int, total: int) -> None:
+            percent = int(done * 100 / total) if total else 100
+            if done >= total:
+                self.redis_manager.update_task_details_progress(task_id, 100)
+            elif percent - last_reported["percent"] >= step:
+                last_reported["percent"] = percent
+                self.redis_manager.update_task_details_progress(task_id, percent)
+
+        return report
+
     def start_company_vacancies_task(self) -> str:
         """
         Запускает фоновую задачу получения вакансий компании.
@@ -357,17 +409,154 @@ class DataManager:
         """
         return self.search_engine.get_cached_resume(resume_id)
 
-    def export_resumes(self, task_id: str) -> List[Dict[str, Any]]:
+    def get_full_resumes(self, resume_ids: List[str], source: str = "hh") -> List[Dict[str, Any]]:
+        """
+        Возвращает полные данные резюме: из кэша БД, недостающие — из API источника.
+        Используется там, где краткой выдачи недостаточно (AI-оценка, экспорт).
+        """
+        refs = [self.search_engine.split_resume_id(resume_id, default_source=source) for resume_id in resume_ids]
+        return self.search_engine.resolve_resumes(refs)
+
+    def export_resumes(
+        self,
+        task_id: str,
+        resume_ids: Optional[List[str]] = None,
+        source: str = "hh",
+    ) -> List[Dict[str, Any]]:
+        """
+        Подготавливает список резюме для экспорта из кэша (БД) одним запросом на источник.
+        Экспорт не загружает резюме из API и не тратит просмотры: резюме без полных данных
+        в результат не попадают.
+
+        Args:
+            task_id (str): ID задачи.
+            resume_ids (list[str] | None): Выбранные резюме; по умолчанию — все резюме задачи.
+            source (str): Источник задачи для ID без префикса ("hh" или "avito").
+
+        Returns:
+            list[dict]: Найденные резюме в порядке resume_ids.
+        """
+        if resume_ids is None:
+            resume_ids = self.redis_manager.get_task_resume_ids(task_id) or []
+        refs = [self.search_engine.split_resume_id(resume_id, default_source=source) for resume_id in resume_ids]
+        return self.search_engine.resolve_resumes(refs, fetch_missing=False)
+
+    def build_export_rows(
+        self,
+        task_id: str,
+        rows: List[Dict[str, Any]],
+        source: str = "hh",
+    ) -> List[Dict[str, Any]]:
+        """
+        Дополняет строки списка кандидатов полными данными резюме из БД
+        и уже рассчитанными оценками соответствия.
+
+        Args:
+            task_id (str): ID задачи поиска.
+            rows (list[dict]): Выбранные строки списка (с полем id).
+            source (str): Источник задачи.
+
+        Returns:
+            list[dict]: Строки для экспортёра в исходном порядке.
+        """
+        resume_ids = [row.get("id") for row in rows if row.get("id")]
+        full_resumes = {str(r["id"]): r for r in self.export_resumes(task_id, resume_ids=resume_ids, source=source)}
+        merged = []
+        for row in rows:
+            # В строках Avito ID с префиксом источника ("avito_123"), в БД — без него
+            clean_id = self.search_engine.split_resume_id(row.get("id"), default_source=source)[0]
+            merged.append({**row, **full_resumes.get(clean_id, {}), "id": row.get("id")})
+        rows = merged
+        self.fill_cached_match_scores(task_id, rows)
+        return rows
+
+    def fill_cached_match_scores(self, task_id: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Дополняет строки экспорта уже рассчитанными оценками соответствия из кэша AI-оценок.
+        Новые запросы к модели не выполняются.
+        """
+        missing = [row for row in rows if row.get("match_percent") in (None, "", "—")]
+        if not missing:
+            return
+        task_data = self.redis_manager.get_task_meta(task_id)
+        description = task_data.get("description", "") if task_data else ""
+        if not description:
+            return
+        scores = match_cache.get_many([(candidate_experience(row), description) for row in missing])
+        for index, (match_percent, _) in scores.items():
+            missing[index]["match_percent"] = match_percent
+
+    @staticmethod
+    def export_file_path(task_id: str, format: str) -> str:
+        """Возвращает путь к файлу, сформированному фоновой задачей экспорта."""
+        return os.path.abspath(os.path.join(conf.OUTPUT_DIR, "exports", f"{task_id}.{format}"))
+
+    def start_export_task(
+        self,
+        exporter_class,
+        search_task_id: str,
+        rows: List[Dict[str, Any]],
+        source: str = "hh",
+        description: str = "",
+    ) -> str:
         """
-        Подготавливает список резюме для экспорта.
+        Ставит экспорт в фоновый пул и сразу возвращает task_id.
+        Данные резюме и оценки подбираются уже в фоне (build_export_rows);
+        готовый файл доступен по export_file_path(task_id, exporter_class.EXTENSION).
+
+        Args:
+            exporter_class (type[Exporter]): Класс экспортёра.
+            search_task_id (str): ID задачи поиска, из которой выгружаются резюме.
+            rows (list[dict]): Выбранные строки списка кандидатов.
+            source (str): Источник задачи поиска.
+            description (str): Описание задачи.
+
+        Returns:
+            str: task_id новой задачи.
         """
-        resume_ids = self.redis_manager.get_task_resume_ids(task_id)
-        results = []
-        for resume_id in resume_ids or []:
-            resume = self.get_resume(resume_id)
-            if resume:
-                results.append(resume)
-        return results
+        task_id = self.redis_manager.create_task(description=description)
+        self.redis_manager.update_task_progress(task_id, 0, "queued")
+        self.export_executor.submit(self._run_export, task_id, exporter_class, search_task_id, rows, source)
+        return task_id
+
+    def _run_export(
+        self,
+        task_id: str,
+        exporter_class,
+        search_task_id: str,
+        rows: List[Dict[str, Any]],
+        source: str,
+        step: int = 5,
+    ) -> None:
+        """
+        Подбирает данные резюме и записывает файл экспорта в фоновом потоке,
+        обновляя прогресс задачи.
+        """
+        def counted(rows):
+            total = len(rows)
+            last_reported = -step
+            for done, row in enumerate(rows, start=1):
+                yield row
+                # 100% выставляется только после записи файла
+                percent = min(99, int(done * 100 / total)) if total else 0
+                if percent - last_reported >= step:
+                    last_reported = percent
+                    self.redis_manager.update_task_progress(task_id, percent, "exporting")
+
+        self.redis_manager.update_task_progress(task_id, 0, "preparing")
+        try:
+            exporter = exporter_class(data=counted(self.build_export_rows(search_task_id, rows, source)))
+            self.redis_manager.update_task_progress(task_id, 0, "exporting")
+            exporter.save(self.export_file_path(task_id, exporter.EXTENSION))
+            self.redis_manager.update_task_progress(task_id, 100, "completed")
+        except Exception as e:
+            logger.error(f"Ошибка при формировании файла экспорта: {e}", exc_info=True)
+            self.redis_manager.update_task_progress(
+                task_id, 0, "failed", error="Произошла ошибка при формировании файла экспорта"
+            )
+        finally:
+            # Поток пула переиспользуется: сессия БД этой выгрузки закрывается
+            ScopedSession.remove()
 
     def get_current_manager(self) -> Dict[str, Any]:
         """
@@ -387,67 +576,266 @@ class DataManager:
         Получает лимиты просмотра резюме у менеджера.
         """
         return self.hh_client.get_resume_limits(manager_id)
+
+    def refresh_limits_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Обновляет снимок лимитов просмотра резюме в Redis.
+        Вызывается фоновой задачей APScheduler каждые LIMITS_SNAPSHOT_INTERVAL секунд.
+
+        Данные берутся из ResumeLimitTracker: запрос к HH выполняется только
+        если подошло время синхронизации, иначе используется локальный счётчик.
+        """
+        tracker = self.hh_client.limit_tracker
+        try:
+            state = tracker.get_state()
+            if tracker.is_sync_due(state):
+                state = tracker.sync()
+        except Exception as e:
+            logger.warning(f"Не удалось обновить лимиты просмотра резюме: {e}")
+            return None
+
+        if not state:
+            return None
+
+        snapshot = {
+            "token_used": (self.hh_client.access_token or "")[:8] + "...",
+            "manager_id": state.get("manager_id"),
+            "limits": {
+                "used": state.get("spent", 0),
+                "total": state.get("limit", 0),
+                "left": max(0, state.get("left", 0)),
+            },
+            "tokens": self.hh_client.token_pool.stats(),
+            "updated_at": datetime.now().isoformat(),
+        }
+        # Короткий TTL: если фоновая задача остановится, устаревшие лимиты не будут показываться долго
+        self.redis_manager.set_value(self.LIMITS_SNAPSHOT_KEY, snapshot, conf.LIMITS_SNAPSHOT_INTERVAL * 2)
+        return snapshot
+
+    def get_limits_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает последний снимок лимитов из Redis без обращения к HH.
+        """
+        try:
+            return self.redis_manager.get_value(self.LIMITS_SNAPSHOT_KEY)
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать снимок лимитов: {e}")
+            return None
     
     def read_negotiations(self, negotiation_ids: List[int]) -> bool:
         """
         Помечает список откликов как прочитанные.
         """
-        return self.search_engine.read_negotiations(negotiation_ids)
+        success = self.search_engine.read_negotiations(negotiation_ids)
+        if success:
+            self._forget_unread(self.vacancies_cache, negotiation_ids)
+        return success
 
-    def update_vacancies_cache(self):
+    def _forget_unread(self, store: VacancyCacheStore, negotiation_ids: List[Any]) -> None:
         """
-        Обновляет кэш вакансий в Redis.
-        Вызывается ежедневно в 8:00 через APScheduler.
+        Убирает прочитанные отклики из счётчиков непрочитанных в кэше вакансий,
+        не дожидаясь следующей синхронизации.
         """
-        logger.info("Начинаем фоновое обновление кэша вакансий...")
-
-        raw_vacancies = self.get_company_vacancies()
+        read_ids = {str(n_id) for n_id in negotiation_ids}
+        rows = store.get_rows_by_id()
+        patched_rows, patched_cursors = {}, {}
+        for v_id, cursor in store.get_cursors().items():
+            unread = set(cursor.get("unread", []))
+            if not unread & read_ids:
+                continue
+            unread -= read_ids
+            patched_cursors[v_id] = {**cursor, "unread": sorted(unread)}
+            if v_id in rows:
+                patched_rows[v_id] = {**rows[v_id], "responses_unread": len(unread)}
+        store.patch(patched_rows, patched_cursors)
+
+    @staticmethod
+    def _latest_negotiation(negotiations: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Возвращает отклик с наибольшим updated_at."""
+        dated = [n for n in negotiations if parse_hh_datetime(n.get("updated_at"))]
+        return max(dated, key=lambda n: parse_hh_datetime(n["updated_at"]), default=None)
+
+    def _sync_vacancy(
+        self,
+        vacancy_summary: Dict[str, Any],
+        position: int,
+        cursor: Optional[Dict[str, Any]] = None,
+        previous_row: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Формирует строку кэша одной вакансии и её новый курсор синхронизации.
 
-        if not isinstance(raw_vacancies, list):
-            logger.error(f"Ожидается список вакансий, получено: {type(raw_vacancies)}")
-            return {"error": "Неверный формат данных от HH"}
+        Без курсора загружаются детали вакансии и все отклики. С курсором детали
+        запрашиваются, только если вакансия изменилась (другой updated_at/published_at),
+        а отклики — только изменённые после updated_at из курсора.
 
-        vacancy_list = []
-        for i, v in enumerate(raw_vacancies, start=1):
-            if not isinstance(v, dict):
-                logger.warning(f"Найден неверный элемент: {v!r}")
-                continue
+        Returns:
+            tuple: (строка вакансии, курсор).
+        """
+        v_id = str(vacancy_summary.get("id"))
+        fingerprint = vacancy_summary.get("updated_at") or vacancy_summary.get("published_at")
 
-            v_id = v.get("id")
+        if cursor is None or previous_row is None or cursor.get("fingerprint") != fingerprint:
             vacancy = self.get_vacancy_by_id(v_id)
-            negotiations = self.get_negotiations_by_vacancy(v_id)
-            city = vacancy.get("address", {}).get("city", "") if vacancy else ""
+            city = (vacancy.get("address") or {}).get("city", "") if vacancy else ""
+        else:
+            city = previous_row.get("city", "")
 
+        if cursor is None:
+            negotiations = self.get_negotiations_by_vacancy(v_id)
             total = len(negotiations)
-            unread = sum(1 for n in negotiations if n.get("has_updates", False))
-
-            vacancy_list.append({
-                "title": v.get("name", "Без названия"),
-                "id": v_id,
-                "city": city,
-                "responses_total": total,
-                "responses_unread": unread,
-                "url": v.get("alternate_url", "#")
-            })
+            unread = set()
+            latest = None
+        else:
+            delta = self.search_engine.get_negotiations_updated_since(v_id, cursor.get("updated_at"))
+            negotiations = delta.get("items", [])
+            total = delta.get("found", cursor.get("total", 0))
+            unread = set(cursor.get("unread", []))
+            latest = {"id": cursor.get("last_negotiation_id"), "updated_at": cursor.get("updated_at")}
+
+        for n in negotiations:
+            if n.get("has_updates", False):
+                unread.add(str(n.get("id")))
+            else:
+                unread.discard(str(n.get("id")))
+        latest = self._latest_negotiation(negotiations + ([latest] if latest else [])) or latest
+
+        row = {
+            "title": vacancy_summary.get("name", "Без названия"),
+            "id": v_id,
+            "city": city,
+            "responses_total": total,
+            "responses_unread": len(unread),
+            "url": vacancy_summary.get("alternate_url", "#"),
+            "position": position,
+        }
+        new_cursor = {
+            "fingerprint": fingerprint,
+            "updated_at": latest.get("updated_at") if latest else None,
+            "last_negotiation_id": latest.get("id") if latest else None,
+            "total": total,
+            "unread": sorted(unread),
+        }
+        return row, new_cursor
 
-        # Сохраняем в Redis под фиксированным ключом
-        cache_key = "cached_company_vacancies"
-        self.redis_manager.client.setex(cache_key, 60 * 60 * 24, json.dumps(vacancy_list, ensure_ascii=False))  # TTL: 24 часа
-        logger.info(f"Кэш вакансий обновлён: {len(vacancy_list)} вакансий сохранено в Redis.")
+    def get_cached_vacancies(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Возвращает вакансии HH из кэша (None — кэш ещё не заполнен).
+        """
+        return self.vacancies_cache.get_rows()
+
+    def get_vacancies_refresh_status(self) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает ход текущего обновления кэша вакансий ({"done", "total"}) или None.
+        """
+        return self.redis_manager.get_value(self.VACANCIES_REFRESH_KEY)
+
+    def start_vacancies_cache_refresh(self) -> None:
+        """
+        Запускает обновление кэша вакансий в фоновом потоке, не блокируя вызывающий код.
+        """
+        Thread(target=self.update_vacancies_cache, name="vacancies-refresh", daemon=True).start()
+
+    def sync_vacancies_cache(self):
+        """
+        Инкрементально синхронизирует кэш вакансий HH.
+        Вызывается каждые conf.VACANCY_SYNC_INTERVAL секунд через APScheduler.
+        """
+        return self.update_vacancies_cache(full=False)
+
+    def update_vacancies_cache(self, full: bool = True):
+        """
+        Обновляет кэш вакансий в Redis.
+        Полное обновление (full=True) вызывается ежедневно в 8:00 через APScheduler
+        и пересчитывает все вакансии заново; инкрементальное (full=False) использует
+        сохранённые курсоры и загружает только изменения.
+
+        Вакансии обрабатываются параллельно (не более conf.VACANCY_REFRESH_WORKERS
+        одновременно); ошибка по одной вакансии не прерывает обновление — для неё
+        остаются прежние данные. Изменившиеся вакансии записываются в Redis
+        по мере готовности, поэтому страница вакансий заполняется постепенно.
+        """
+        # Обновления не выполняются одновременно (в этом или другом процессе): синхронизация
+        # пропускается до следующего запуска, а полное обновление дожидается блокировки
+        lock = RefreshLock(self.redis_manager.client, self.VACANCIES_REFRESH_LOCK_KEY, conf.VACANCY_REFRESH_LOCK_TTL)
+        if not lock.acquire(wait=conf.VACANCY_FULL_REFRESH_WAIT if full else 0):
+            if full:
+                logger.error(
+                    f"Полное обновление кэша вакансий не запущено: другое обновление "
+                    f"не завершилось за {conf.VACANCY_FULL_REFRESH_WAIT} сек."
+                )
+            else:
+                logger.info("Обновление кэша вакансий уже выполняется")
+            return
+
+        try:
+            logger.info("Начинаем полное обновление кэша вакансий..." if full else "Синхронизируем кэш вакансий...")
+
+            raw_vacancies = self.get_company_vacancies()
+
+            if not isinstance(raw_vacancies, list):
+                logger.error(f"Ожидается список вакансий, получено: {type(raw_vacancies)}")
+                return {"error": "Неверный формат данных от HH"}
+
+            summaries = []
+            for v in raw_vacancies:
+                if not isinstance(v, dict):
+                    logger.warning(f"Найден неверный элемент: {v!r}")
+                    continue
+                summaries.append(v)
+
+            store = self.vacancies_cache
+            previous_rows = store.get_rows_by_id()
+            cursors = {} if full else store.get_cursors()
+            order = [str(v.get("id")) for v in summaries]
+            rows: Dict[str, Dict[str, Any]] = {}
+            new_cursors: Dict[str, Dict[str, Any]] = {}
+            total = len(summaries)
+            publish_every = max(1, total // 20)
+            failed = 0
+            changed = 0
+
+            def publish(done: int) -> None:
+                nonlocal changed
+                changed += store.patch(rows, new_cursors)
+                rows.clear()
+                new_cursors.clear()
+                if full:
+                    self.redis_manager.set_value(
+                        self.VACANCIES_REFRESH_KEY, {"done": done, "total": total}, self.VACANCIES_CACHE_TTL
+                    )
+
+            with ThreadPoolExecutor(max_workers=max(1, conf.VACANCY_REFRESH_WORKERS), thread_name_prefix="vacancy") as executor:
+                futures = {
+                    executor.submit(self._sync_vacancy, v, position, cursors.get(v_id), previous_rows.get(v_id)): v_id
+                    for position, (v_id, v) in enumerate(zip(order, summaries))
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    v_id = futures[future]
+                    try:
+                        rows[v_id], new_cursors[v_id] = future.result()
+                    except Exception as e:
+                        failed += 1
+                        logger.warning(f"Не удалось обновить вакансию {v_id}: {e}")
+                    if done % publish_every == 0 and done < total:
+                        publish(done)
+
+            publish(total)
+            removed = store.retain(order)
+            store.mark_synced()
+            self.redis_manager.client.delete(self.VACANCIES_REFRESH_KEY)
+            logger.info(
+                f"Кэш вакансий обновлён: {total} вакансий, изменено {changed}, удалено {removed}, ошибок: {failed}."
+            )
+        finally:
+            lock.release()
     
     # --- Методы для работы с вакансиями Avito ---
     def get_company_vacancies_avito(self) -> List[Dict[str, Any]]:
         """
         Получает список вакансий компании из кэша Avito.
         """
-        cache_key = "cached_company_vacancies_avito"
-        data = self.redis_manager.client.get(cache_key)
-        if data:
-            if isinstance(data, bytes):
-                return json.loads(data.decode('utf-8'))
-            else:
-                return json.loads(data)
-        return []
+        return self.vacancies_cache_avito.get_rows() or []
     
     def get_vacancy_by_id_avito(self, vacancy_id: int) -> Dict[str, Any]:
         """Получает вакансию по ID через Avito API."""
@@ -502,53 +890,99 @@ class DataManager:
         Помечает список откликов как прочитанные через Avito API.
         """
         result = self.search_engine.read_negotiations_avito(vacancy_id, response_ids)
-        return result.get("success", False) if isinstance(result, dict) else False
+        success = result.get("success", False) if isinstance(result, dict) else False
+        if success:
+            self._forget_unread(self.vacancies_cache_avito, response_ids)
+        return success
     
-    def update_vacancies_cache_avito(self):
+    def update_vacancies_cache_avito(self, full: bool = True):
         """
         Обновляет кэш вакансий Avito в Redis.
-        Вызывается ежедневно в 8:00 через APScheduler.
-        """
-        logger.info("Начинаем фоновое обновление кэша вакансий Avito...")
+        Полное обновление вызывается ежедневно в 8:00 через APScheduler и учитывает
+        отклики за последние 30 дней; инкрементальное (full=False) запрашивает только
+        отклики, изменённые с даты прошлой синхронизации.
+        """
+        lock = RefreshLock(self.redis_manager.client, self.VACANCIES_AVITO_REFRESH_LOCK_KEY, conf.VACANCY_REFRESH_LOCK_TTL)
+        if not lock.acquire(wait=conf.VACANCY_FULL_REFRESH_WAIT if full else 0):
+            if full:
+                logger.error(
+                    f"Полное обновление кэша вакансий Avito не запущено: другое обновление "
+                    f"не завершилось за {conf.VACANCY_FULL_REFRESH_WAIT} сек."
+                )
+            else:
+                logger.info("Обновление кэша вакансий Avito уже выполняется")
+            return
 
-        raw_vacancies = self.search_engine.avito_client.get_vacancies()
+        try:
+            logger.info("Начинаем полное обновление кэша вакансий Avito..." if full else "Синхронизируем кэш вакансий Avito...")
 
-        if not isinstance(raw_vacancies, dict):
-            logger.error(f"Ожидается словарь вакансий Avito, получено: {type(raw_vacancies)}")
-            return {"error": "Неверный формат данных от Avito"}
+            raw_vacancies = self.search_engine.avito_client.get_vacancies()
 
-        vacancy_list = []
-        items = raw_vacancies.get("resources", [])  # Используем 'resources' вместо 'items'
-        
-        for i, v in enumerate(items, start=1):
-            if not isinstance(v, dict):
-                logger.warning(f"Найден неверный элемент: {v!r}")
-                continue
+            if not isinstance(raw_vacancies, dict):
+                logger.error(f"Ожидается словарь вакансий Avito, получено: {type(raw_vacancies)}")
+                return {"error": "Неверный формат данных от Avito"}
 
-            v_id = v.get("id")
-            
-            # Получаем отклики для этой вакансии
-            negotiations = self.get_negotiations_by_vacancy_avito(v_id)
-            items_neg = negotiations  # negotiations уже список
-            
-            # Адаптируем под структуру данных Avito
-            city = v.get("address", "") if v else ""
-            title = v.get("title", "Без названия")
-            url = v.get("url", "#")
-
-            total = len(items_neg)
-            unread = sum(1 for n in items_neg if not n.get("is_viewed", False))
-
-            vacancy_list.append({
-                "title": title,
-                "id": v_id,
-                "city": city,
-                "responses_total": total,
-                "responses_unread": unread,
-                "url": url
-            })
+            store = self.vacancies_cache_avito
+            state = None if full else store.get_state()
+            cursors = store.get_cursors() if state else {}
+            sync_started = datetime.now().strftime('%Y-%m-%d')
+            updated_at_from = (state or {}).get("updated_at_from") or (
+                datetime.now() - timedelta(days=30)
+            ).strftime('%Y-%m-%d')
+
+            # Одним запросом получаем отклики по всем вакансиям, изменённые с прошлой синхронизации
+            # Если отклики загрузились не полностью, курсоры не сдвигаются и синхронизация повторится
+            try:
+                updated_applications = self.search_engine.get_applications_updated_since_avito(updated_at_from)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Не удалось загрузить отклики Avito, кэш вакансий Avito не обновлён: {e}")
+                return
+            applications_by_vacancy: Dict[str, List[Dict[str, Any]]] = {}
+            for app in updated_applications:
+                applications_by_vacancy.setdefault(str(app.get("vacancy_id")), []).append(app)
+
+            rows: Dict[str, Dict[str, Any]] = {}
+            new_cursors: Dict[str, Dict[str, Any]] = {}
+            items = raw_vacancies.get("resources", [])  # Используем 'resources' вместо 'items'
+
+            for position, v in enumerate(items):
+                if not isinstance(v, dict):
+                    logger.warning(f"Найден неверный элемент: {v!r}")
+                    continue
 
-        # Сохраняем в Redis под фиксированным ключом
-        cache_key = "cached_company_vacancies_avito"
-        self.redis_manager.client.setex(cache_key, 60 * 60 * 24, json.dumps(vacancy_list, ensure_ascii=False))  # TTL: 24 часа
-        logger.info(f"Кэш вакансий Avito обновлён: {len(vacancy_list)} вакансий сохранено в Redis.")
\ No newline at end of file
+                v_id = str(v.get("id"))
+                cursor = cursors.get(v_id, {})
+                applications = set(cursor.get("applications", []))
+                unread = set(cursor.get("unread", []))
+                for app in applications_by_vacancy.get(v_id, []):
+                    app_id = str(app.get("id"))
+                    applications.add(app_id)
+                    if app.get("is_viewed", False):
+                        unread.discard(app_id)
+                    else:
+                        unread.add(app_id)
+
+                rows[v_id] = {
+                    "title": v.get("title", "Без названия"),
+                    "id": v.get("id"),
+                    "city": v.get("address", ""),
+                    "responses_total": len(applications),
+                    "responses_unread": len(unread),
+                    "url": v.get("url", "#"),
+                    "position": position,
+                }
+                new_cursors[v_id] = {"applications": sorted(applications), "unread": sorted(unread)}
+
+            changed = store.patch(rows, new_cursors)
+            removed = store.retain(rows)
+            store.mark_synced(updated_at_from=sync_started)
+            logger.info(f"Кэш вакансий Avito обновлён: {len(rows)} вакансий, изменено {changed}, удалено {removed}.")
+        finally:
+            lock.release()
+
+    def sync_vacancies_cache_avito(self):
+        """
+        Инкрементально синхронизирует кэш вакансий Avito.
+        Вызывается каждые conf.VACANCY_SYNC_INTERVAL секунд через APScheduler.
+        """
+        return self.update_vacancies_cache_avito(full=False)
@@ -40,10 +40,10 @@ class ResumeProcessor:
             return None
 
         cache_key = self._make_cache_key(resume_id)
-        cached = redis_manager.client.get(cache_key)
+        cached = redis_manager.get_value(cache_key)
         if cached:
             logger.debug(f"Резюме {resume_id} взято из Redis-кэша")
-            return json.loads(cached)
+            return cached
         return None
 
     def _save_processed_resume(self, processed_data: Dict[str, Any]) -> None:
@@ -55,7 +55,7 @@ class ResumeProcessor:
         cache_key = self._make_cache_key(resume_id)
 
         try:
-            redis_manager.client.setex(cache_key, self.cache_ttl, json.dumps(processed_data))
+            redis_manager.set_value(cache_key, processed_data, self.cache_ttl)
             logger.debug(f"Резюме {resume_id} сохранено в Redis")
         except Exception as e:
             logger.warning(f"Не удалось сохранить резюме в Redis: {e}")
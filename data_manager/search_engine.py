@@ -5,12 +5,14 @@
 """
 
 import json
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime, timedelta
 
 from database.repository import ResumeRepository
-from database.session import get_db
+from database.session import ScopedSession
 from data_manager.resume_processor import ResumeProcessor
+from data_manager.avito_applications import AvitoApplicationStore
 from api.hh.main import HHApiClient
 from api.avito.main import AvitoAPIClient
 from utils.logger import setup_logger
@@ -27,13 +29,19 @@ class SearchEngine:
     Attributes:
         hh_client (HHApiClient): Клиент для обращения к HeadHunter API.
         resume_repo (ResumeRepository): Репозиторий для работы с БД.
+        avito_applications (AvitoApplicationStore): Индекс откликов Avito.
         ttl_hours (int): Время жизни кэшированного резюме.
     """
 
+    # Уровни данных резюме: краткие данные из выдачи поиска и полные данные из /resumes/{id}
+    SUMMARY_TIER = "summary"
+    FULL_TIER = "full"
+
     def __init__(self, hh_client: Optional[HHApiClient] = None, avito_client: Optional[AvitoAPIClient] = None):
         self.hh_client = hh_client or HHApiClient()
         self.avito_client = avito_client or AvitoAPIClient()
-        self.resume_repo = ResumeRepository(db=next(get_db()))
+        self.avito_applications = AvitoApplicationStore(self.avito_client)
+        self.resume_repo = ResumeRepository(db=ScopedSession)
         self.ttl_hours = 48  # Значение из config.conf.TTL_HOURS
 
     def check_cache(self, resume_id: str, source: str = "hh") -> bool:
@@ -63,7 +71,6 @@ class SearchEngine:
         Returns:
             dict | None: Резюме из кэша или None.
         """
-        resume_url = f"https://hh.ru/resume/{resume_id}" 
         cached = self.resume_repo.get_by_source_and_resume_id(source=source, resume_id=str(resume_id))
         if not cached:
             return None
@@ -72,6 +79,25 @@ class SearchEngine:
             return None
         return self._format_cached_resume(cached)
 
+    def get_cached_resumes(self, resume_ids: List[str], source: str = "hh") -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает актуальные резюме из кэша (БД) по списку ID одним запросом.
+
+        Args:
+            resume_ids (list[str]): ID резюме.
+            source (str): Источник ("hh" или "avito").
+
+        Returns:
+            dict[str, dict]: Резюме из кэша по их ID. Отсутствующие и устаревшие не попадают в результат.
+        """
+        cached = {}
+        for db_resume in self.resume_repo.get_many(source=source, resume_ids=resume_ids):
+            if not self.is_cache_valid(db_resume):
+                logger.debug(f"Резюме {db_resume.id} ({source}) устарело")
+                continue
+            cached[str(db_resume.id)] = self._format_cached_resume(db_resume)
+        return cached
+
     def is_cache_valid(self, resume: Any) -> bool:
         """
         Проверяет, истёк ли срок жизни резюме.
@@ -94,12 +120,15 @@ class SearchEngine:
             logger.warning("Резюме без ID не может быть сохранено")
             return
 
-        if self.resume_repo.resume_exists(resume_data["id"], source):
-            logger.debug(f"Резюме {resume_data['id']} ({source}) уже существует в БД. Пропускаем сохранение.")
-            return
+        self.save_many_to_cache([resume_data], source=source)
 
+    def save_many_to_cache(self, resumes: List[Dict[str, Any]], source: str = "hh") -> None:
+        """
+        Сохраняет пачку резюме в БД одним upsert-запросом.
+        Существующие записи обновляются вместе с received_at.
+        """
         try:
-            self.resume_repo.create_resume(resume_data, source)
+            self.resume_repo.upsert_many(resumes, source)
         except Exception as e:
             logger.error(f"Ошибка при сохранении резюме в БД: {e}")
 
@@ -129,6 +158,280 @@ class SearchEngine:
             "source": db_resume.source,
         }
 
+    @staticmethod
+    def split_resume_id(resume_id: Any, default_source: str = "hh") -> Tuple[str, str]:
+        """
+        Разбирает ID резюме с префиксом источника ("hh_123", "avito_456").
+
+        Args:
+            resume_id: ID резюме из задачи.
+            default_source (str): Источник для ID без префикса.
+
+        Returns:
+            tuple[str, str]: Чистый ID и источник.
+        """
+        str_resume_id = str(resume_id)
+        if str_resume_id.startswith("hh_"):
+            return str_resume_id.replace("hh_", "", 1), "hh"
+        if str_resume_id.startswith("avito_"):
+            return str_resume_id.replace("avito_", "", 1), "avito"
+        return str_resume_id, default_source
+
+    @classmethod
+    def summarize_resume(cls, item: Dict[str, Any], source: str = "hh") -> Dict[str, Any]:
+        """
+        Оставляет из элемента выдачи поиска поля, нужные для списка кандидатов.
+
+        Args:
+            item (dict): Резюме из выдачи поиска HH или Avito.
+            source (str): Источник ("hh" или "avito").
+
+        Returns:
+            dict: Краткие данные резюме (tier = "summary").
+        """
+        if source == "avito":
+            params = item.get("params") or {}
+            experience = params.get("experience")
+            return {
+                "id": item.get("id"),
+                "title": item.get("title"),
+                "age": params.get("age"),
+                "area": params.get("address"),
+                "salary": item.get("salary"),
+                "total_experience": {"months": experience * 12} if isinstance(experience, (int, float)) else None,
+                "link": item.get("url"),
+                "source": source,
+                "tier": cls.SUMMARY_TIER,
+            }
+
+        return {
+            "id": item.get("id"),
+            "title": item.get("title"),
+            "first_name": item.get("first_name"),
+            "last_name": item.get("last_name"),
+            "middle_name": item.get("middle_name"),
+            "age": item.get("age"),
+            "area": item.get("area"),
+            "salary": item.get("salary"),
+            "total_experience": item.get("total_experience"),
+            "alternate_url": item.get("alternate_url"),
+            # Как у полных данных из БД: ссылка на резюме HH — alternate_url
+            "link": item.get("alternate_url"),
+            "source": source,
+            "tier": cls.SUMMARY_TIER,
+        }
+
+    def load_full_resume(self, resume_id: str, source: str = "hh") -> Optional[Dict[str, Any]]:
+        """
+        Загружает полные данные резюме из API источника и приводит их к общему виду.
+
+        Args:
+            resume_id (str): ID резюме без префикса.
+            source (str): Источник ("hh" или "avito").
+
+        Returns:
+            dict | None: Полные данные резюме или None.
+        """
+        if source == "hh":
+            return self.hh_client.get_resume_details(resume_id)
+
+        if source == "avito":
+            full_resume = self.avito_client.resume(resume_id)
+            if not full_resume or not full_resume.get("id"):
+                return None
+            # Форматируем зарплату, если есть
+            if 'salary' in full_resume:
+                full_resume['salary'] = self.avito_client.format_salary(full_resume['salary'])
+            params = full_resume.get("params", {})
+            experience = params.get("experience", 0) if params else 0
+            full_resume['total_experience'] = {'months': (experience or 0) * 12}
+            full_resume['link'] = f"{full_resume.get('url', '')}" #avito.ru
+            return full_resume
+
+        logger.warning(f"Неизвестный источник резюме: {source}")
+        return None
+
+    def _load_full_resume_in_worker(self, resume_id: str, source: str) -> Optional[Dict[str, Any]]:
+        """Вызывает load_full_resume в потоке пула и закрывает сессию БД этого потока."""
+        try:
+            return self.load_full_resume(resume_id, source)
+        finally:
+            ScopedSession.remove()
+
+    def fetch_resume_details(
+        self,
+        refs: List[Tuple[str, str]],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Параллельно загружает полные данные резюме из API.
+
+        Для каждого источника создаётся свой пул потоков: для HH его размер
+        зависит от количества токенов, для Avito задаётся отдельно,
+        чтобы не превышать ограничения API.
+
+        Args:
+            refs (list[tuple[str, str]]): Пары (ID резюме, источник).
+            on_progress (callable | None): Вызывается как on_progress(done, total)
+                после каждого завершённого запроса.
+
+        Returns:
+            list[dict | None]: Результаты в исходном порядке refs.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(refs)
+        if not refs:
+            return results
+
+        pool_sizes = {
+            "hh": max(1, conf.HH_DETAIL_WORKERS_PER_TOKEN * max(1, len(conf.HH_ACCESS_TOKENS))),
+            "avito": max(1, conf.AVITO_DETAIL_WORKERS),
+        }
+        executors: Dict[str, ThreadPoolExecutor] = {}
+        futures = {}
+
+        try:
+            for index, (resume_id, source) in enumerate(refs):
+                if source not in pool_sizes:
+                    logger.warning(f"Неизвестный источник резюме: {source}")
+                    continue
+                executor = executors.get(source)
+                if executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=pool_sizes[source],
+                        thread_name_prefix=f"resume-{source}",
+                    )
+                    executors[source] = executor
+                futures[executor.submit(self._load_full_resume_in_worker, resume_id, source)] = index
+
+            total = len(futures)
+            done = 0
+            for future in as_completed(futures):
+                index = futures[future]
+                resume_id, source = refs[index]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    logger.error(f"Ошибка при загрузке резюме {resume_id} ({source}): {e}")
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def resolve_resumes(
+        self,
+        refs: List[Tuple[str, str]],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        fetch_missing: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает резюме по списку (ID, источник): из кэша БД, а недостающие —
+        параллельно из API с последующим сохранением в кэш.
+
+        Args:
+            refs (list[tuple[str, str]]): Пары (ID резюме, источник).
+            on_progress (callable | None): Колбэк прогресса загрузки из API.
+            fetch_missing (bool): Загружать ли из API резюме, которых нет в кэше.
+                При False возвращаются только резюме из кэша.
+
+        Returns:
+            list[dict]: Найденные резюме в исходном порядке.
+        """
+        slots: List[Optional[Dict[str, Any]]] = [None] * len(refs)
+        missing = []
+
+        # Один запрос к БД на каждый источник вместо запроса на каждое резюме
+        ids_by_source: Dict[str, List[str]] = {}
+        for resume_id, source in refs:
+            ids_by_source.setdefault(source, []).append(resume_id)
+        cached_by_source = {
+            source: self.get_cached_resumes(ids, source=source)
+            for source, ids in ids_by_source.items()
+        }
+
+        for index, (resume_id, source) in enumerate(refs):
+            cached_resume = cached_by_source[source].get(resume_id)
+            if cached_resume:
+                slots[index] = cached_resume
+            else:
+                missing.append(index)
+
+        if missing and not fetch_missing:
+            logger.info(f"Из кэша получено {len(refs) - len(missing)} резюме, без полных данных: {len(missing)}")
+        elif missing:
+            logger.info(f"Из кэша получено {len(refs) - len(missing)} резюме, загружаем из API: {len(missing)}")
+            fetched = self.fetch_resume_details([refs[i] for i in missing], on_progress=on_progress)
+
+            fetched_by_source: Dict[str, List[Dict[str, Any]]] = {}
+            for index, full_resume in zip(missing, fetched):
+                resume_id, source = refs[index]
+                if not full_resume:
+                    logger.warning(f"Не удалось получить полные данные резюме {resume_id} ({source})")
+                    continue
+                fetched_by_source.setdefault(source, []).append(full_resume)
+                slots[index] = full_resume
+
+            # Сохранение в БД выполняется в текущем потоке: сессия SQLAlchemy не потокобезопасна
+            for source, resumes in fetched_by_source.items():
+                self.save_many_to_cache(resumes, source=source)
+
+        return [{**item, "tier": self.FULL_TIER} for item in slots if item]
+
+    def resolve_resume_list(
+        self,
+        refs: List[Tuple[str, str]],
+        summaries: Dict[str, Dict[str, Any]],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает резюме для списка кандидатов, не тратя просмотры без необходимости.
+
+        Для каждого резюме берутся полные данные, если они уже есть в кэше БД, иначе —
+        краткие данные из выдачи поиска (summaries). Из API загружаются только резюме,
+        для которых нет ни того, ни другого (например, задачи, созданные до появления
+        кратких данных).
+
+        Args:
+            refs (list[tuple[str, str]]): Пары (ID резюме, источник).
+            summaries (dict): Краткие данные резюме по ID резюме.
+            on_progress (callable | None): Колбэк прогресса загрузки из API.
+
+        Returns:
+            list[dict]: Резюме в исходном порядке; поле tier — "full" или "summary".
+        """
+        ids_by_source: Dict[str, List[str]] = {}
+        for resume_id, source in refs:
+            ids_by_source.setdefault(source, []).append(resume_id)
+        cached_by_source = {
+            source: self.get_cached_resumes(ids, source=source)
+            for source, ids in ids_by_source.items()
+        }
+
+        slots: List[Optional[Dict[str, Any]]] = []
+        missing = []
+        for index, (resume_id, source) in enumerate(refs):
+            cached_resume = cached_by_source[source].get(resume_id)
+            if cached_resume:
+                slots.append({**cached_resume, "tier": self.FULL_TIER})
+            elif resume_id in summaries:
+                slots.append(summaries[resume_id])
+            else:
+                slots.append(None)
+                missing.append(index)
+
+        if missing:
+            fetched = {
+                str(resume.get("id")): resume
+                for resume in self.resolve_resumes([refs[i] for i in missing], on_progress=on_progress)
+            }
+            for index in missing:
+                slots[index] = fetched.get(refs[index][0])
+
+        return [item for item in slots if item]
+
     def search(
     self,
     keywords: str,
@@ -163,6 +466,7 @@ class SearchEngine:
     # Дополнительные фильтры
     order_by: Optional[str] = None,
     labels: Optional[List[str]] = None,
+    on_page: Optional[Callable[[int, int], None]] = None,
 ) -> List[Dict[str, Any]]:
         """
         Выполняет поиск резюме по ключевым словам и фильтрам.
@@ -170,6 +474,7 @@ class SearchEngine:
         
         Args:
             source (str): Источник поиска — "hh" или "avito".
+            on_page (callable | None): Колбэк on_page(loaded, total) после каждой загруженной страницы.
         """
         logger.info(f"Начинаем поиск резюме на {source}: {keywords}, зарплата до {salary_to}, регион {region}")
         
@@ -260,6 +565,7 @@ class SearchEngine:
                 # Дополнительные фильтры
                 order_by=order_by,
                 labels=labels,
+                on_page=on_page,
             )
         elif source == "avito":
             raw_search_result = self.avito_client.resumes(
@@ -267,6 +573,7 @@ class SearchEngine:
                 # location=region,
                 total=total,
                 per_page=per_page,
+                on_page=on_page,
             )
             
             for item in raw_search_result.get("items", []):
@@ -297,60 +604,17 @@ class SearchEngine:
         Returns:
             dict: Результаты поиска с метаданными (found, items).
         """
-        task_data = redis_manager.get_task(task_id)
-
-        if not task_data:
+        task_meta = redis_manager.get_task_meta(task_id)
+        if not task_meta:
             logger.warning(f"Задача {task_id} не найдена или просрочена")
             return {
                 "error": "Задача не найдена или истекло время жизни"
             }
 
-        # Проверяем тип данных и извлекаем resume_ids
-        if isinstance(task_data, dict):
-            resume_ids = task_data.get("resume_ids", [])
-        else:
-            resume_ids = task_data
-
-        if not isinstance(resume_ids, list):
-            logger.error(f"Неверный формат resume_ids в задаче {task_id}: {type(resume_ids)}")
-            return {"error": "Неверный формат данных задачи", "found": 0, "items": []}
-
-        found = len(resume_ids)
-        paginated_ids = resume_ids[offset : offset + limit]
-        items = []
-
-        for resume_id in paginated_ids:
-            # Поддержка разных источников через префикс или словарь
-            if resume_id.startswith("hh_"):
-                source = "hh"
-                clean_id = resume_id.replace("hh_", "")
-            elif resume_id.startswith("avito_"):
-                source = "avito"
-                clean_id = resume_id.replace("avito_", "")
-            else:
-                source = "hh"
-                clean_id = resume_id
-
-            cached_resume = self.get_cached_resume(clean_id, source)
-            if cached_resume:
-                items.append(cached_resume)
-                continue
-
-            if source == "hh":
-                full_resume = self.hh_client.get_resume_details(clean_id)
-            elif source == "avito":
-                full_resume = self.avito_client.resume(clean_id)
-                full_resume['link'] = f"{full_resume.get('url')}" #avito.ru
-            else:
-                logger.warning(f"Неизвестный источник резюме: {source}")
-                continue
-
-            if not full_resume:
-                logger.warning(f"Не удалось получить полные данные резюме {clean_id} ({source})")
-                continue
-
-            self.save_to_cache(full_resume, source)
-            items.append(full_resume)
+        found = task_meta.get("resume_count", 0)
+        paginated_ids = redis_manager.get_task_resume_ids(task_id, offset=offset, limit=limit) or []
+        refs = [self.split_resume_id(resume_id, default_source="hh") for resume_id in paginated_ids]
+        items = self.resolve_resumes(refs)
 
         return {
             "found": found,
@@ -379,6 +643,14 @@ class SearchEngine:
         """
         return self.hh_client.get_negotiations_by_vacancy(vacancy_id=vacancy_id)
     
+    def get_negotiations_updated_since(self, vacancy_id, updated_since: Optional[str]) -> Dict[str, Any]:
+        """
+        Получает отклики по вакансии, изменённые после updated_since.
+        Returns:
+            dict: Словарь с ключами 'found' и 'items'.
+        """
+        return self.hh_client.get_negotiations_updated_since(vacancy_id=vacancy_id, updated_since=updated_since)
+    
     def get_resume_ids_from_negotiations(self, vacancy_id: int) -> List[str]:
         """
         Получает список ID резюме из откликов по вакансии.
@@ -418,6 +690,16 @@ class SearchEngine:
         """
         return self.avito_client.get_vacancies()
     
+    def get_applications_updated_since_avito(self, updated_at_from: str) -> List[Dict[str, Any]]:
+        """
+        Получает отклики Avito по всем вакансиям, изменённые начиная с updated_at_from.
+        Args:
+            updated_at_from (str): Дата в формате YYYY-MM-DD.
+        Returns:
+            list[dict]: Отклики с полем vacancy_id.
+        """
+        return self.avito_applications.fetch_updated_since(updated_at_from)
+    
     def get_vacancy_by_id_avito(self, vacancy_id: int) -> Dict[str, Any]:
         """Получает вакансию по ID через Avito API."""
         return self.avito_client.get_vacancy_by_id(vacancy_id=vacancy_id)
@@ -430,30 +712,8 @@ class SearchEngine:
         Returns:
             dict: Словарь с ключами 'found' и 'items'.
         """
-        # Получаем все ID откликов с обязательным параметром updatedAtFrom
-        from datetime import datetime, timedelta
-        month_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        
-        applications_dict = self.avito_client.get_application_ids(updated_at_from=month_ago)
-        application_list = applications_dict.get('applies', [])
-        
-        if not application_list:
-            return {"found": 0, "items": []}
-        
-        # Получаем ID откликов
-        application_ids = [app['id'] for app in application_list]
-        
-        # Получаем детали откликов
-        applications = self.avito_client.get_applications_by_ids(application_ids)
-        applies = applications.get('applies', [])
-        
-        # Фильтруем отклики по конкретной вакансии
-        filtered_applies = [app for app in applies if app.get('vacancy_id') == vacancy_id]
-        
-        return {
-            "found": len(filtered_applies),
-            "items": filtered_applies
-        }
+        applies = self.avito_applications.get_by_vacancy(vacancy_id)
+        return {"found": len(applies), "items": applies}
     
     def get_new_negotiations_by_vacancy_avito(self, vacancy_id) -> Dict[str, Any]:
         """
@@ -463,33 +723,8 @@ class SearchEngine:
         Returns:
             dict: Словарь с ключами 'found' и 'items'.
         """
-        # Получаем все ID откликов с фильтром по дате (например, за последний месяц)
-        from datetime import datetime, timedelta
-        month_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        
-        applications_dict = self.avito_client.get_application_ids(updated_at_from=month_ago)
-        application_list = applications_dict.get('applies', [])
-        
-        if not application_list:
-            return {"found": 0, "items": []}
-        
-        # Получаем ID откликов
-        application_ids = [app['id'] for app in application_list]
-        
-        # Получаем детали откликов
-        applications = self.avito_client.get_applications_by_ids(application_ids)
-        applies = applications.get('applies', [])
-        
-        # Фильтруем отклики по конкретной вакансии и только непросмотренные
-        filtered_applies = [
-            app for app in applies 
-            if app.get('vacancy_id') == vacancy_id and not app.get('is_viewed', False)
-        ]
-        
-        return {
-            "found": len(filtered_applies),
-            "items": filtered_applies
-        }
+        applies = self.avito_applications.get_by_vacancy(vacancy_id, unread_only=True)
+        return {"found": len(applies), "items": applies}
     
     def get_resume_ids_from_negotiations_avito(self, vacancy_id: int) -> List[str]:
         """
@@ -0,0 +1,176 @@
+"""
+Кэш вакансий компании в Redis с курсорами инкрементальной синхронизации.
+
+Строки вакансий (то, что показывает страница вакансий) хранятся в хэше
+{name}:rows, по одному полю на вакансию; курсоры синхронизации (updated_at
+последнего учтённого отклика, непрочитанные отклики и т.п.) — в хэше
+{name}:cursors. Синхронизация перезаписывает только изменившиеся поля,
+а не весь список вакансий целиком.
+
+Обновления кэша одного источника не выполняются одновременно: их разделяет
+RefreshLock — блокировка в Redis с коротким TTL, которая продлевается, пока
+обновление идёт, и сама истекает, если процесс упал.
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from redis.exceptions import LockError
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class VacancyCacheStore:
+    """
+    Кэш вакансий одного источника (HH или Avito).
+
+    Attributes:
+        redis_manager (RedisManager): Доступ к Redis.
+        name (str): Префикс ключей кэша.
+        ttl (int): Время жизни ключей; продлевается при каждой синхронизации.
+    """
+
+    def __init__(self, redis_manager, name: str, ttl: int):
+        self.redis_manager = redis_manager
+        self.name = name
+        self.ttl = ttl
+
+    @property
+    def rows_key(self) -> str:
+        """Ключ хэша со строками вакансий."""
+        return f"{self.name}:rows"
+
+    @property
+    def cursors_key(self) -> str:
+        """Ключ хэша с курсорами синхронизации вакансий."""
+        return f"{self.name}:cursors"
+
+    @property
+    def state_key(self) -> str:
+        """Ключ с состоянием синхронизации источника (время, общий курсор)."""
+        return f"{self.name}:state"
+
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        """Возвращает состояние последней синхронизации или None, если её ещё не было."""
+        return self.redis_manager.get_value(self.state_key)
+
+    def get_rows(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Возвращает строки вакансий в порядке источника.
+
+        Returns:
+            list[dict] | None: None, если кэш ещё ни разу не синхронизировался.
+        """
+        rows = self.redis_manager.get_hash(self.rows_key)
+        if not rows and self.get_state() is None:
+            return None
+        return sorted(rows.values(), key=lambda row: row.get("position", 0))
+
+    def get_rows_by_id(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает строки вакансий по ID вакансии."""
+        return self.redis_manager.get_hash(self.rows_key)
+
+    def get_cursors(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает курсоры синхронизации по ID вакансии."""
+        return self.redis_manager.get_hash(self.cursors_key)
+
+    def patch(self, rows: Dict[str, Dict[str, Any]], cursors: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Записывает строки и курсоры вакансий, пропуская не изменившиеся.
+
+        Returns:
+            int: Количество перезаписанных строк вакансий.
+        """
+        current_rows = self.redis_manager.get_hash(self.rows_key) if rows else {}
+        current_cursors = self.redis_manager.get_hash(self.cursors_key) if cursors else {}
+        changed_rows = {v_id: row for v_id, row in rows.items() if current_rows.get(v_id) != row}
+        changed_cursors = {v_id: cursor for v_id, cursor in cursors.items() if current_cursors.get(v_id) != cursor}
+        self.redis_manager.set_hash(self.rows_key, changed_rows, self.ttl)
+        self.redis_manager.set_hash(self.cursors_key, changed_cursors, self.ttl)
+        return len(changed_rows)
+
+    def retain(self, vacancy_ids: Iterable[str]) -> int:
+        """
+        Удаляет строки и курсоры вакансий, которых больше нет у источника.
+
+        Returns:
+            int: Количество удалённых вакансий.
+        """
+        keep = {str(v_id) for v_id in vacancy_ids}
+        stale = [v_id for v_id in self.redis_manager.get_hash(self.rows_key) if v_id not in keep]
+        stale_cursors = [v_id for v_id in self.get_cursors() if v_id not in keep]
+        self.redis_manager.delete_hash_fields(self.rows_key, stale)
+        self.redis_manager.delete_hash_fields(self.cursors_key, stale_cursors)
+        return len(stale)
+
+    def mark_synced(self, **state: Any) -> None:
+        """Сохраняет состояние синхронизации и продлевает время жизни кэша."""
+        self.redis_manager.set_value(
+            self.state_key, {**state, "synced_at": datetime.now().isoformat(timespec="seconds")}, self.ttl
+        )
+        for key in (self.rows_key, self.cursors_key):
+            self.redis_manager.client.expire(key, self.ttl)
+
+    def remaining_ttl(self) -> int:
+        """Оставшееся время жизни кэша в секундах (-2 — кэша нет)."""
+        return self.redis_manager.client.ttl(self.state_key)
+
+
+class RefreshLock:
+    """
+    Блокировка обновления кэша в Redis.
+
+    TTL блокировки короткий и продлевается фоновым потоком каждые ttl / 3 секунд,
+    пока блокировка удерживается: упавший процесс не блокирует обновления дольше ttl.
+
+    Attributes:
+        name (str): Ключ блокировки.
+        ttl (int): Время жизни блокировки без продления в секундах.
+    """
+
+    def __init__(self, client, name: str, ttl: int):
+        self.name = name
+        self.ttl = ttl
+        # Токен блокировки не привязан к потоку: его продлевает фоновый поток
+        self._lock = client.lock(name, timeout=ttl, thread_local=False)
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def acquire(self, wait: float = 0) -> bool:
+        """
+        Захватывает блокировку.
+
+        Args:
+            wait (float): Сколько секунд ждать освобождения блокировки (0 — не ждать).
+
+        Returns:
+            bool: True, если блокировка захвачена.
+        """
+        if not self._lock.acquire(blocking=wait > 0, blocking_timeout=wait or None):
+            return False
+        self._stopped.clear()
+        self._heartbeat = threading.Thread(target=self._renew, name=f"lock-{self.name}", daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _renew(self) -> None:
+        while not self._stopped.wait(self.ttl / 3):
+            try:
+                self._lock.reacquire()
+            except LockError as e:
+                logger.warning(f"Не удалось продлить блокировку {self.name}: {e}")
+                return
+
+    def release(self) -> None:
+        """Останавливает продление и освобождает блокировку."""
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        try:
+            self._lock.release()
+        except LockError as e:
+            logger.warning(f"Блокировка {self.name} истекла до освобождения: {e}")
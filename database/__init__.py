@@ -1,6 +1,6 @@
-from .models import Resume
-from .repository import ResumeRepository
-from .session import engine, Base, get_db
+from .models import Resume, AIMatch
+from .repository import ResumeRepository, AIMatchRepository
+from .session import engine, Base, get_db, ScopedSession
 
 def init_db():
     """
@@ -1,10 +1,10 @@
 """
 Модуль содержит определения ORM-моделей для взаимодействия с базой данных.
 
-В текущей реализации представлена одна модель: Resume.
+Модели: Resume (резюме кандидатов) и AIMatch (кэш AI-оценок соответствия).
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Float
 from database.session import Base
 from datetime import datetime
 
@@ -25,7 +25,18 @@ class Resume(Base):
     total_experience_months = Column(Integer)  # для использования в UI
     link = Column(String(512))     # ссылка на резюме (alternate_url)
     received_at = Column(DateTime, default=datetime.utcnow)
-    
+
+
+class AIMatch(Base):
+    __tablename__ = "ai_matches"
+
+    key = Column(String(64), primary_key=True)  # sha256 от (модель, вакансия, опыт кандидата)
+    prompt_version = Column(String(32), nullable=False, index=True)
+    model = Column(String(64))
+    match_percent = Column(Float, nullable=False)
+    explanation = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 # class AvitoResume(Base):
 #     __tablename__ = "avitoresumes"
     
@@ -1,12 +1,14 @@
 """
 Модуль содержит функции для работы с данными в базе данных.
 
-Предоставляет CRUD-операции над моделью Resume.
+Предоставляет CRUD-операции над моделями Resume и AIMatch.
 """
 
 import json
-from typing import Optional, List
-from database.models import Resume
+from datetime import datetime
+from typing import Optional, List, Iterable, Dict, Any
+from database.models import Resume, AIMatch
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from utils.logger import setup_logger
 
@@ -36,6 +38,25 @@ class ResumeRepository:
             Resume.id == resume_id
         ).first()
 
+    def get_many(self, source: str, resume_ids: Iterable[str]) -> List[Resume]:
+        """
+        Возвращает резюме указанного источника по списку ID одним запросом (IN (...)).
+
+        Args:
+            source (str): Источник резюме ("hh" или "avito").
+            resume_ids (Iterable[str]): ID резюме.
+
+        Returns:
+            list[Resume]: Найденные резюме (порядок не гарантируется).
+        """
+        ids = list({str(resume_id) for resume_id in resume_ids})
+        if not ids:
+            return []
+        return self.db.query(Resume).filter(
+            Resume.source == source,
+            Resume.id.in_(ids)
+        ).all()
+
     def get_by_link(self, link: str) -> Optional[Resume]:
         """
         Ищет резюме по полной ссылке.
@@ -51,9 +72,20 @@ class ResumeRepository:
     def resume_exists(self, resume_id: str, source: str = "hh") -> bool:
         return self.db.query(Resume.id).filter(Resume.id == resume_id).filter(Resume.source == source).first() is not None
 
-    def create_resume(self, resume_data: dict, source: str = "hh") -> Resume:
+    @staticmethod
+    def _to_row(resume_data: dict, source: str = "hh") -> Dict[str, Any]:
+        """
+        Преобразует сырые данные резюме HH/Avito в набор колонок таблицы resumes.
+
+        Args:
+            resume_data (dict): Данные резюме из API.
+            source (str): Источник резюме ("hh" или "avito").
+
+        Returns:
+            dict: Значения колонок модели Resume.
+        """
         if source == "avito":
-            resume_data_params = resume_data.get("params")
+            resume_data_params = resume_data.get("params") or {}
             experience = json.dumps(resume_data_params.get("experience_list"))
             exp = resume_data_params.get("experience")
             months = int(exp) * 12 if exp else None  # <-- Исправление: всегда переводим в месяцы
@@ -63,30 +95,74 @@ class ResumeRepository:
             exp = resume_data.get("total_experience")
             months = exp.get("months") if isinstance(exp, dict) else None
             link = resume_data.get("alternate_url")
-            
-        exp_dump = experience
-        total_months = months
-        resume_link = link
-
-        db_resume = Resume(
-            id=resume_data.get("id"),
-            source=source,
-            first_name=resume_data.get("first_name"),
-            middle_name=resume_data.get("middle_name"),
-            last_name=resume_data.get("last_name"),
-            title=resume_data.get("title"),
-            age=resume_data.get("age"),
-            location=resume_data.get("area", {}).get("name"),
-            salary_json=json.dumps(resume_data.get("salary")) if resume_data.get("salary") else None,
-            experience=exp_dump,
-            total_experience_months=total_months,
-            link=resume_link,
-        )
+
+        area = resume_data.get("area")
+
+        return {
+            "id": str(resume_data.get("id")),
+            "source": source,
+            "first_name": resume_data.get("first_name"),
+            "middle_name": resume_data.get("middle_name"),
+            "last_name": resume_data.get("last_name"),
+            "title": resume_data.get("title"),
+            "age": resume_data.get("age"),
+            "location": area.get("name") if isinstance(area, dict) else None,
+            "salary_json": json.dumps(resume_data.get("salary")) if resume_data.get("salary") else None,
+            "experience": experience,
+            "total_experience_months": months,
+            "link": link,
+            "received_at": datetime.utcnow(),
+        }
+
+    def create_resume(self, resume_data: dict, source: str = "hh") -> Resume:
+        db_resume = Resume(**self._to_row(resume_data, source))
         self.db.add(db_resume)
         self.db.commit()
         self.db.refresh(db_resume)
         return db_resume
 
+    def upsert_many(self, resumes: Iterable[dict], source: str = "hh") -> int:
+        """
+        Сохраняет пачку резюме одним запросом INSERT ... ON CONFLICT (id) DO UPDATE
+        в одной транзакции. Для существующих записей обновляются данные и received_at,
+        поэтому устаревшие резюме перепроверяются, а не пропускаются.
+
+        Args:
+            resumes (Iterable[dict]): Данные резюме из API.
+            source (str): Источник резюме ("hh" или "avito").
+
+        Returns:
+            int: Количество сохранённых резюме.
+        """
+        # В одном INSERT ... ON CONFLICT строка не может обновляться дважды — убираем дубликаты
+        rows_by_id = {}
+        for resume_data in resumes:
+            if not resume_data or not resume_data.get("id"):
+                continue
+            row = self._to_row(resume_data, source)
+            rows_by_id[row["id"]] = row
+
+        if not rows_by_id:
+            return 0
+
+        stmt = insert(Resume).values(list(rows_by_id.values()))
+        update_columns = {
+            column.name: stmt.excluded[column.name]
+            for column in Resume.__table__.columns
+            if column.name != "id"
+        }
+        stmt = stmt.on_conflict_do_update(index_elements=[Resume.id], set_=update_columns)
+
+        try:
+            self.db.execute(stmt)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        logger.debug(f"Сохранено {len(rows_by_id)} резюме ({source}) одним запросом")
+        return len(rows_by_id)
+
     @classmethod
     def get_all_resumes(self, skip: int = 0, limit: int = 100) -> List[Resume]:
         """
@@ -111,4 +187,68 @@ class ResumeRepository:
             resume_id (int): ID резюме.
         """
         db.query(Resume).filter(Resume.id == resume_id).delete()
-        db.commit()
\ No newline at end of file
+        db.commit()
+
+
+class AIMatchRepository:
+    """
+    Репозиторий сохранённых AI-оценок соответствия кандидата вакансии.
+
+    Methods:
+        get_many(keys): Возвращает оценки по списку ключей.
+        upsert_many(matches): Сохраняет оценки одним запросом.
+        delete_other_versions(prompt_version): Удаляет оценки устаревших версий промпта.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_many(self, keys: Iterable[str]) -> List[AIMatch]:
+        keys = list(set(keys))
+        if not keys:
+            return []
+        return self.db.query(AIMatch).filter(AIMatch.key.in_(keys)).all()
+
+    def upsert_many(self, matches: Iterable[Dict[str, Any]]) -> int:
+        """
+        Сохраняет оценки одним запросом INSERT ... ON CONFLICT (key) DO UPDATE.
+
+        Args:
+            matches (Iterable[dict]): Словари с полями key, prompt_version, model,
+                match_percent, explanation.
+
+        Returns:
+            int: Количество сохранённых оценок.
+        """
+        rows_by_key = {match["key"]: {**match, "created_at": datetime.utcnow()} for match in matches}
+        if not rows_by_key:
+            return 0
+
+        stmt = insert(AIMatch).values(list(rows_by_key.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AIMatch.key],
+            set_={
+                column.name: stmt.excluded[column.name]
+                for column in AIMatch.__table__.columns
+                if column.name != "key"
+            },
+        )
+        try:
+            self.db.execute(stmt)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(rows_by_key)
+
+    def delete_other_versions(self, prompt_version: str) -> int:
+        """Удаляет оценки, полученные с другой версией промпта."""
+        try:
+            deleted = self.db.query(AIMatch).filter(AIMatch.prompt_version != prompt_version).delete(
+                synchronize_session=False
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return deleted
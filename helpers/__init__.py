@@ -4,5 +4,5 @@ import os
 # Путь к файлу с регионами (относительно корня проекта)
 AREAS_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "areas_cache.json")
 
+# Файл читается при первом обращении к справочнику, а не при импорте
 area_manager = AreaManager(AREAS_FILE_PATH)
-area_manager.load_areas()
\ No newline at end of file
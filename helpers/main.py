@@ -1,5 +1,10 @@
 import json
 import os
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
 
 def collect_areas(data):
     """
@@ -21,24 +26,140 @@ def collect_areas(data):
 
 
 class AreaManager:
+    """
+    Справочник регионов HH с индексами для быстрого поиска.
+
+    Файл читается при первом обращении, а не при импорте. После загрузки
+    доступны словарь регионов по ID, дерево родитель/потомки и отсортированный
+    индекс слов названий для автодополнения.
+
+    Attributes:
+        file_path (str): Путь к файлу с регионами (ответ HH /areas).
+    """
+
+    _WORD_RE = re.compile(r"[\w]+", re.UNICODE)
+
     def __init__(self, file_path):
         self.file_path = file_path
-        self.areas = []
+        self._areas: Optional[List[Dict[str, str]]] = None
+        self._by_id: Dict[str, Dict[str, Optional[str]]] = {}
+        self._children: Dict[Optional[str], List[str]] = {}
+        self._prefix_index: List[tuple] = []
+        self._lock = threading.Lock()
+
+    @property
+    def areas(self) -> List[Dict[str, str]]:
+        """Плоский список регионов {'id', 'name'} в порядке файла."""
+        self._ensure_loaded()
+        return self._areas
+
+    def _ensure_loaded(self) -> None:
+        if self._areas is not None:
+            return
+        with self._lock:
+            if self._areas is None:
+                self.load_areas()
 
     def load_areas(self):
-        """Загружает и парсит файл с регионами"""
+        """Загружает файл с регионами и строит индексы"""
         if not os.path.exists(self.file_path):
             raise FileNotFoundError(f"Файл не найден: {self.file_path}")
 
         with open(self.file_path, "r", encoding="utf-8") as f:
             raw_data = json.load(f)
 
-        # Если данные — список, используем его напрямую
-        if isinstance(raw_data, list):
-            self.areas = collect_areas(raw_data)
-        else:
-            # Иначе пытаемся взять "areas"
-            data = raw_data.get("areas", raw_data)
-            self.areas = collect_areas(data)
+        # Если данные — не список, пытаемся взять "areas"
+        data = raw_data if isinstance(raw_data, list) else raw_data.get("areas", raw_data)
+
+        by_id = {}
+        children = {}
+        prefix_index = []
+        stack = [(item, None) for item in reversed(data)]
+        order = []
+        while stack:
+            item, parent_id = stack.pop()
+            area_id = str(item["id"])
+            by_id[area_id] = {"id": area_id, "name": item["name"], "parent_id": parent_id}
+            children.setdefault(parent_id, []).append(area_id)
+            order.append(area_id)
+            for word in self._WORD_RE.findall(item["name"].lower()):
+                prefix_index.append((word, area_id))
+            stack.extend((child, area_id) for child in reversed(item.get("areas") or []))
+        prefix_index.sort()
+
+        self._by_id = by_id
+        self._children = children
+        self._prefix_index = prefix_index
+        self._areas = [{"id": area_id, "name": by_id[area_id]["name"]} for area_id in order]
+        return self._areas
+
+    def get(self, area_id) -> Optional[Dict[str, Optional[str]]]:
+        """Возвращает регион {'id', 'name', 'parent_id'} по ID."""
+        self._ensure_loaded()
+        return self._by_id.get(str(area_id))
+
+    def get_name(self, area_id, default: Optional[str] = None) -> Optional[str]:
+        """Возвращает название региона по ID."""
+        area = self.get(area_id)
+        return area["name"] if area else default
+
+    def get_many(self, area_ids: Iterable) -> List[Dict[str, str]]:
+        """Возвращает регионы {'id', 'name'} по списку ID, пропуская неизвестные."""
+        self._ensure_loaded()
+        result = []
+        for area_id in area_ids:
+            area = self._by_id.get(str(area_id))
+            if area:
+                result.append({"id": area["id"], "name": area["name"]})
+        return result
+
+    def children(self, area_id=None) -> List[Dict[str, str]]:
+        """Возвращает дочерние регионы (для area_id=None — регионы верхнего уровня)."""
+        self._ensure_loaded()
+        key = str(area_id) if area_id is not None else None
+        return self.get_many(self._children.get(key, []))
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Optional[str]]]:
+        """
+        Ищет регионы, в названии которых есть слова, начинающиеся с введённых.
+
+        Args:
+            query (str): Строка поиска ("санкт пет", "моск").
+            limit (int): Максимальное количество результатов.
+
+        Returns:
+            list[dict]: Регионы {'id', 'name', 'parent_name'}; точные совпадения названия — первыми.
+        """
+        self._ensure_loaded()
+        words = self._WORD_RE.findall((query or "").lower())
+        if not words:
+            return []
+
+        # Кандидаты — по самому длинному слову, остальные слова проверяются по названию
+        longest = max(words, key=len)
+        candidates = []
+        seen = set()
+        position = bisect_left(self._prefix_index, (longest, ""))
+        while position < len(self._prefix_index) and self._prefix_index[position][0].startswith(longest):
+            area_id = self._prefix_index[position][1]
+            position += 1
+            if area_id in seen:
+                continue
+            seen.add(area_id)
+            name_words = self._WORD_RE.findall(self._by_id[area_id]["name"].lower())
+            if all(any(name_word.startswith(word) for name_word in name_words) for word in words):
+                candidates.append(area_id)
+
+        query_lower = query.strip().lower()
+        candidates.sort(key=lambda area_id: (
+            self._by_id[area_id]["name"].lower() != query_lower,
+            not self._by_id[area_id]["name"].lower().startswith(query_lower),
+            len(self._by_id[area_id]["name"]),
+        ))
 
-        return self.areas
\ No newline at end of file
+        result = []
+        for area_id in candidates[:limit]:
+            area = self._by_id[area_id]
+            parent = self._by_id.get(area["parent_id"]) if area["parent_id"] else None
+            result.append({"id": area_id, "name": area["name"], "parent_name": parent["name"] if parent else None})
+        return result
@@ -0,0 +1,129 @@
+"""
+Кодек значений, сохраняемых в Redis.
+
+Значение сериализуется в JSON (через orjson, если он установлен) и при размере
+больше порога сжимается zstd (если установлен zstandard) или zlib. Перед данными
+пишется заголовок: сигнатура, версия формата, сериализатор и алгоритм сжатия, —
+поэтому чтение не зависит от текущих настроек. Значения без заголовка считаются
+записанными старым кодом обычным json.dumps и читаются как есть.
+"""
+
+import json
+import zlib
+from typing import Any, Optional, Union
+
+from utils.logger import setup_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+logger = setup_logger(__name__)
+
+
+class CodecError(ValueError):
+    """Значение из Redis не удалось декодировать."""
+
+
+class RedisCodec:
+    """
+    Кодирует значения для Redis в компактный бинарный формат.
+
+    Attributes:
+        compression (str): Алгоритм сжатия новых значений: zstd, zlib или none.
+        min_size (int): Значения короче этого размера (в байтах) не сжимаются.
+    """
+
+    MAGIC = b"HR"
+    VERSION = 1
+    HEADER_SIZE = 5
+
+    SERIALIZER_JSON = 1
+
+    COMPRESSION_NONE = 0
+    COMPRESSION_ZLIB = 1
+    COMPRESSION_ZSTD = 2
+    COMPRESSIONS = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+    def __init__(self, compression: str = "zstd", min_size: int = 512, level: int = 3):
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Неизвестный алгоритм сжатия: {compression}")
+        if compression == "zstd" and zstandard is None:
+            logger.info("Пакет zstandard не установлен, для Redis используется сжатие zlib")
+            compression = "zlib"
+        self.compression = compression
+        self.min_size = min_size
+        self.level = level
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _loads(data: Union[bytes, str]) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def _compress(self, data: bytes) -> tuple:
+        if len(data) < self.min_size or self.compression == "none":
+            return self.COMPRESSION_NONE, data
+        if self.compression == "zstd":
+            return self.COMPRESSION_ZSTD, zstandard.ZstdCompressor(level=self.level).compress(data)
+        return self.COMPRESSION_ZLIB, zlib.compress(data, self.level)
+
+    @classmethod
+    def _decompress(cls, method: int, data: bytes) -> bytes:
+        if method == cls.COMPRESSION_NONE:
+            return data
+        if method == cls.COMPRESSION_ZLIB:
+            return zlib.decompress(data)
+        if method == cls.COMPRESSION_ZSTD:
+            if zstandard is None:
+                raise CodecError("Значение сжато zstd, но пакет zstandard не установлен")
+            return zstandard.ZstdDecompressor().decompress(data)
+        raise CodecError(f"Неизвестный алгоритм сжатия: {method}")
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Сериализует и при необходимости сжимает значение.
+
+        Returns:
+            bytes: Заголовок и полезная нагрузка.
+        """
+        method, payload = self._compress(self._dumps(value))
+        return self.MAGIC + bytes((self.VERSION, self.SERIALIZER_JSON, method)) + payload
+
+    @classmethod
+    def is_encoded(cls, raw: Union[bytes, str, None]) -> bool:
+        """Проверяет, записано ли значение этим кодеком (а не старым json.dumps)."""
+        return isinstance(raw, bytes) and raw[:2] == cls.MAGIC and len(raw) >= cls.HEADER_SIZE
+
+    def decode(self, raw: Union[bytes, str, None]) -> Optional[Any]:
+        """
+        Восстанавливает значение, в том числе записанное старым кодом в виде JSON.
+
+        Raises:
+            CodecError: Если значение повреждено или записано неизвестной версией формата.
+        """
+        if raw is None:
+            return None
+        try:
+            if not self.is_encoded(raw):
+                return self._loads(raw)
+            version, serializer, method = raw[2], raw[3], raw[4]
+            if version != self.VERSION or serializer != self.SERIALIZER_JSON:
+                raise CodecError(f"Неподдерживаемый формат значения: версия {version}, сериализатор {serializer}")
+            return self._loads(self._decompress(method, raw[self.HEADER_SIZE:]))
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Не удалось декодировать значение: {e}") from e
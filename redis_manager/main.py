@@ -6,10 +6,11 @@
 
 from datetime import datetime
 import redis
-import json
+import time
 import uuid
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from config import conf
+from .codec import CodecError, RedisCodec
 from utils.logger import setup_logger
 
 
@@ -21,13 +22,31 @@ class RedisManager:
     Класс для взаимодействия с Redis.
 
     Attributes:
-        client (redis.Redis): Клиент Redis.
+        client (redis.Redis): Клиент Redis (строковые значения).
+        binary_client (redis.Redis): Клиент Redis для бинарных (сжатых) значений.
+        codec (RedisCodec): Кодек значений, сохраняемых через set_value/get_value.
         ttl_seconds (int): Время жизни ключа в секундах.
         key_prefix (str): Префикс для всех ключей.
     """
 
     TTL_WEEK = 60 * 60 * 24 * 7  # 7 дней
 
+    # Обновляет поля хэша задачи, только если задача ещё существует, и продлевает TTL
+    UPDATE_TASK_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return 0
+    end
+    local ttl = tonumber(ARGV[1])
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+    redis.call('EXPIRE', KEYS[1], ttl)
+    for i = 2, #KEYS do
+        if redis.call('EXISTS', KEYS[i]) == 1 then
+            redis.call('EXPIRE', KEYS[i], ttl)
+        end
+    end
+    return 1
+    """
+
     def __init__(self):
         self.client = redis.Redis(
             host=conf.REDIS_HOST,
@@ -36,45 +55,265 @@ class RedisManager:
             password=conf.REDIS_PASSWORD,
             decode_responses=True
         )
+        self.binary_client = redis.Redis(
+            host=conf.REDIS_HOST,
+            port=conf.REDIS_PORT,
+            db=conf.REDIS_DB,
+            password=conf.REDIS_PASSWORD,
+        )
+        self.codec = RedisCodec(
+            compression=conf.REDIS_COMPRESSION,
+            min_size=conf.REDIS_COMPRESS_MIN_SIZE,
+        )
         self.ttl_seconds = self.TTL_WEEK
         self.key_prefix = conf.REDIS_KEY_PREFIX
+        self._update_script = None
 
     def _make_key(self, task_id: str) -> str:
         """Формирует ключ в Redis с префиксом."""
         return f"{self.key_prefix}{task_id}"
 
-    def create_task(self, resume_ids: List[str], description: Optional[str] = "") -> str:
+    def set_value(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Сохраняет значение в Redis через кодек (сериализация и сжатие).
+
+        Args:
+            key (str): Ключ Redis.
+            value (Any): Значение, сериализуемое в JSON.
+            ttl (int | None): Время жизни в секундах (None — без ограничения).
+        """
+        data = self.codec.encode(value)
+        if ttl:
+            self.binary_client.setex(key, ttl, data)
+        else:
+            self.binary_client.set(key, data)
+
+    def get_value(self, key: str) -> Optional[Any]:
+        """
+        Читает значение, сохранённое через set_value или старым кодом в виде JSON.
+
+        Returns:
+            Any | None: Значение или None, если ключа нет или его не удалось декодировать.
+        """
+        return self._decode(key, self.binary_client.get(key))
+
+    def _decode(self, key: str, raw: Optional[bytes]) -> Optional[Any]:
+        try:
+            return self.codec.decode(raw)
+        except CodecError as e:
+            logger.warning(f"Не удалось декодировать значение {key}: {e}")
+            return None
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Читает несколько значений одним MGET.
+
+        Args:
+            keys (Sequence[str]): Ключи Redis.
+
+        Returns:
+            dict: Значения по ключам; отсутствующих и повреждённых ключей в результате нет.
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = {}
+        for key, raw in zip(keys, self.binary_client.mget(keys)):
+            value = self._decode(key, raw)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set_many(self, values: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Сохраняет несколько значений одним конвейером (pipeline) команд SET/SETEX.
+
+        Args:
+            values (dict): Значения по ключам.
+            ttl (int | None): Время жизни в секундах (None — без ограничения).
+        """
+        if not values:
+            return
+        pipe = self.binary_client.pipeline(transaction=False)
+        for key, value in values.items():
+            data = self.codec.encode(value)
+            if ttl:
+                pipe.setex(key, ttl, data)
+            else:
+                pipe.set(key, data)
+        pipe.execute()
+
+    def get_hash(self, key: str) -> Dict[str, Any]:
+        """
+        Читает все поля хэша, значения которых сохранены через set_hash.
+
+        Returns:
+            dict: Значения по полям; повреждённые поля пропускаются.
+        """
+        values = {}
+        for field, raw in self.binary_client.hgetall(key).items():
+            field = field.decode("utf-8") if isinstance(field, bytes) else field
+            value = self._decode(f"{key}[{field}]", raw)
+            if value is not None:
+                values[field] = value
+        return values
+
+    def set_hash(self, key: str, values: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """
+        Записывает поля хэша (каждое значение — через кодек) и обновляет TTL ключа.
+
+        Args:
+            key (str): Ключ хэша.
+            values (dict): Значения по полям; остальные поля хэша не меняются.
+            ttl (int | None): Время жизни ключа в секундах (None — без ограничения).
+        """
+        if not values:
+            return
+        pipe = self.binary_client.pipeline(transaction=True)
+        pipe.hset(key, mapping={field: self.codec.encode(value) for field, value in values.items()})
+        if ttl:
+            pipe.expire(key, ttl)
+        pipe.execute()
+
+    def delete_hash_fields(self, key: str, fields: Sequence[str]) -> None:
+        """Удаляет поля хэша."""
+        fields = list(fields)
+        if fields:
+            self.binary_client.hdel(key, *fields)
+
+    def _meta_key(self, task_id: str) -> str:
+        """Ключ хэша с метаданными задачи (описание, статус, прогресс)."""
+        return f"{self.key_prefix}task:{task_id}"
+
+    def _ids_key(self, task_id: str) -> str:
+        """Ключ списка ID резюме задачи."""
+        return f"{self.key_prefix}task:{task_id}:resume_ids"
+
+    def _summaries_key(self, task_id: str) -> str:
+        """Ключ хэша с краткими данными резюме из выдачи поиска (поле — ID резюме)."""
+        return f"{self.key_prefix}task:{task_id}:summaries"
+
+    def _task_keys(self, task_id: str) -> List[str]:
+        """Все ключи задачи; первым идёт хэш метаданных, TTL остальных продлевается вместе с ним."""
+        return [self._meta_key(task_id), self._ids_key(task_id), self._summaries_key(task_id)]
+
+    @staticmethod
+    def _parse_meta(meta: dict) -> dict:
+        """Приводит строковые поля хэша задачи к исходным типам."""
+        for field in ("progress", "details_progress"):
+            if field in meta:
+                meta[field] = int(meta[field])
+        return meta
+
+    def _task_index_key(self) -> str:
+        """Ключ sorted set с временем создания задач (для очистки без KEYS)."""
+        return f"{self.key_prefix}tasks_index"
+
+    def _cleanup_stats_key(self) -> str:
+        """Ключ хэша с накопленной статистикой очистки задач."""
+        return f"{self.key_prefix}tasks_cleanup_stats"
+
+    def _get_legacy_task(self, task_id: str) -> Optional[dict]:
+        """Читает задачу, сохранённую старым кодом одним JSON-значением."""
+        data = self.get_value(self._make_key(task_id))
+        return data if isinstance(data, dict) else None
+
+    def create_task(self, resume_ids: Optional[List[str]] = None, description: Optional[str] = "") -> str:
         """
         Создаёт новую задачу в Redis.
 
+        Метаданные задачи хранятся в хэше, ID резюме — в отдельном списке.
+
         Args:
-            resume_ids (list): Список ID резюме.
+            resume_ids (list | None): Список ID резюме.
             description (str | None): Описание вакансии для последующего анализа.
 
         Returns:
             str: Уникальный ID задачи.
         """
         task_id = str(uuid.uuid4())
-        key = self._make_key(task_id)
-
-        task_data = {
-            "resume_ids": resume_ids,
-            "description": description or "",
-            "created_at": datetime.now().isoformat()
-        }
+        resume_ids = resume_ids or []
+        description = description or ""
+        meta_key, ids_key, summaries_key = self._task_keys(task_id)
 
         try:
-            self.client.setex(key, self.ttl_seconds, json.dumps(task_data))
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hset(meta_key, mapping={
+                "description": description,
+                "created_at": datetime.now().isoformat(),
+            })
+            if resume_ids:
+                pipe.rpush(ids_key, *resume_ids)
+                pipe.expire(ids_key, self.ttl_seconds)
+            pipe.expire(meta_key, self.ttl_seconds)
+            pipe.expire(summaries_key, self.ttl_seconds)
+            pipe.zadd(self._task_index_key(), {task_id: time.time()})
+            pipe.execute()
             logger.info(f"Создана задача {task_id} с {len(resume_ids)} резюме и описанием длиной {len(description)} символов")
             return task_id
         except Exception as e:
             logger.error(f"Ошибка при создании задачи: {e}")
             raise
 
+    def get_task_meta(self, task_id: str) -> Optional[dict]:
+        """
+        Получает метаданные задачи без списка ID резюме.
+
+        Args:
+            task_id (str): ID задачи.
+
+        Returns:
+            dict | None: Описание, статус, прогресс и количество резюме (resume_count)
+            или None, если задача не найдена.
+        """
+        return self.get_task_meta_with_values(task_id)[0]
+
+    def get_task_meta_with_values(
+        self,
+        task_id: str,
+        keys: Sequence[str] = (),
+    ) -> Tuple[Optional[dict], Dict[str, Any]]:
+        """
+        Получает метаданные задачи и связанные с ней значения (например, search_params)
+        за один запрос к Redis.
+
+        Args:
+            task_id (str): ID задачи.
+            keys (Sequence[str]): Ключи значений, сохранённых через set_value.
+
+        Returns:
+            tuple[dict | None, dict]: Метаданные задачи (как в get_task_meta) и значения по ключам.
+        """
+        keys = list(keys)
+        pipe = self.binary_client.pipeline(transaction=False)
+        pipe.hgetall(self._meta_key(task_id))
+        pipe.llen(self._ids_key(task_id))
+        if keys:
+            pipe.mget(keys)
+        results = pipe.execute()
+        raw_meta, count = results[0], results[1]
+        values = {}
+        for key, raw in zip(keys, results[2] if keys else []):
+            value = self._decode(key, raw)
+            if value is not None:
+                values[key] = value
+
+        if raw_meta:
+            meta = self._parse_meta({k.decode("utf-8"): v.decode("utf-8") for k, v in raw_meta.items()})
+            meta["resume_count"] = count
+            return meta, values
+
+        legacy = self._get_legacy_task(task_id)
+        if legacy is None:
+            return None, values
+        legacy["resume_count"] = len(legacy.pop("resume_ids", None) or [])
+        return legacy, values
 
     def get_task_data(self, task_id: str) -> Optional[dict]:
         """
-        Получает данные задачи из Redis (включая description).
+        Получает данные задачи из Redis (включая description и полный список resume_ids).
+
+        Для больших задач лучше использовать get_task_meta и постраничный get_task_resume_ids.
 
         Args:
             task_id (str): ID задачи.
@@ -82,29 +321,49 @@ class RedisManager:
         Returns:
             dict | None: Словарь с данными задачи или None, если задача не найдена.
         """
-        key = self._make_key(task_id)
-        data = self.client.get(key)
-        if not data:
-            return None
-        try:
-            return json.loads(data)
-        except json.JSONDecodeError:
-            logger.error(f"Ошибка декодирования JSON для задачи {task_id}")
-            return None
-
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._meta_key(task_id))
+        pipe.lrange(self._ids_key(task_id), 0, -1)
+        meta, resume_ids = pipe.execute()
+        if meta:
+            meta = self._parse_meta(meta)
+            meta["resume_ids"] = resume_ids
+            return meta
+        return self._get_legacy_task(task_id)
 
-    def get_task_resume_ids(self, task_id: str) -> Optional[List[str]]:
+    def get_task_resume_ids(
+        self,
+        task_id: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Optional[List[str]]:
         """
-        Получает только список ID резюме по задаче.
+        Получает список ID резюме по задаче (целиком или страницу).
 
         Args:
             task_id (str): ID задачи.
+            offset (int): Смещение от начала списка.
+            limit (int | None): Размер страницы (None — до конца списка).
 
         Returns:
-            list | None: Список ID резюме или None.
+            list | None: Список ID резюме или None, если задача не найдена.
         """
-        task_data = self.get_task_data(task_id)
-        return task_data["resume_ids"] if task_data else None
+        if limit is not None and limit <= 0:
+            return [] if self.client.exists(self._meta_key(task_id)) else None
+        stop = offset + limit - 1 if limit is not None else -1
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.exists(self._meta_key(task_id))
+        pipe.lrange(self._ids_key(task_id), offset, stop)
+        exists, resume_ids = pipe.execute()
+        if exists:
+            return resume_ids
+
+        legacy = self._get_legacy_task(task_id)
+        if legacy is None:
+            return None
+        legacy_ids = legacy.get("resume_ids") or []
+        return legacy_ids[offset:offset + limit] if limit is not None else legacy_ids[offset:]
 
     def get_task(self, task_id: str) -> Optional[List[str]]:
         """
@@ -116,11 +375,7 @@ class RedisManager:
         Returns:
             list | None: Список ID резюме или None, если задача не найдена.
         """
-        key = self._make_key(task_id)
-        data = self.client.get(key)
-        if not data:
-            return None
-        return json.loads(data)
+        return self.get_task_resume_ids(task_id)
 
     def delete_task(self, task_id: str) -> None:
         """
@@ -129,49 +384,206 @@ class RedisManager:
         Args:
             task_id (str): ID задачи.
         """
-        key = self._make_key(task_id)
-        self.client.delete(key)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(
+            self._meta_key(task_id), self._ids_key(task_id), self._summaries_key(task_id), self._make_key(task_id)
+        )
+        pipe.zrem(self._task_index_key(), task_id)
+        pipe.execute()
         logger.info(f"Задача {task_id} удалена")
 
-    def clear_old_tasks(self) -> int:
+    def _unlink_batch(self, keys: List[str]) -> Tuple[int, int]:
         """
-        Удаляет все устаревшие задачи.
+        Удаляет пачку ключей через UNLINK (память освобождается в фоне).
 
         Returns:
-            int: Количество удалённых задач.
+            tuple[int, int]: Количество удалённых ключей и их суммарный размер в байтах
+            по MEMORY USAGE (0, если команда недоступна).
         """
-        deleted_count = 0
-        keys = self.client.keys(f"{self.key_prefix}*")
+        if not keys:
+            return 0, 0
+        pipe = self.client.pipeline(transaction=False)
         for key in keys:
-            if not self.client.exists(key):
-                continue
-            ttl = self.client.ttl(key)
-            if ttl <= 0:
-                self.client.delete(key)
-                deleted_count += 1
-        logger.info(f"Очищено {deleted_count} устаревших задач")
-        return deleted_count
-    
-    def update_task_progress(self, task_id: str, progress: int, status: str = "in_progress") -> None:
-        key = self._make_key(task_id)
-        data = self.get_task_data(task_id)
-        if not data:
-            return
-        data["progress"] = progress
-        data["status"] = status
-        data["updated_at"] = datetime.now().isoformat()
+            pipe.memory_usage(key)
+        sizes = pipe.execute(raise_on_error=False)
+        reclaimed = sum(size for size in sizes if isinstance(size, int))
+        return self.client.unlink(*keys), reclaimed
+
+    def _scan_batches(self, pattern: str, batch_size: int) -> Iterable[List[str]]:
+        """Перебирает ключи по шаблону инкрементальным SCAN пачками по batch_size."""
+        batch = []
+        for key in self.client.scan_iter(match=pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def clear_old_tasks(self, max_age: Optional[int] = None, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Удаляет устаревшие задачи, не блокируя Redis.
+
+        Задачи старше max_age находятся по индексу времени создания (sorted set)
+        и удаляются пачками. Затем инкрементальным SCAN удаляются ключи задач
+        без TTL, которые иначе никогда бы не истекли. Для оценки освобождённой
+        памяти используется MEMORY USAGE.
+
+        Args:
+            max_age (int | None): Возраст задачи в секундах (по умолчанию ttl_seconds).
+            batch_size (int): Размер пачки для ZRANGEBYSCORE, SCAN и UNLINK.
+
+        Returns:
+            dict: Количество удалённых задач, ключей и освобождённых байт.
+        """
+        stats = {"tasks": 0, "keys": 0, "bytes": 0}
+        index_key = self._task_index_key()
+        cutoff = time.time() - (max_age or self.ttl_seconds)
+
+        while True:
+            task_ids = self.client.zrangebyscore(index_key, "-inf", cutoff, start=0, num=batch_size)
+            if not task_ids:
+                break
+            keys = []
+            for task_id in task_ids:
+                keys.extend((
+                    self._meta_key(task_id), self._ids_key(task_id),
+                    self._summaries_key(task_id), self._make_key(task_id),
+                ))
+            deleted, reclaimed = self._unlink_batch(keys)
+            self.client.zrem(index_key, *task_ids)
+            stats["tasks"] += len(task_ids)
+            stats["keys"] += deleted
+            stats["bytes"] += reclaimed
+
+        service_keys = {index_key, self._cleanup_stats_key()}
+        for batch in self._scan_batches(f"{self.key_prefix}*", batch_size):
+            batch = [key for key in batch if key not in service_keys]
+            pipe = self.client.pipeline(transaction=False)
+            for key in batch:
+                pipe.ttl(key)
+            persistent = [key for key, ttl in zip(batch, pipe.execute()) if ttl == -1]
+            deleted, reclaimed = self._unlink_batch(persistent)
+            stats["keys"] += deleted
+            stats["bytes"] += reclaimed
+
+        pipe = self.client.pipeline(transaction=False)
+        for field, value in stats.items():
+            pipe.hincrby(self._cleanup_stats_key(), field, value)
+        pipe.hset(self._cleanup_stats_key(), "last_run", datetime.now().isoformat())
+        pipe.execute()
+        logger.info(
+            f"Очищено {stats['tasks']} устаревших задач: удалено ключей {stats['keys']}, "
+            f"освобождено ~{stats['bytes'] / 1024:.1f} КБ"
+        )
+        return stats
+
+    def cleanup_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает накопленную статистику очистки задач.
+
+        Returns:
+            dict: Всего удалено задач, ключей и байт, время последнего запуска.
+        """
+        data = self.client.hgetall(self._cleanup_stats_key())
+        return {
+            "tasks": int(data.get("tasks", 0)),
+            "keys": int(data.get("keys", 0)),
+            "bytes": int(data.get("bytes", 0)),
+            "last_run": data.get("last_run"),
+        }
+
+    def update_task_progress(
+        self,
+        task_id: str,
+        progress: int,
+        status: str = "in_progress",
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Обновляет статус и прогресс задачи одним атомарным HSET.
+
+        Задачи, которые уже удалены или истекли, не воссоздаются.
+        """
+        fields = {
+            "progress": progress,
+            "status": status,
+            "updated_at": datetime.now().isoformat(),
+        }
+        if error:
+            fields["error"] = error
+        self._update_task_fields(task_id, fields)
+
+    def update_task_details_progress(self, task_id: str, progress: int) -> None:
+        """
+        Обновляет прогресс загрузки полных данных резюме для страницы результатов.
+
+        Хранится в отдельном поле details_progress: статус и прогресс самой задачи
+        (поиска) при открытии страниц результатов не меняются.
+        """
+        self._update_task_fields(task_id, {
+            "details_progress": progress,
+            "details_updated_at": datetime.now().isoformat(),
+        })
+
+    def _update_task_fields(self, task_id: str, fields: Dict[str, Any]) -> None:
+        """Записывает поля хэша задачи одним атомарным HSET, не воссоздавая удалённые задачи."""
+        args = [self.ttl_seconds]
+        for field, value in fields.items():
+            args.extend((field, value))
         try:
-            self.client.setex(key, self.ttl_seconds, json.dumps(data))
+            if self._update_script is None:
+                self._update_script = self.client.register_script(self.UPDATE_TASK_SCRIPT)
+            self._update_script(keys=self._task_keys(task_id), args=args)
         except Exception as e:
             logger.error(f"Ошибка при обновлении прогресса задачи {task_id}: {e}")
 
     def update_task_resume_ids(self, task_id: str, resume_ids: List[str]) -> None:
-        key = self._make_key(task_id)
-        data = self.get_task_data(task_id)
-        if not data:
-            return
-        data["resume_ids"] = resume_ids
+        """
+        Атомарно заменяет список ID резюме задачи.
+        """
+        meta_key, ids_key, summaries_key = self._task_keys(task_id)
+        try:
+            if not self.client.exists(meta_key):
+                return
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(ids_key)
+            if resume_ids:
+                pipe.rpush(ids_key, *resume_ids)
+                pipe.expire(ids_key, self.ttl_seconds)
+            pipe.expire(meta_key, self.ttl_seconds)
+            pipe.expire(summaries_key, self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении resume_ids задачи {task_id}: {e}")
+
+    def set_task_summaries(self, task_id: str, summaries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Сохраняет краткие данные резюме из выдачи поиска вместе с задачей.
+
+        Args:
+            task_id (str): ID задачи.
+            summaries (dict): Краткие данные резюме по ID резюме.
+        """
         try:
-            self.client.setex(key, self.ttl_seconds, json.dumps(data))
+            self.set_hash(self._summaries_key(task_id), summaries, self.ttl_seconds)
         except Exception as e:
-            logger.error(f"Ошибка при обновлении resume_ids задачи {task_id}: {e}")
\ No newline at end of file
+            logger.error(f"Ошибка при сохранении кратких данных резюме задачи {task_id}: {e}")
+
+    def get_task_summaries(self, task_id: str, resume_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает краткие данные резюме задачи одним HMGET.
+
+        Returns:
+            dict: Краткие данные по ID резюме; резюме без сохранённых данных в результат не попадают.
+        """
+        resume_ids = [str(resume_id) for resume_id in resume_ids]
+        if not resume_ids:
+            return {}
+        key = self._summaries_key(task_id)
+        summaries = {}
+        for resume_id, raw in zip(resume_ids, self.binary_client.hmget(key, resume_ids)):
+            value = self._decode(f"{key}[{resume_id}]", raw)
+            if value is not None:
+                summaries[resume_id] = value
+        return summaries
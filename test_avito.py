@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 from data_manager.main import DataManager
-from redis_manager import redis_manager
 import json
 
 def test_avito_vacancies():
@@ -16,11 +15,9 @@ def test_avito_vacancies():
     dm.update_vacancies_cache_avito()
     
     # Проверяем данные в кэше
-    cache_key = "cached_company_vacancies_avito"
-    cached_data = redis_manager.client.get(cache_key)
+    vacancies = dm.get_company_vacancies_avito()
     
-    if cached_data:
-        vacancies = json.loads(cached_data)
+    if vacancies:
         print(f"Найдено {len(vacancies)} вакансий в кэше")
         
         # Показываем первые 3 вакансии с откликами
@@ -0,0 +1,144 @@
+import sys
+import os
+import fnmatch
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ai.cache import MatchCache
+from redis_manager.codec import RedisCodec
+from redis_manager.main import RedisManager
+from ai.engine import EvaluationEngine
+from ai.main import AIEvaluator
+
+
+class FakeRedis:
+    """Минимальная in-memory замена Redis для строк и счётчиков."""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def hincrby(self, key, field, amount):
+        data = self.hashes.setdefault(key, {})
+        data[field] = int(data.get(field, 0)) + amount
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes.get(key, {}).items()}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def db_session():
+    return MagicMock()
+
+
+def make_store(redis_client):
+    store = RedisManager.__new__(RedisManager)
+    store.client = store.binary_client = redis_client
+    store.codec = RedisCodec(compression="zlib")
+    return store
+
+
+def make_cache(redis_client, db_session, version="v1"):
+    return MatchCache(version, model="test-model", redis_client=redis_client,
+                      session_factory=lambda: db_session, store=make_store(redis_client))
+
+
+def test_key_ignores_formatting(redis_client, db_session):
+    cache = make_cache(redis_client, db_session)
+    assert cache.make_key("Повар\n\nгорячего  цеха", "Нужен ПОВАР") == cache.make_key("Повар горячего цеха", "нужен повар")
+    assert cache.make_key("Повар", "Нужен повар") != cache.make_key("Бариста", "Нужен повар")
+
+
+def test_hit_and_miss_counters(redis_client, db_session):
+    cache = make_cache(redis_client, db_session)
+    with patch("ai.cache.AIMatchRepository") as repo_cls:
+        repo_cls.return_value.get_many.return_value = []
+        assert cache.get("Повар", "Нужен повар") is None
+        cache.set("Повар", "Нужен повар", 80.0, "Подходит")
+        assert cache.get("Повар", "Нужен повар") == (80.0, "Подходит")
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_values_go_through_codec(redis_client, db_session):
+    cache = make_cache(redis_client, db_session)
+    key = cache.make_key("Повар", "Нужен повар")
+    with patch("ai.cache.AIMatchRepository"):
+        cache.set("Повар", "Нужен повар", 80.0, "Подходит")
+    assert cache.store.codec.is_encoded(redis_client.data[key])
+
+    # Значения, записанные прежним кодом в виде JSON, по-прежнему читаются
+    redis_client.data[key] = '{"percent": 70.0, "explanation": "Старая оценка"}'
+    assert cache.get("Повар", "Нужен повар") == (70.0, "Старая оценка")
+
+
+def test_db_fallback_restores_redis(redis_client, db_session):
+    cache = make_cache(redis_client, db_session)
+    key = cache.make_key("Повар", "Нужен повар")
+    row = MagicMock(key=key.rsplit(":", 1)[-1], prompt_version="v1", match_percent=70.0, explanation="Из БД")
+
+    with patch("ai.cache.AIMatchRepository") as repo_cls:
+        repo_cls.return_value.get_many.return_value = [row]
+        assert cache.get("Повар", "Нужен повар") == (70.0, "Из БД")
+
+    assert redis_client.get(key) is not None
+
+
+def test_prompt_change_purges_old_version(redis_client, db_session):
+    with patch("ai.cache.AIMatchRepository") as repo_cls:
+        repo_cls.return_value.get_many.return_value = []
+        old = make_cache(redis_client, db_session, version="v1")
+        old.set("Повар", "Нужен повар", 80.0, "Подходит")
+
+        new = make_cache(redis_client, db_session, version="v2")
+        assert new.get("Повар", "Нужен повар") is None
+
+        repo_cls.return_value.delete_other_versions.assert_called_with("v2")
+    assert not any(key.startswith("ai_match:v1:") for key in redis_client.data)
+
+
+def test_engine_skips_cached_candidates(redis_client, db_session):
+    cache = make_cache(redis_client, db_session)
+    evaluator = AIEvaluator(cache=cache)
+    evaluator.complete = MagicMock(return_value="55% Частично")
+    engine = EvaluationEngine(evaluator, max_workers=2, batch_size=1)
+
+    with patch("ai.cache.AIMatchRepository") as repo_cls:
+        repo_cls.return_value.get_many.return_value = []
+        cache.set("Повар", "Нужен повар", 90.0, "Из кэша")
+        results = engine.evaluate_many(["Повар", "Бариста"], "Нужен повар")
+
+    assert results == [(90.0, "Из кэша"), (55.0, "Частично")]
+    evaluator.complete.assert_called_once()
+    assert cache.get("Бариста", "Нужен повар") == (55.0, "Частично")
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import patch
+
+from ai.engine import EvaluationEngine, NO_DATA_RESULT, parse_batch
+from ai.stub_server import StubLLMServer
+
+VACANCY = "Повар горячего цеха, опыт работы с мясом и рыбой"
+
+
+@pytest.fixture
+def stub():
+    server = StubLLMServer(delay=0.2).start()
+    with patch("ai.main.conf.DEEPSEEK_API_URL", server.url):
+        yield server
+    server.stop()
+
+
+def test_parse_batch():
+    content = "1: 80% Подходит\n2: 35,5% Слабо\nлишняя строка\n7: 99% Вне пакета"
+    assert parse_batch(content, 2) == {0: (80.0, "Подходит"), 1: (35.5, "Слабо")}
+
+
+def test_evaluate_many_runs_concurrently(stub):
+    engine = EvaluationEngine(max_workers=8, batch_size=1, backoff=0.01)
+    candidates = ["Повар горячего цеха, работа с мясом и рыбой"] * 8
+
+    started = time.monotonic()
+    results = engine.evaluate_many(candidates, VACANCY)
+    elapsed = time.monotonic() - started
+
+    assert len(results) == 8
+    assert all(percent > 0 for percent, _ in results)
+    assert stub.requests_count == 8
+    # Последовательно вышло бы не меньше 8 * 0.2 сек
+    assert elapsed < 1.0
+
+
+def test_batched_prompts_keep_order(stub):
+    engine = EvaluationEngine(max_workers=2, batch_size=2, backoff=0.01)
+    candidates = ["Повар горячего цеха, мясо и рыба", "Менеджер по продажам", "", "Повар"]
+
+    results = engine.evaluate_many(candidates, VACANCY)
+
+    assert stub.requests_count == 2
+    assert results[2] == NO_DATA_RESULT
+    assert results[0][0] > results[1][0]
+    assert results[0][0] > results[3][0] > 0
+
+
+def test_retries_on_server_error(stub):
+    stub.fail_first = 1
+    engine = EvaluationEngine(max_workers=1, batch_size=1, max_retries=2, backoff=0.01)
+
+    [(percent, reason)] = engine.evaluate_many(["Повар горячего цеха"], VACANCY)
+
+    assert stub.requests_count == 2
+    assert percent > 0
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import pytest
+
+from helpers.main import AreaManager, collect_areas
+
+AREAS = [
+    {"id": "113", "parent_id": None, "name": "Россия", "areas": [
+        {"id": "1", "parent_id": "113", "name": "Москва", "areas": []},
+        {"id": "2019", "parent_id": "113", "name": "Московская область", "areas": [
+            {"id": "2034", "parent_id": "2019", "name": "Мытищи", "areas": []},
+        ]},
+        {"id": "2", "parent_id": "113", "name": "Санкт-Петербург", "areas": []},
+    ]},
+    {"id": "40", "parent_id": None, "name": "Казахстан", "areas": []},
+]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    path = tmp_path / "areas.json"
+    path.write_text(json.dumps(AREAS, ensure_ascii=False), encoding="utf-8")
+    return AreaManager(str(path))
+
+
+def test_file_is_loaded_lazily(manager):
+    assert manager._areas is None
+
+    assert manager.get_name("2034") == "Мытищи"
+    assert manager.areas == collect_areas(AREAS)
+
+
+def test_lookup_by_id_and_tree(manager):
+    assert manager.get(2019) == {"id": "2019", "name": "Московская область", "parent_id": "113"}
+    assert manager.get_name("999", "—") == "—"
+    assert manager.get_many(["2", "999", "1"]) == [{"id": "2", "name": "Санкт-Петербург"}, {"id": "1", "name": "Москва"}]
+    assert [a["id"] for a in manager.children()] == ["113", "40"]
+    assert [a["id"] for a in manager.children("113")] == ["1", "2019", "2"]
+
+
+def test_search_by_word_prefixes(manager):
+    assert [a["id"] for a in manager.search("моск")] == ["1", "2019"]
+    assert manager.search("пет")[0] == {"id": "2", "name": "Санкт-Петербург", "parent_name": "Россия"}
+    assert [a["id"] for a in manager.search("московская обл")] == ["2019"]
+    assert manager.search("") == []
+    assert manager.search("моск", limit=1)[0]["name"] == "Москва"
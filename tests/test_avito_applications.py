@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from data_manager.avito_applications import AvitoApplicationStore
+
+APPLICATIONS = {
+    "1": {"id": "1", "vacancy_id": 10, "is_viewed": False},
+    "2": {"id": "2", "vacancy_id": 10, "is_viewed": True},
+    "3": {"id": "3", "vacancy_id": 20, "is_viewed": False},
+    "old": {"id": "old", "vacancy_id": 20, "is_viewed": True},
+}
+
+
+def make_client(window=("1", "2", "3")):
+    client = MagicMock()
+    client.get_application_ids.return_value = {"applies": [{"id": app_id} for app_id in window]}
+    client.get_applications_by_ids.side_effect = lambda ids: {"applies": [APPLICATIONS[i] for i in ids]}
+    return client
+
+
+def test_window_is_loaded_once_in_chunks():
+    client = make_client()
+    store = AvitoApplicationStore(client, ttl=300, chunk_size=2, workers=2)
+
+    assert [app["id"] for app in store.get_by_vacancy(10)] == ["1", "2"]
+    assert [app["id"] for app in store.get_by_vacancy("20")] == ["3"]
+    assert [app["id"] for app in store.get_by_vacancy(10, unread_only=True)] == ["1"]
+
+    assert client.get_application_ids.call_count == 1
+    assert sorted(call.args[0] for call in client.get_applications_by_ids.call_args_list) == [["1", "2"], ["3"]]
+
+
+def test_get_many_uses_index_and_fetches_missing():
+    client = make_client()
+    store = AvitoApplicationStore(client, ttl=300, chunk_size=100, workers=1)
+    store.refresh()
+    client.get_applications_by_ids.reset_mock()
+
+    result = store.get_many(["1", 3, "old"])
+
+    assert set(result) == {"1", "3", "old"}
+    client.get_applications_by_ids.assert_called_once_with(["old"])
+    assert [app["id"] for app in store.get_by_vacancy(20)] == ["3", "old"]
+
+
+def test_updates_are_merged_into_index():
+    client = make_client()
+    store = AvitoApplicationStore(client, ttl=300, chunk_size=100, workers=1)
+    store.refresh()
+    viewed = {"id": "1", "vacancy_id": 10, "is_viewed": True}
+    client.get_application_ids.return_value = {"applies": [{"id": "1"}]}
+    client.get_applications_by_ids.side_effect = lambda ids: {"applies": [viewed]}
+
+    store.fetch_updated_since("2024-05-01")
+
+    assert store.get_by_vacancy(10, unread_only=True) == []
+    assert len(store.get_by_vacancy(10)) == 2
+
+
+def test_failed_chunk_keeps_previous_index():
+    client = make_client()
+    store = AvitoApplicationStore(client, ttl=0, chunk_size=1, workers=2)
+    store.refresh()
+
+    def flaky(ids):
+        if ids == ["3"]:
+            raise requests.HTTPError("429")
+        return {"applies": [APPLICATIONS[i] for i in ids]}
+
+    client.get_applications_by_ids.side_effect = flaky
+    client.get_application_ids.return_value = {"applies": [{"id": "1"}, {"id": "3"}]}
+
+    assert [app["id"] for app in store.get_by_vacancy(20)] == ["3"]
+    assert [app["id"] for app in store.get_by_vacancy(10)] == ["1", "2"]
+    # Повторная загрузка откладывается, а не выполняется на каждый запрос
+    assert client.get_application_ids.call_count == 2
+
+
+def test_failed_update_does_not_touch_index():
+    client = make_client()
+    store = AvitoApplicationStore(client, ttl=300, chunk_size=100, workers=1)
+    store.refresh()
+    client.get_applications_by_ids.side_effect = requests.HTTPError("503")
+
+    with pytest.raises(requests.HTTPError):
+        store.fetch_updated_since("2024-05-01")
+
+    assert len(store.get_by_vacancy(10)) == 2
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from api.avito import main as avito_main
+from api.avito.main import AvitoAPIClient
+
+
+def make_response(status_code, payload=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = payload
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status_code}")
+    return response
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = AvitoAPIClient()
+    client.rate_limiter = MagicMock()
+    monkeypatch.setattr(client, "get_access_token", lambda: "token")
+    monkeypatch.setattr(avito_main.time, "sleep", lambda seconds: None)
+    return client
+
+
+def test_applications_retry_after_429_with_retry_after(client, monkeypatch):
+    responses = iter([
+        make_response(429, headers={"Retry-After": "2"}),
+        make_response(200, {"applies": [{"id": "1"}]}),
+    ])
+    request = MagicMock(side_effect=lambda **kwargs: next(responses))
+    monkeypatch.setattr(avito_main.http, "request", request)
+
+    assert client.get_application_ids(updated_at_from="2024-05-01") == {"applies": [{"id": "1"}]}
+
+    client.rate_limiter.penalize.assert_called_once_with(2.0)
+    assert client.rate_limiter.acquire.call_count == 2
+    assert request.call_args.kwargs["params"] == {"updatedAtFrom": "2024-05-01"}
+
+
+def test_vacancies_fallback_after_repeated_429(client, monkeypatch):
+    request = MagicMock(side_effect=lambda **kwargs: make_response(429))
+    monkeypatch.setattr(avito_main.http, "request", request)
+
+    assert client.get_vacancies() == {"items": []}
+    assert request.call_count == 3
+    assert client.rate_limiter.penalize.call_count == 3
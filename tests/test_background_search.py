@@ -0,0 +1,199 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from data_manager.main import DataManager
+from data_manager.search_engine import SearchEngine
+
+
+def make_manager(search):
+    dm = DataManager.__new__(DataManager)
+    dm.redis_manager = MagicMock()
+    dm.redis_manager.create_task.return_value = "task-1"
+    dm.search_engine = MagicMock()
+    dm.search_engine.search.side_effect = search
+    dm.search_engine.summarize_resume.side_effect = SearchEngine.summarize_resume
+    dm.search_executor = ThreadPoolExecutor(max_workers=2)
+    dm.export_executor = ThreadPoolExecutor(max_workers=1)
+    return dm
+
+
+def test_search_returns_before_search_finishes():
+    release = threading.Event()
+
+    def search(on_page=None, **kwargs):
+        release.wait(timeout=5)
+        on_page(20, 40)
+        on_page(40, 40)
+        return [{"id": "1"}, {"id": "2"}]
+
+    dm = make_manager(search)
+    task_id = dm.search_resumes(keywords="python", total=40, per_page=20)
+
+    assert task_id == "task-1"
+    dm.redis_manager.update_task_resume_ids.assert_not_called()
+
+    release.set()
+    dm.search_executor.shutdown(wait=True)
+
+    dm.redis_manager.update_task_resume_ids.assert_called_once_with("task-1", ["1", "2"])
+    summaries = dm.redis_manager.set_task_summaries.call_args.args[1]
+    assert summaries["2"]["tier"] == "summary"
+    progress = [c.args[1:3] for c in dm.redis_manager.update_task_progress.call_args_list]
+    assert progress == [(0, "queued"), (0, "searching"), (50, "searching"), (99, "searching"), (100, "completed")]
+
+
+def test_search_failure_is_recorded_in_task(monkeypatch):
+    def search(on_page=None, **kwargs):
+        raise ValueError("Параметр 'per_page' не может быть больше 50.")
+
+    session = MagicMock()
+    monkeypatch.setattr("data_manager.main.ScopedSession", session)
+    dm = make_manager(search)
+    dm.search_resumes(keywords="python", per_page=60)
+    dm.search_executor.shutdown(wait=True)
+
+    dm.redis_manager.update_task_progress.assert_called_with(
+        "task-1", 0, "failed", error="Параметр 'per_page' не может быть больше 50."
+    )
+    dm.redis_manager.update_task_resume_ids.assert_not_called()
+    # Сессия БД потока поиска закрывается и при ошибке
+    session.remove.assert_called_once_with()
+
+
+def make_engine(cached_ids):
+    engine = SearchEngine.__new__(SearchEngine)
+    engine.get_cached_resumes = MagicMock(side_effect=lambda ids, source: {
+        resume_id: {"id": resume_id, "source": source} for resume_id in ids if resume_id in cached_ids
+    })
+    engine.fetch_resume_details = MagicMock(side_effect=lambda refs, on_progress=None: [
+        {"id": resume_id, "source": source} for resume_id, source in refs
+    ])
+    engine.save_many_to_cache = MagicMock()
+    return engine
+
+
+def test_export_reads_selected_resumes_from_cache_only():
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids={"1", "2", "7"})
+
+    result = dm.export_resumes("task-1", resume_ids=["2", "avito_7", "3", "1"])
+
+    assert [r["id"] for r in result] == ["2", "7", "1"]
+    assert dm.search_engine.get_cached_resumes.call_count == 2
+    dm.search_engine.fetch_resume_details.assert_not_called()
+    dm.redis_manager.get_task_resume_ids.assert_not_called()
+
+
+def test_export_of_avito_task_looks_up_avito_resumes():
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids={"7"})
+
+    result = dm.export_resumes("task-1", resume_ids=["7", "8"], source="avito")
+
+    assert result == [{"id": "7", "source": "avito", "tier": "full"}]
+    dm.search_engine.get_cached_resumes.assert_called_once_with(["7", "8"], source="avito")
+    dm.search_engine.fetch_resume_details.assert_not_called()
+
+
+def test_export_rows_match_prefixed_avito_ids():
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids={"7"})
+    dm.redis_manager.get_task_meta.return_value = {"description": ""}
+
+    rows = dm.build_export_rows("task-1", [{"id": "avito_7", "title": "Курьер"}, {"id": "avito_8"}], source="avito")
+
+    assert rows[0] == {"id": "avito_7", "title": "Курьер", "source": "avito", "tier": "full"}
+    assert rows[1] == {"id": "avito_8"}
+
+
+def test_task_list_uses_summaries_and_cached_details_only():
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids={"2"})
+    dm.redis_manager.get_task_resume_ids.return_value = ["1", "2", "3"]
+    dm.redis_manager.get_task_summaries.return_value = {
+        "1": SearchEngine.summarize_resume({"id": "1", "title": "Python", "age": 30}),
+        "3": SearchEngine.summarize_resume({"id": "3", "title": "Go"}),
+    }
+
+    result = dm.get_task_resumes("task-1", limit=3)
+
+    assert [(r["id"], r["tier"]) for r in result["items"]] == [("1", "summary"), ("2", "full"), ("3", "summary")]
+    assert result["items"][0]["age"] == 30
+    dm.search_engine.fetch_resume_details.assert_not_called()
+
+
+def test_summary_has_resume_link():
+    summary = SearchEngine.summarize_resume({"id": "1", "alternate_url": "https://hh.ru/resume/1"})
+
+    assert summary["link"] == "https://hh.ru/resume/1"
+    assert SearchEngine.summarize_resume({"id": "2", "url": "https://avito.ru/2"}, "avito")["link"] == "https://avito.ru/2"
+
+
+def test_task_page_resolves_only_its_slice():
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids=set())
+    dm.redis_manager.get_task_resume_ids.return_value = ["50", "51"]
+    dm.redis_manager.get_task_summaries.return_value = {
+        "50": SearchEngine.summarize_resume({"id": "50"}),
+        "51": SearchEngine.summarize_resume({"id": "51"}),
+    }
+
+    result = dm.get_task_resumes("task-1", offset=50, limit=2)
+
+    assert [r["id"] for r in result["items"]] == ["50", "51"]
+    dm.redis_manager.get_task_resume_ids.assert_called_once_with("task-1", offset=50, limit=2)
+    assert dm.redis_manager.get_task_summaries.call_args.args[1] == ["50", "51"]
+
+
+def test_page_details_progress_keeps_search_status():
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids=set())
+    dm.search_engine.fetch_resume_details.side_effect = lambda refs, on_progress=None: [
+        on_progress(done, len(refs)) or {"id": resume_id} for done, (resume_id, _) in enumerate(refs, start=1)
+    ]
+    dm.redis_manager.get_task_resume_ids.return_value = ["1", "2"]
+
+    dm.get_task_resumes("task-1", limit=2, detail="full")
+
+    dm.redis_manager.update_task_progress.assert_not_called()
+    dm.redis_manager.update_task_details_progress.assert_called_with("task-1", 100)
+
+
+def test_export_task_prepares_rows_in_background(tmp_path, monkeypatch):
+    from config import conf
+    monkeypatch.setattr(conf, "OUTPUT_DIR", str(tmp_path))
+    session = MagicMock()
+    monkeypatch.setattr("data_manager.main.ScopedSession", session)
+
+    class Exporter:
+        EXTENSION = "csv"
+
+        def __init__(self, data):
+            self.data = data
+
+        def save(self, path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.writelines(f"{row['id']} {row.get('source', '-')}\n" for row in self.data)
+
+    dm = make_manager(None)
+    dm.search_engine = make_engine(cached_ids={"1"})
+    dm.redis_manager.get_task_meta.return_value = {"description": ""}
+    rows = [{"id": str(i)} for i in range(40)]
+
+    task_id = dm.start_export_task(Exporter, "search-task", rows, source="avito")
+    dm.export_executor.shutdown(wait=True)
+
+    with open(dm.export_file_path(task_id, "csv")) as f:
+        lines = f.readlines()
+    assert len(lines) == 40 and lines[:2] == ["0 -\n", "1 avito\n"]
+    dm.search_engine.fetch_resume_details.assert_not_called()
+    progress = [c.args[1:3] for c in dm.redis_manager.update_task_progress.call_args_list]
+    assert progress[0] == (0, "queued") and progress[1] == (0, "preparing") and progress[-1] == (100, "completed")
+    assert all(status == "exporting" for _, status in progress[2:-1])
+    session.remove.assert_called_once_with()
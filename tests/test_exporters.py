@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import io
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+# Модуль экспорта тянет за собой E-Staff бота (pyautogui), без него тесты пропускаются
+exporters = pytest.importorskip("data_manager.exporters")
+
+
+def make_resumes(count):
+    return [
+        {
+            "id": str(i),
+            "first_name": "Иван",
+            "last_name": f"Петров{i}",
+            "age": 30,
+            "area": {"name": "Москва"},
+            "title": "Python",
+            "salary": {"amount": 100000, "currency": "RUR"},
+            "experience": [{"company": "ООО", "position": "Разработчик", "description": "Бэкенд"}],
+            "match_percent": 80,
+            "link": f"https://hh.ru/resume/{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def read_csv(exporter):
+    content = b"".join(exporter.stream()).decode("utf-8")
+    return list(csv.reader(io.StringIO(content)))
+
+
+def read_xlsx(exporter):
+    workbook = openpyxl.load_workbook(io.BytesIO(b"".join(exporter.stream())))
+    sheet = workbook["Резюме"]
+    return sheet, [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+def test_csv_stream_has_header_and_rows():
+    rows = read_csv(exporters.CSVExporter(data=iter(make_resumes(450))))
+
+    assert rows[0] == exporters.Exporter.FIELDNAMES
+    assert len(rows) == 451
+    assert rows[1][:4] == ["0", "Иван Петров0", "30", "Москва"]
+    assert rows[1][5] == "100000 RUR"
+    assert "Компания: ООО" in rows[1][6]
+    assert rows[-1][0] == "449"
+
+
+def test_csv_stream_of_empty_input_has_only_header():
+    assert read_csv(exporters.CSVExporter(data=[])) == [exporters.Exporter.FIELDNAMES]
+
+
+def test_xlsx_stream_has_header_and_rows():
+    sheet, rows = read_xlsx(exporters.XLSXExporter(data=iter(make_resumes(3))))
+
+    assert rows[0] == exporters.Exporter.FIELDNAMES
+    assert len(rows) == 4
+    assert rows[3][0] == "2" and rows[3][-1] == "https://hh.ru/resume/2"
+
+
+def test_xlsx_stream_of_empty_input_has_only_header():
+    _, rows = read_xlsx(exporters.XLSXExporter(data=[]))
+
+    assert rows == [exporters.Exporter.FIELDNAMES]
+
+
+def test_xlsx_column_widths_are_sampled_from_first_rows():
+    resumes = make_resumes(250)
+    # Длинная должность за пределами выборки не влияет на ширину колонки
+    resumes[240]["title"] = "Очень длинное название должности " * 3
+    sheet, rows = read_xlsx(exporters.XLSXExporter(data=iter(resumes)))
+
+    assert len(rows) == 251
+    assert rows[241][4] == resumes[240]["title"].strip()
+    title_width = sheet.column_dimensions["E"].width
+    assert title_width == len("Должность") + 2
+    assert sheet.column_dimensions["I"].width == len("https://hh.ru/resume/199") + 2
@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.hh.cache import ResponseCache
+
+BASE = "https://api.hh.ru"
+
+
+class FakeRedis:
+    """Минимальная in-memory замена Redis для строк и счётчиков."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def hincrby(self, key, field, amount):
+        data = self.hashes.setdefault(key, {})
+        data[field] = int(data.get(field, 0)) + amount
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes.get(key, {}).items()}
+
+
+@pytest.fixture
+def cache():
+    redis_client = FakeRedis()
+    return ResponseCache(redis_client=redis_client, stats_client=redis_client)
+
+
+def make_response(status, data=None, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = data
+    return response
+
+
+def test_policies_per_endpoint(cache):
+    from config import conf
+
+    assert cache.policy_for(f"{BASE}/resumes/abc123") == ("resume", conf.HH_CACHE_TTL_RESUME)
+    assert cache.policy_for(f"{BASE}/resumes") == ("search", conf.HH_CACHE_TTL_SEARCH)
+    assert cache.policy_for(f"{BASE}/vacancies/42") == ("vacancies", conf.HH_CACHE_TTL_VACANCIES)
+    assert cache.policy_for(f"{BASE}/me") == ("other", 5)
+
+
+def test_values_are_compressed_and_counted(cache):
+    url = f"{BASE}/resumes/abc123"
+    cache.set(url, {}, {"title": "Python-разработчик" * 50})
+
+    raw = cache.redis.values[cache.make_key(url, {})]
+    assert cache.codec.is_encoded(raw) and len(raw) < len("Python-разработчик" * 50)
+
+    assert cache.get(url, {})["title"].startswith("Python")
+    assert cache.get(f"{BASE}/resumes/other", {}) is None
+    assert cache.stats()["resume"] == {"hits": 1, "misses": 1, "revalidated": 0, "hit_rate": 0.5}
+
+
+def test_stale_entry_is_revalidated_with_etag(cache, monkeypatch):
+    from config import conf
+    from api.hh import main as hh_main
+
+    monkeypatch.setattr(conf, "HH_ACCESS_TOKENS", ["token-a"])
+    client = hh_main.HHApiClient()
+    client.response_cache = cache
+    client.token_pool = MagicMock()
+    client.token_pool.acquire.return_value = "token-a"
+
+    url = f"{BASE}/vacancies/42"
+    cache.set(url, {}, {"id": "42"}, make_response(200, headers={"ETag": '"v1"'}))
+    assert cache.redis.ttls[cache.make_key(url, {})] > conf.HH_CACHE_TTL_VACANCIES
+    # Ответ устарел
+    monkeypatch.setattr(conf, "HH_CACHE_TTL_VACANCIES", 0)
+
+    get = MagicMock(return_value=make_response(304))
+    monkeypatch.setattr(hh_main.http, "get", get)
+
+    assert client.get_vacancy_by_id(42) == {"id": "42"}
+    assert get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats()["vacancies"]["revalidated"] == 1
+
+
+
+def test_resume_view_is_not_consumed_on_revalidation(cache, monkeypatch):
+    from config import conf
+    from api.hh import main as hh_main
+
+    monkeypatch.setattr(conf, "HH_ACCESS_TOKENS", ["token-a"])
+    client = hh_main.HHApiClient()
+    client.response_cache = cache
+    client.token_pool = MagicMock()
+    client.token_pool.acquire.return_value = "token-a"
+    client.limit_tracker = MagicMock()
+    client.check_and_handle_resume_limit = MagicMock()
+
+    url = f"{BASE}/resumes/abc123"
+    cache.set(url, {}, {"id": "abc123"}, make_response(200, headers={"ETag": '"v1"'}))
+    monkeypatch.setattr(conf, "HH_CACHE_TTL_RESUME", 0)
+
+    monkeypatch.setattr(hh_main.http, "get", MagicMock(return_value=make_response(304)))
+    assert client.get_resume_details("abc123") == {"id": "abc123"}
+    client.limit_tracker.consume.assert_not_called()
+
+    fresh = make_response(200, {"id": "abc123", "title": "Python"}, {"ETag": '"v2"'})
+    monkeypatch.setattr(hh_main.http, "get", MagicMock(return_value=fresh))
+    assert client.get_resume_details("abc123")["title"] == "Python"
+    client.limit_tracker.consume.assert_called_once()
+
+def test_token_scoped_endpoints_are_cached_per_token(cache):
+    token = {"value": "token-a"}
+    cache.token_lookup = lambda: token["value"]
+
+    me = f"{BASE}/me"
+    cache.set(me, {}, {"id": "manager-a"})
+    cache.set(f"{BASE}/vacancies/42", {}, {"id": "42"})
+
+    token["value"] = "token-b"
+    assert cache.get(me, {}) is None
+    assert cache.get(f"{BASE}/vacancies/42", {}) == {"id": "42"}
+
+    token["value"] = "token-a"
+    assert cache.get(me, {}) == {"id": "manager-a"}
@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import patch
+
+from api.hh.main import HHApiClient
+
+
+@pytest.fixture
+def hh_client(monkeypatch):
+    from config import conf
+    monkeypatch.setattr(conf, "HH_ACCESS_TOKENS", ["token-a", "token-b"])
+    monkeypatch.setattr(conf, "HH_PAGE_WORKERS_PER_TOKEN", 2)
+    return HHApiClient()
+
+
+def make_pages(found, page_size, delay=0.0):
+    pages = -(-found // page_size)
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(base_params, page, per_page):
+        with lock:
+            calls.append(page)
+        # Первые страницы отвечают дольше, чтобы проверить сохранение порядка
+        time.sleep(delay * (pages - page))
+        start = page * per_page
+        items = [{"id": str(i)} for i in range(start, min(start + per_page, found))]
+        return {"found": found, "pages": pages, "items": items}
+
+    return fetch, calls
+
+
+def test_concurrent_pages_keep_order(hh_client):
+    fetch, calls = make_pages(found=500, page_size=50, delay=0.01)
+    progress = []
+
+    with patch.object(hh_client, "_fetch_resume_page", side_effect=fetch):
+        result = hh_client.get_all_resumes(
+            "python", region=["1"], total=200, per_page=50, concurrency=4,
+            on_page=lambda loaded, total: progress.append(loaded),
+        )
+
+    assert [item["id"] for item in result["items"]] == [str(i) for i in range(200)]
+    assert sorted(calls) == [0, 1, 2, 3]
+    assert progress[-1] == 200
+
+
+def test_concurrent_pages_stop_after_short_page(hh_client):
+    # HH сообщает о 10 страницах, но реально резюме заканчиваются на второй
+    def fetch(base_params, page, per_page):
+        items = [{"id": f"{page}-{i}"} for i in range(per_page if page < 1 else (10 if page == 1 else 0))]
+        return {"found": 500, "pages": 10, "items": items}
+
+    with patch.object(hh_client, "_fetch_resume_page", side_effect=fetch):
+        result = hh_client.get_all_resumes("python", region=["1"], total=500, per_page=50, concurrency=4)
+
+    assert result["found"] == 60
+    assert result["items"][-1]["id"] == "1-9"
+
+
+def test_sequential_mode(hh_client):
+    fetch, calls = make_pages(found=120, page_size=50)
+
+    with patch.object(hh_client, "_fetch_resume_page", side_effect=fetch):
+        result = hh_client.get_all_resumes("python", region=["1"], total=100, per_page=50, concurrency=1)
+
+    assert result["found"] == 100
+    assert calls == [0, 1]
+
+
+def test_build_search_params_does_not_mutate_labels():
+    labels = ["only_with_photo"]
+    params = HHApiClient._build_search_params("python", ["1"], salary_from=100000, labels=labels)
+
+    assert params["label"] == ["only_with_photo", "only_with_salary"]
+    assert labels == ["only_with_photo"]
+
+
+def test_negotiations_since_stop_at_cursor(hh_client):
+    pages = [
+        {"found": 60, "items": [{"id": i, "updated_at": f"2024-05-{30 - i:02d}T10:00:00+0300"} for i in range(2)]
+         + [{"id": 2, "updated_at": "2024-05-01T10:00:00+0300"}] * 48},
+        {"found": 60, "items": []},
+    ]
+
+    with patch.object(hh_client, "_fetch_json", side_effect=pages) as fetch:
+        result = hh_client.get_negotiations_updated_since(7, "2024-05-10T10:00:00+0300")
+
+    assert result == {"found": 60, "items": pages[0]["items"][:2]}
+    assert fetch.call_count == 1
+
+
+def test_negotiations_since_include_same_second_once(hh_client):
+    pages = [
+        {"found": 4, "items": [
+            {"id": 1, "updated_at": "2024-05-10T10:00:01+0300"},
+            {"id": 2, "updated_at": "2024-05-10T10:00:00+0300"},
+            {"id": 2, "updated_at": "2024-05-10T10:00:00+0300"},
+            {"id": 3, "updated_at": "2024-05-10T09:59:59+0300"},
+        ]},
+    ]
+
+    with patch.object(hh_client, "_fetch_json", side_effect=pages):
+        result = hh_client.get_negotiations_updated_since(7, "2024-05-10T10:00:00+0300")
+
+    assert [item["id"] for item in result["items"]] == [1, 2]
@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import patch
+
+from utils import http
+
+
+def test_session_is_shared_per_host():
+    http.close_sessions()
+    first = http.get_session("https://api.hh.ru/resumes")
+    assert http.get_session("https://api.hh.ru/me") is first
+    assert http.get_session("https://api.avito.ru/token") is not first
+    http.close_sessions()
+
+
+def test_default_timeout_is_applied():
+    adapter = http.TimeoutHTTPAdapter(timeout=(5, 15))
+    with patch("requests.adapters.HTTPAdapter.send") as send:
+        adapter.send("request")
+        adapter.send("request", timeout=3)
+
+    assert send.call_args_list[0].kwargs["timeout"] == (5, 15)
+    assert send.call_args_list[1].kwargs["timeout"] == 3
+
+
+def test_retry_policy_skips_rate_limits():
+    retry = http.build_retry()
+    assert 429 not in retry.status_forcelist
+    # 504 повторяет retry_on_limit_exceeded в клиенте HH
+    assert 504 not in retry.status_forcelist
+    assert "POST" not in retry.allowed_methods
+    assert not retry.is_retry("GET", 429, has_retry_after=True)
@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import MagicMock
+
+from utils.rate_limit import RedisTokenBucket, TokenBucket, parse_retry_after
+
+
+def test_burst_does_not_wait():
+    bucket = TokenBucket(rate=10, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        assert bucket.acquire() == 0
+    assert time.monotonic() - started < 0.05
+
+
+def test_waits_only_when_budget_exhausted():
+    bucket = TokenBucket(rate=20, capacity=1)
+    bucket.acquire()
+    waited = bucket.acquire()
+    assert 0.03 <= waited <= 0.1
+
+
+def test_penalize_blocks_requests():
+    bucket = TokenBucket(rate=100, capacity=5)
+    bucket.penalize(0.1)
+    assert bucket.acquire() >= 0.09
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_redis_bucket_falls_back_to_local():
+    redis_client = MagicMock()
+    redis_client.register_script.side_effect = ConnectionError("redis down")
+    bucket = RedisTokenBucket(redis_client, "avito", rate=10, capacity=2)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    # Повторно к Redis не обращаемся, пока действует период локального режима
+    assert redis_client.register_script.call_count == 1
+
+
+def test_redis_bucket_uses_script_result():
+    script = MagicMock(side_effect=["0.05", "0"])
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = script
+    bucket = RedisTokenBucket(redis_client, "avito", rate=10, capacity=1)
+
+    waited = bucket.acquire()
+
+    assert 0.04 <= waited <= 0.1
+    assert script.call_args.kwargs["keys"] == ["rate_limit:avito"]
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import pytest
+
+from redis_manager.codec import CodecError, RedisCodec
+
+RESUME = {
+    "id": "abc123",
+    "title": "Python-разработчик",
+    "experience": [{"company": "ООО Ромашка", "description": "Разработка сервисов на Flask. " * 40}],
+}
+
+
+@pytest.mark.parametrize("compression", ["zlib", "zstd", "none"])
+def test_roundtrip(compression):
+    codec = RedisCodec(compression=compression)
+
+    raw = codec.encode(RESUME)
+
+    assert raw.startswith(RedisCodec.MAGIC)
+    assert codec.decode(raw) == RESUME
+
+
+def test_large_values_are_compressed_small_are_not():
+    codec = RedisCodec(compression="zlib", min_size=512)
+
+    large = codec.encode(RESUME)
+    small = codec.encode({"status": "completed"})
+
+    assert len(large) < len(json.dumps(RESUME, ensure_ascii=False).encode("utf-8")) / 3
+    assert small[4] == RedisCodec.COMPRESSION_NONE
+    assert codec.decode(small) == {"status": "completed"}
+
+
+def test_reads_legacy_json():
+    codec = RedisCodec()
+    legacy = json.dumps(RESUME, ensure_ascii=False)
+
+    assert codec.decode(legacy) == RESUME
+    assert codec.decode(legacy.encode("utf-8")) == RESUME
+    assert codec.decode(None) is None
+
+
+def test_values_written_with_other_settings_are_readable():
+    raw = RedisCodec(compression="zlib").encode(RESUME)
+
+    assert RedisCodec(compression="none").decode(raw) == RESUME
+
+
+def test_unknown_format_raises():
+    codec = RedisCodec()
+
+    with pytest.raises(CodecError):
+        codec.decode(RedisCodec.MAGIC + bytes((99, 1, 0)) + b"{}")
+    with pytest.raises(CodecError):
+        codec.decode(b"not json")
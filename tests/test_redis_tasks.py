@@ -0,0 +1,297 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+import pytest
+
+from redis_manager.codec import RedisCodec
+from redis_manager.main import RedisManager
+
+
+class FakeRedis:
+    """Минимальная in-memory замена Redis для хэшей, списков и строк."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.lists = {}
+        self.values = {}
+        self.zsets = {}
+        self.ttls = {}
+        self.decode_responses = True
+
+    def binary(self):
+        """Тот же Redis, но без decode_responses (как binary_client)."""
+        view = FakeRedis.__new__(FakeRedis)
+        view.__dict__.update(self.__dict__)
+        view.decode_responses = False
+        return view
+
+    def _stores(self):
+        return (self.hashes, self.lists, self.values, self.zsets)
+
+    def exists(self, *keys):
+        return sum(1 for key in keys if any(key in store for store in self._stores()))
+
+    def expire(self, key, ttl):
+        if self.exists(key):
+            self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            for store in self._stores():
+                if store.pop(key, None) is not None:
+                    deleted += 1
+            self.ttls.pop(key, None)
+        return deleted
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        data = self.hashes.setdefault(key, {})
+        for k, v in (mapping or {}).items():
+            data[k] = v if isinstance(v, bytes) else str(v)
+        if field is not None:
+            data[field] = value if isinstance(value, bytes) else str(value)
+
+    def hgetall(self, key):
+        data = dict(self.hashes.get(key, {}))
+        if self.decode_responses:
+            return data
+        return {k.encode("utf-8"): v if isinstance(v, bytes) else v.encode("utf-8") for k, v in data.items()}
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(str(v) for v in values)
+
+    def lrange(self, key, start, stop):
+        items = self.lists.get(key, [])
+        return items[start:] if stop == -1 else items[start:stop + 1]
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def hincrby(self, key, field, amount):
+        data = self.hashes.setdefault(key, {})
+        data[field] = str(int(data.get(field, 0)) + amount)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        members = sorted((score, member) for member, score in self.zsets.get(key, {}).items() if score <= high)
+        return [member for _, member in members][start:start + num if num else None]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def ttl(self, key):
+        if not self.exists(key):
+            return -2
+        return self.ttls.get(key, -1)
+
+    def memory_usage(self, key):
+        return 100 if self.exists(key) else None
+
+    def unlink(self, *keys):
+        return self.delete(*keys)
+
+    def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        return [key for store in self._stores() for key in list(store) if key.startswith(prefix)]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        def update_task(keys, args):
+            meta_key = keys[0]
+            if not self.exists(meta_key):
+                return 0
+            ttl, fields = int(args[0]), args[1:]
+            self.hset(meta_key, mapping=dict(zip(fields[::2], fields[1::2])))
+            for key in keys:
+                self.expire(key, ttl)
+            return 1
+        return update_task
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return call
+
+    def execute(self, raise_on_error=True):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def manager():
+    rm = RedisManager.__new__(RedisManager)
+    rm.client = FakeRedis()
+    rm.binary_client = rm.client.binary()
+    rm.codec = RedisCodec(compression="zlib")
+    rm.ttl_seconds = 3600
+    rm.key_prefix = "test_"
+    rm._update_script = None
+    return rm
+
+
+def test_task_is_stored_as_hash_and_list(manager):
+    task_id = manager.create_task(["1", "2", "3"], description="Python")
+
+    assert manager.client.hgetall(manager._meta_key(task_id))["description"] == "Python"
+    assert manager.client.lists[manager._ids_key(task_id)] == ["1", "2", "3"]
+    assert manager.get_task_data(task_id)["resume_ids"] == ["1", "2", "3"]
+    assert manager.get_task_meta(task_id)["resume_count"] == 3
+
+
+def test_resume_ids_are_paginated(manager):
+    task_id = manager.create_task([str(i) for i in range(10)])
+
+    assert manager.get_task_resume_ids(task_id, offset=2, limit=3) == ["2", "3", "4"]
+    assert manager.get_task_resume_ids(task_id, offset=8) == ["8", "9"]
+    assert manager.get_task_resume_ids(task_id, offset=0, limit=0) == []
+    assert manager.get_task_resume_ids("missing", offset=0, limit=5) is None
+
+
+def test_progress_updates_do_not_touch_resume_ids(manager):
+    task_id = manager.create_task(description="Python")
+    manager.update_task_resume_ids(task_id, ["1", "2"])
+
+    manager.update_task_progress(task_id, 40, "searching")
+
+    meta = manager.get_task_meta(task_id)
+    assert meta["progress"] == 40 and meta["status"] == "searching"
+    assert meta["description"] == "Python" and meta["resume_count"] == 2
+
+
+def test_details_progress_does_not_change_task_status(manager):
+    task_id = manager.create_task(description="Python")
+    manager.update_task_progress(task_id, 100, "completed")
+
+    manager.update_task_details_progress(task_id, 35)
+
+    meta = manager.get_task_meta(task_id)
+    assert meta["status"] == "completed" and meta["progress"] == 100
+    assert meta["details_progress"] == 35
+
+
+def test_updates_do_not_recreate_missing_tasks(manager):
+    manager.update_task_progress("missing", 100, "completed")
+    manager.update_task_resume_ids("missing", ["1"])
+
+    assert manager.get_task_data("missing") is None
+    assert manager.client.hashes == {} and manager.client.lists == {}
+
+
+def test_legacy_json_tasks_are_readable(manager):
+    manager.client.values[manager._make_key("old")] = json.dumps(
+        {"resume_ids": ["a", "b", "c"], "description": "Legacy", "status": "completed"}
+    )
+
+    assert manager.get_task_meta("old")["resume_count"] == 3
+    assert manager.get_task_resume_ids("old", offset=1, limit=1) == ["b"]
+    assert manager.get_task("old") == ["a", "b", "c"]
+
+
+def test_clear_old_tasks_uses_creation_index(manager):
+    old_task = manager.create_task(["1", "2"])
+    new_task = manager.create_task(["3"])
+    manager.client.zsets[manager._task_index_key()][old_task] -= manager.ttl_seconds + 1
+
+    stats = manager.clear_old_tasks()
+
+    assert stats["tasks"] == 1 and stats["keys"] == 2 and stats["bytes"] == 200
+    assert manager.get_task_data(old_task) is None
+    assert manager.get_task_resume_ids(new_task) == ["3"]
+    assert old_task not in manager.client.zsets[manager._task_index_key()]
+
+
+def test_clear_old_tasks_removes_keys_without_ttl(manager):
+    task_id = manager.create_task(["1"])
+    manager.client.values[manager._make_key("orphan")] = json.dumps({"resume_ids": []})
+
+    stats = manager.clear_old_tasks()
+
+    assert stats == {"tasks": 0, "keys": 1, "bytes": 100}
+    assert manager.get_task_resume_ids(task_id) == ["1"]
+    assert manager.cleanup_stats()["keys"] == 1
+
+
+def test_get_many_and_set_many(manager):
+    manager.set_many({"a": {"x": 1}, "b": [1, 2]}, ttl=60)
+    manager.client.values["legacy"] = json.dumps({"y": 2})
+    manager.client.values["broken"] = RedisCodec.MAGIC + bytes((99, 1, 0))
+
+    assert manager.get_many(["a", "b", "legacy", "broken", "missing"]) == {
+        "a": {"x": 1}, "b": [1, 2], "legacy": {"y": 2},
+    }
+    assert manager.client.ttls["a"] == 60
+
+
+def test_task_meta_and_values_in_one_call(manager):
+    task_id = manager.create_task(["1", "2"], description="Python")
+    manager.update_task_progress(task_id, 100, "completed")
+    manager.set_value(f"search_params:{task_id}", {"keywords": "python"}, 60)
+
+    meta, values = manager.get_task_meta_with_values(task_id, [f"search_params:{task_id}"])
+
+    assert meta["status"] == "completed" and meta["progress"] == 100 and meta["resume_count"] == 2
+    assert values == {f"search_params:{task_id}": {"keywords": "python"}}
+
+
+def test_hash_values_are_encoded_per_field(manager):
+    manager.set_hash("vacancies", {"1": {"title": "Python"}, "2": {"title": "Go"}}, ttl=60)
+    manager.set_hash("vacancies", {"2": {"title": "Rust"}})
+    manager.delete_hash_fields("vacancies", ["1"])
+
+    assert manager.get_hash("vacancies") == {"2": {"title": "Rust"}}
+    assert manager.client.ttls["vacancies"] == 60
+
+
+def test_task_summaries_are_stored_with_task(manager):
+    task_id = manager.create_task(["1", "2"])
+    manager.set_task_summaries(task_id, {"1": {"id": "1", "title": "Python", "tier": "summary"}})
+
+    assert manager.get_task_summaries(task_id, ["1", "2"]) == {"1": {"id": "1", "title": "Python", "tier": "summary"}}
+
+    manager.delete_task(task_id)
+    assert manager.get_task_summaries(task_id, ["1"]) == {}
+
+
+def test_task_progress_extends_summaries_ttl(manager):
+    task_id = manager.create_task(["1"])
+    manager.set_task_summaries(task_id, {"1": {"id": "1", "title": "Python", "tier": "summary"}})
+    summaries_key = manager._summaries_key(task_id)
+    manager.client.ttls[summaries_key] = 10
+
+    manager.update_task_progress(task_id, 50, status="running")
+
+    assert manager.client.ttl(summaries_key) == manager.ttl_seconds
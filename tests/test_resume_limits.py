@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import MagicMock
+
+from api.hh.limits import ResumeLimitTracker
+
+
+class FakeRedis:
+    """Минимальная in-memory замена Redis для хэшей."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self.hashes.get(key, {}).items()}
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        data = self.hashes.setdefault(key, {})
+        if mapping:
+            data.update(mapping)
+        if field is not None:
+            data[field] = value
+
+    def hincrby(self, key, field, amount):
+        data = self.hashes.setdefault(key, {})
+        data[field] = int(data.get(field, 0)) + amount
+
+    def exists(self, key):
+        return int(key in self.hashes)
+
+    def expire(self, key, ttl):
+        pass
+
+
+def make_client(left_by_token):
+    client = MagicMock()
+    client.access_token = "token-a"
+    client.get_current_manager.return_value = {"manager": {"id": "42"}}
+    client.get_resume_limits.side_effect = lambda manager_id, use_cache=True: {
+        "left": {"resume_view": left_by_token[client.access_token]},
+        "limits": {"resume_view": 100},
+        "spend": {"resume_view": 100 - left_by_token[client.access_token]},
+    }
+
+    def next_token(**kwargs):
+        client.access_token = "token-b" if client.access_token == "token-a" else "token-a"
+
+    client.use_next_token.side_effect = next_token
+    return client
+
+
+@pytest.fixture(autouse=True)
+def two_tokens(monkeypatch):
+    from config import conf
+    monkeypatch.setattr(conf, "HH_ACCESS_TOKENS", ["token-a", "token-b"])
+
+
+def test_sync_only_once_within_interval():
+    client = make_client({"token-a": 5, "token-b": 5})
+    tracker = ResumeLimitTracker(client, redis_client=FakeRedis(), sync_interval=300)
+
+    for _ in range(3):
+        assert tracker.ensure_available()
+        tracker.consume()
+
+    client.get_current_manager.assert_called_once()
+    client.get_resume_limits.assert_called_once()
+    assert tracker.get_state()["left"] == 2
+
+
+def test_rotates_when_local_counter_hits_zero():
+    client = make_client({"token-a": 1, "token-b": 10})
+    tracker = ResumeLimitTracker(client, redis_client=FakeRedis(), sync_interval=300)
+
+    assert tracker.ensure_available()
+    tracker.consume()
+    assert tracker.ensure_available()
+
+    assert client.access_token == "token-b"
+    client.use_next_token.assert_called_once()
+
+
+def test_invalidate_forces_resync():
+    client = make_client({"token-a": 5, "token-b": 5})
+    tracker = ResumeLimitTracker(client, redis_client=FakeRedis(), sync_interval=300)
+
+    tracker.ensure_available()
+    tracker.invalidate()
+    tracker.ensure_available()
+
+    assert client.get_resume_limits.call_count == 2
+    # ID менеджера берётся из сохранённого состояния
+    client.get_current_manager.assert_called_once()
+
+
+def test_invalidate_without_state_does_not_create_hash():
+    client = make_client({"token-a": 5})
+    redis_client = FakeRedis()
+    tracker = ResumeLimitTracker(client, redis_client=redis_client, sync_interval=300)
+
+    tracker.invalidate("token-a")
+
+    assert redis_client.hashes == {}
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+
+from database.repository import ResumeRepository
+
+
+def test_upsert_many_single_statement():
+    db = MagicMock()
+    repo = ResumeRepository(db)
+
+    saved = repo.upsert_many([
+        {"id": "1", "title": "Python", "area": {"name": "Москва"}, "total_experience": {"months": 24}},
+        {"id": "2", "title": "Go"},
+        {"id": "1", "title": "Python (дубликат)"},
+        {"title": "Без ID"},
+    ], source="hh")
+
+    assert saved == 2
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+
+    stmt = db.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (id) DO UPDATE" in sql
+    assert "received_at = excluded.received_at" in sql
+
+
+def test_upsert_many_rolls_back_on_error():
+    db = MagicMock()
+    db.execute.side_effect = RuntimeError("db down")
+    repo = ResumeRepository(db)
+
+    try:
+        repo.upsert_many([{"id": "1"}], source="hh")
+    except RuntimeError:
+        pass
+
+    db.rollback.assert_called_once()
+    db.commit.assert_not_called()
+
+
+def test_to_row_avito():
+    row = ResumeRepository._to_row({
+        "id": 42,
+        "url": "https://avito.ru/resume/42",
+        "params": {"experience": 3, "experience_list": []},
+    }, source="avito")
+
+    assert row["id"] == "42"
+    assert row["total_experience_months"] == 36
+    assert row["link"] == "https://avito.ru/resume/42"
@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from data_manager.search_engine import SearchEngine
+
+
+@pytest.fixture
+def engine():
+    return SearchEngine(hh_client=MagicMock(), avito_client=MagicMock())
+
+
+def test_split_resume_id():
+    assert SearchEngine.split_resume_id("hh_abc") == ("abc", "hh")
+    assert SearchEngine.split_resume_id("avito_42") == ("42", "avito")
+    assert SearchEngine.split_resume_id("abc", default_source="avito") == ("abc", "avito")
+
+
+def test_fetch_resume_details_keeps_order(engine):
+    def slow_details(resume_id):
+        # Первые резюме отвечают дольше последних
+        time.sleep(0.01 * (5 - int(resume_id)))
+        return {"id": resume_id}
+
+    engine.hh_client.get_resume_details.side_effect = slow_details
+    refs = [(str(i), "hh") for i in range(5)]
+    progress = []
+
+    results = engine.fetch_resume_details(refs, on_progress=lambda done, total: progress.append((done, total)))
+
+    assert [r["id"] for r in results] == ["0", "1", "2", "3", "4"]
+    assert progress[-1] == (5, 5)
+    assert len(progress) == 5
+
+
+def test_fetch_resume_details_isolates_errors(engine):
+    def details(resume_id):
+        if resume_id == "bad":
+            raise RuntimeError("boom")
+        return {"id": resume_id}
+
+    engine.hh_client.get_resume_details.side_effect = details
+
+    results = engine.fetch_resume_details([("1", "hh"), ("bad", "hh"), ("2", "hh")])
+
+    assert results[0] == {"id": "1"}
+    assert results[1] is None
+    assert results[2] == {"id": "2"}
+
+
+def test_resolve_resumes_fetches_only_misses(engine):
+    cached = {"id": "1", "source": "hh"}
+    engine.hh_client.get_resume_details.side_effect = lambda resume_id: {"id": resume_id}
+
+    with patch.object(engine, "get_cached_resumes", return_value={"1": cached}) as cache_mock, \
+         patch.object(engine, "save_many_to_cache") as save_mock:
+        items = engine.resolve_resumes([("1", "hh"), ("2", "hh")])
+
+    assert [item["id"] for item in items] == ["1", "2"]
+    cache_mock.assert_called_once_with(["1", "2"], source="hh")
+    engine.hh_client.get_resume_details.assert_called_once_with("2")
+    save_mock.assert_called_once_with([{"id": "2"}], source="hh")
@@ -0,0 +1,97 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.hh.token_pool import TokenPool
+
+
+def make_pool(tokens=("token-a", "token-b"), quota=None):
+    # Redis недоступен — пул работает по локальному состоянию
+    redis_client = MagicMock()
+    redis_client.register_script.side_effect = ConnectionError("redis down")
+    redis_client.hgetall.side_effect = ConnectionError("redis down")
+    redis_client.hset.side_effect = ConnectionError("redis down")
+    return TokenPool(
+        redis_client=redis_client,
+        tokens_provider=lambda: list(tokens),
+        quota_lookup=(lambda token: quota.get(token)) if quota else None,
+    )
+
+
+def test_spreads_requests_across_tokens():
+    pool = make_pool(tokens=("token-a", "token-b", "token-c"))
+
+    leased = [pool.acquire() for _ in range(6)]
+
+    assert sorted(leased) == ["token-a", "token-a", "token-b", "token-b", "token-c", "token-c"]
+    assert [s["total"] for s in pool.stats()] == [2, 2, 2]
+
+
+def test_cooldown_removes_token_from_rotation():
+    pool = make_pool()
+
+    pool.cooldown("token-a", 60)
+
+    assert [pool.acquire() for _ in range(3)] == ["token-b"] * 3
+    pool.cooldown("token-b", 60)
+    assert pool.acquire() is None
+
+
+def test_needs_quota_skips_exhausted_tokens():
+    pool = make_pool(quota={"token-a": 0, "token-b": 5})
+
+    assert pool.acquire(needs_quota=True) == "token-b"
+    assert pool.acquire(needs_quota=True) == "token-b"
+    # Запросы без расхода лимита исчерпанный токен выполнять может
+    assert pool.acquire() == "token-a"
+
+
+def test_exclude_switches_even_without_cooldown():
+    pool = make_pool()
+
+    assert pool.acquire(exclude="token-a") == "token-b"
+    assert pool.acquire(exclude="token-b") == "token-a"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from config import conf
+    from api.hh.main import HHApiClient
+    monkeypatch.setattr(conf, "HH_ACCESS_TOKENS", ["token-a", "token-b"])
+    monkeypatch.setattr(conf, "ACCESS_TOKEN1", "token-a")
+    client = HHApiClient()
+    client.token_pool = make_pool()
+    return client
+
+
+def test_use_next_token_cools_down_current_token(client):
+    client.access_token = "token-a"
+
+    client.use_next_token()
+
+    assert client.access_token == "token-b"
+    assert client.token_pool.acquire() == "token-b"
+
+
+def test_threads_lease_separate_tokens(client):
+    barrier = threading.Barrier(2)
+    seen = []
+
+    def worker():
+        headers = client.get_headers()
+        barrier.wait()
+        seen.append((headers["Authorization"], client.access_token))
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(auth for auth, _ in seen) == ["Bearer token-a", "Bearer token-b"]
+    assert all(auth == f"Bearer {token}" for auth, token in seen)
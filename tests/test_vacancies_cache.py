@@ -0,0 +1,258 @@
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from data_manager.main import DataManager
+from data_manager.vacancy_cache import RefreshLock, VacancyCacheStore
+
+
+class FakeLock:
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+        self.renewals = 0
+
+    def acquire(self, blocking=True, blocking_timeout=None):
+        deadline = time.monotonic() + (blocking_timeout or 0)
+        while self.name in self.owner.locks:
+            if not blocking or time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        self.owner.locks.add(self.name)
+        return True
+
+    def reacquire(self):
+        self.renewals += 1
+
+    def release(self):
+        self.owner.locks.discard(self.name)
+
+
+class FakeRedisManager:
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.history = []
+        self.hash_writes = []
+        self.client = MagicMock()
+        self.locks = set()
+        self.client.lock.side_effect = lambda name, timeout=None, thread_local=True: FakeLock(self, name)
+        self.client.delete.side_effect = lambda key: self.values.pop(key, None)
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def set_value(self, key, value, ttl=None):
+        self.values[key] = value
+        self.history.append((key, value))
+
+    def get_hash(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def set_hash(self, key, values, ttl=None):
+        if values:
+            self.hashes.setdefault(key, {}).update(values)
+            self.hash_writes.append((key, sorted(values)))
+
+    def delete_hash_fields(self, key, fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+
+def negotiation(n_id, updated_at, has_updates=False):
+    return {"id": n_id, "updated_at": updated_at, "has_updates": has_updates}
+
+
+def make_manager(vacancy_ids, fail=()):
+    dm = DataManager.__new__(DataManager)
+    dm.redis_manager = FakeRedisManager()
+    dm.vacancies_cache = VacancyCacheStore(dm.redis_manager, DataManager.VACANCIES_CACHE_KEY, 60)
+    dm.vacancies_cache_avito = VacancyCacheStore(dm.redis_manager, DataManager.VACANCIES_AVITO_CACHE_KEY, 60)
+    dm.summaries = {v_id: {"id": v_id, "name": f"Вакансия {v_id}", "published_at": "2024-05-01T10:00:00+0300"}
+                    for v_id in vacancy_ids}
+    dm.get_company_vacancies = lambda: list(dm.summaries.values())
+    dm.fail = set(fail)
+    dm.details_calls = []
+
+    def get_vacancy_by_id(v_id):
+        dm.details_calls.append(v_id)
+        if v_id in dm.fail:
+            raise RuntimeError("HH недоступен")
+        return {"address": {"city": "Москва"}}
+
+    dm.get_vacancy_by_id = get_vacancy_by_id
+    dm.get_negotiations_by_vacancy = lambda v_id: [
+        negotiation(1, "2024-05-02T10:00:00+0300", has_updates=True),
+        negotiation(2, "2024-05-01T10:00:00+0300"),
+    ]
+    dm.search_engine = MagicMock()
+    dm.search_engine.get_negotiations_updated_since.return_value = {"found": 2, "items": []}
+    return dm
+
+
+@pytest.fixture(autouse=True)
+def workers(monkeypatch):
+    from config import conf
+    monkeypatch.setattr(conf, "VACANCY_REFRESH_WORKERS", 4)
+    monkeypatch.setattr(conf, "VACANCY_FULL_REFRESH_WAIT", 0)
+
+
+def test_refresh_builds_rows_in_vacancy_order():
+    dm = make_manager(["1", "2", "3"])
+
+    dm.update_vacancies_cache()
+
+    rows = dm.get_cached_vacancies()
+    assert [row["id"] for row in rows] == ["1", "2", "3"]
+    assert rows[0]["responses_total"] == 2 and rows[0]["responses_unread"] == 1
+    assert dm.vacancies_cache.get_cursors()["1"]["updated_at"] == "2024-05-02T10:00:00+0300"
+    assert DataManager.VACANCIES_REFRESH_KEY not in dm.redis_manager.values
+
+
+def test_failed_vacancy_keeps_previous_row():
+    dm = make_manager(["1", "2"])
+    dm.update_vacancies_cache()
+    dm.summaries["2"]["name"] = "Новое название"
+    dm.fail = {"2"}
+
+    dm.update_vacancies_cache()
+
+    rows = dm.get_cached_vacancies()
+    assert [row["id"] for row in rows] == ["1", "2"]
+    assert rows[1]["title"] == "Вакансия 2"
+
+
+def test_progress_is_published_incrementally():
+    dm = make_manager([str(i) for i in range(40)])
+
+    dm.update_vacancies_cache()
+
+    progress = [value for key, value in dm.redis_manager.history if key == DataManager.VACANCIES_REFRESH_KEY]
+    assert len(progress) > 2
+    assert progress[-1] == {"done": 40, "total": 40}
+
+
+def test_sync_is_skipped_while_refresh_runs():
+    dm = make_manager(["1"])
+    dm.redis_manager.locks.add(DataManager.VACANCIES_REFRESH_LOCK_KEY)
+
+    dm.sync_vacancies_cache()
+
+    assert dm.get_cached_vacancies() is None
+
+
+def test_full_refresh_waits_for_running_sync(monkeypatch):
+    from config import conf
+    monkeypatch.setattr(conf, "VACANCY_FULL_REFRESH_WAIT", 5)
+    dm = make_manager(["1"])
+    dm.redis_manager.locks.add(DataManager.VACANCIES_REFRESH_LOCK_KEY)
+    threading.Timer(0.1, dm.redis_manager.locks.discard, [DataManager.VACANCIES_REFRESH_LOCK_KEY]).start()
+
+    dm.update_vacancies_cache()
+
+    assert [row["id"] for row in dm.get_cached_vacancies()] == ["1"]
+    assert DataManager.VACANCIES_REFRESH_LOCK_KEY not in dm.redis_manager.locks
+
+
+def test_refresh_lock_is_renewed_while_held():
+    manager = FakeRedisManager()
+    lock = RefreshLock(manager.client, "lock", ttl=0.03)
+
+    assert lock.acquire()
+    time.sleep(0.1)
+    lock.release()
+
+    assert lock._lock.renewals >= 2
+    assert "lock" not in manager.locks
+
+
+def test_sync_fetches_only_new_negotiations_and_patches_changed_rows():
+    dm = make_manager(["1", "2"])
+    dm.update_vacancies_cache()
+    dm.details_calls.clear()
+    dm.redis_manager.hash_writes.clear()
+
+    def updated_since(v_id, since):
+        assert since == "2024-05-02T10:00:00+0300"
+        if v_id == "2":
+            return {"found": 3, "items": [negotiation(3, "2024-05-03T10:00:00+0300", has_updates=True)]}
+        return {"found": 2, "items": []}
+
+    dm.search_engine.get_negotiations_updated_since.side_effect = updated_since
+    dm.sync_vacancies_cache()
+
+    assert dm.details_calls == []
+    rows = {row["id"]: row for row in dm.get_cached_vacancies()}
+    assert rows["2"]["responses_total"] == 3 and rows["2"]["responses_unread"] == 2
+    assert rows["1"]["responses_unread"] == 1
+    assert (dm.vacancies_cache.rows_key, ["2"]) in dm.redis_manager.hash_writes
+    assert dm.vacancies_cache.get_cursors()["2"]["last_negotiation_id"] == 3
+
+
+def test_sync_refetches_details_of_changed_vacancy_and_drops_removed():
+    dm = make_manager(["1", "2"])
+    dm.update_vacancies_cache()
+    dm.details_calls.clear()
+    dm.summaries["1"]["published_at"] = "2024-06-01T10:00:00+0300"
+    del dm.summaries["2"]
+
+    dm.sync_vacancies_cache()
+
+    assert dm.details_calls == ["1"]
+    assert [row["id"] for row in dm.get_cached_vacancies()] == ["1"]
+    assert "2" not in dm.vacancies_cache.get_cursors()
+
+
+def test_read_negotiations_updates_unread_counters():
+    dm = make_manager(["1"])
+    dm.update_vacancies_cache()
+    dm.search_engine.read_negotiations.return_value = True
+
+    assert dm.read_negotiations([1])
+
+    assert dm.get_cached_vacancies()[0]["responses_unread"] == 0
+
+
+def test_avito_sync_requests_applications_since_last_sync():
+    dm = make_manager([])
+    dm.search_engine.avito_client.get_vacancies.return_value = {
+        "resources": [{"id": 10, "title": "Курьер"}, {"id": 20, "title": "Кладовщик"}],
+    }
+    dm.search_engine.get_applications_updated_since_avito.return_value = [
+        {"id": "a", "vacancy_id": 10, "is_viewed": False},
+        {"id": "b", "vacancy_id": 10, "is_viewed": True},
+    ]
+    dm.update_vacancies_cache_avito()
+
+    dm.search_engine.get_applications_updated_since_avito.return_value = [
+        {"id": "a", "vacancy_id": 10, "is_viewed": True},
+        {"id": "c", "vacancy_id": 20, "is_viewed": False},
+    ]
+    dm.sync_vacancies_cache_avito()
+
+    since = dm.vacancies_cache_avito.get_state()["updated_at_from"]
+    dm.search_engine.get_applications_updated_since_avito.assert_called_with(since)
+    rows = dm.get_company_vacancies_avito()
+    assert [(row["id"], row["responses_total"], row["responses_unread"]) for row in rows] == [(10, 2, 0), (20, 1, 1)]
+
+
+def test_avito_sync_keeps_cursor_when_applications_fail():
+    import requests
+
+    dm = make_manager([])
+    dm.search_engine.avito_client.get_vacancies.return_value = {"resources": [{"id": 10, "title": "Курьер"}]}
+    dm.search_engine.get_applications_updated_since_avito.return_value = [{"id": "a", "vacancy_id": 10}]
+    dm.update_vacancies_cache_avito()
+    state = dm.vacancies_cache_avito.get_state()
+
+    dm.search_engine.get_applications_updated_since_avito.side_effect = requests.HTTPError("429")
+    dm.sync_vacancies_cache_avito()
+
+    assert dm.vacancies_cache_avito.get_state() == state
+    assert dm.get_company_vacancies_avito()[0]["responses_total"] == 1
@@ -0,0 +1,118 @@
+"""
+Общий HTTP-транспорт для клиентов внешних API (HH, Avito, DeepSeek).
+
+Для каждого хоста создаётся одна requests.Session с пулом keep-alive соединений,
+таймаутами по умолчанию, политикой повторов для идемпотентных запросов и сжатием
+ответов. Функции get/post/request повторяют интерфейс одноимённых функций requests.
+"""
+
+import threading
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import conf
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, подставляющий таймаут по умолчанию, если он не передан явно."""
+
+    def __init__(self, *args, timeout: Tuple[float, float] = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def default_timeout() -> Tuple[float, float]:
+    """Возвращает пару (connect, read) таймаутов в секундах."""
+    return conf.HTTP_CONNECT_TIMEOUT, conf.REQUEST_TIMEOUT
+
+
+def build_retry() -> Retry:
+    """
+    Политика повторов транспорта: только сетевые ошибки и 502/503 для GET/HEAD.
+    429, 403 и 504 не повторяются — их обрабатывают сами клиенты (смена токена, ожидание);
+    повтор 504 и здесь, и в retry_on_limit_exceeded умножал бы число попыток.
+    Retry-After здесь не учитывается: иначе urllib3 сам повторял бы 429 в обход ограничителей.
+    """
+    return Retry(
+        total=conf.HTTP_RETRIES,
+        connect=conf.HTTP_RETRIES,
+        read=0,
+        status_forcelist=(502, 503),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        backoff_factor=0.5,
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+
+
+def create_session() -> requests.Session:
+    """Создаёт сессию с пулом соединений, таймаутами и повторами."""
+    session = requests.Session()
+    adapter = TimeoutHTTPAdapter(
+        timeout=default_timeout(),
+        pool_connections=1,
+        pool_maxsize=conf.HTTP_POOL_SIZE,
+        max_retries=build_retry(),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Возвращает общую сессию для хоста из url.
+
+    Args:
+        url (str): Адрес запроса.
+
+    Returns:
+        requests.Session: Сессия, переиспользующая соединения с этим хостом.
+    """
+    parts = urlsplit(url)
+    host_key = f"{parts.scheme}://{parts.netloc}"
+    session = _sessions.get(host_key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(host_key)
+            if session is None:
+                session = create_session()
+                _sessions[host_key] = session
+                logger.debug(f"Создана HTTP-сессия для {host_key}")
+    return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_session(url).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def close_sessions() -> None:
+    """Закрывает все сессии (например, при завершении процесса или в тестах)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,199 @@
+"""
+Ограничение частоты запросов к внешним API по алгоритму token bucket.
+
+TokenBucket — ограничитель в памяти процесса, RedisTokenBucket — общий для всех
+процессов (воркеров gunicorn) через атомарный Lua-скрипт в Redis. Оба ждут только
+тогда, когда бюджет запросов действительно исчерпан, и умеют «штрафоваться»
+по ответу 429 / заголовку Retry-After.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from config import conf
+from redis_manager import redis_manager
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбирает заголовок Retry-After (секунды или HTTP-дата).
+
+    Returns:
+        float | None: Задержка в секундах или None, если заголовок отсутствует или некорректен.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket в памяти процесса.
+
+    Attributes:
+        rate (float): Скорость пополнения — запросов в секунду.
+        capacity (float): Ёмкость — сколько запросов можно выполнить подряд без ожидания.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Забирает токены, если они есть, иначе возвращает время ожидания."""
+        with self._lock:
+            now = time.monotonic()
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Блокирует поток, пока не наберётся нужное количество токенов.
+
+        Returns:
+            float: Суммарное время ожидания в секундах.
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, seconds: float) -> None:
+        """Запрещает запросы на seconds секунд и обнуляет накопленный запас (после 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated_at = time.monotonic()
+
+
+class RedisTokenBucket:
+    """
+    Token bucket, общий для всех процессов, с состоянием в хэше Redis.
+    При недоступности Redis временно переключается на локальный TokenBucket.
+
+    Attributes:
+        redis: Клиент Redis.
+        key (str): Ключ хэша с состоянием ограничителя.
+        rate (float): Запросов в секунду.
+        capacity (float): Ёмкость ведра.
+    """
+
+    KEY_PREFIX = "rate_limit:"
+    FALLBACK_SECONDS = 30
+
+    # Возвращает время ожидания в секундах (0 — токен выдан). Строкой, т.к. Redis округляет числа Lua до целых
+    ACQUIRE_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local requested = tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    local blocked_until = tonumber(state[3]) or 0
+    if blocked_until > now then
+        return tostring(blocked_until - now)
+    end
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens >= requested then
+        tokens = tokens - requested
+    else
+        wait = (requested - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+    return tostring(wait)
+    """
+
+    def __init__(self, redis_client, name: str, rate: float, capacity: float):
+        self.redis = redis_client
+        self.key = f"{self.KEY_PREFIX}{name}"
+        self.rate = rate
+        self.capacity = capacity
+        self._local = TokenBucket(rate, capacity)
+        self._fallback_until = 0.0
+        self._script = None
+
+    def _use_local(self, error: Exception) -> None:
+        if time.monotonic() >= self._fallback_until:
+            logger.warning(f"Redis недоступен для ограничителя {self.key}, используем локальный: {error}")
+        self._fallback_until = time.monotonic() + self.FALLBACK_SECONDS
+
+    def _reserve(self, tokens: float) -> Optional[float]:
+        if time.monotonic() < self._fallback_until:
+            return None
+        try:
+            if self._script is None:
+                self._script = self.redis.register_script(self.ACQUIRE_SCRIPT)
+            return float(self._script(keys=[self.key], args=[self.rate, self.capacity, time.time(), tokens]))
+        except Exception as e:
+            self._use_local(e)
+            return None
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Блокирует поток, пока общий для всех процессов бюджет не позволит выполнить запрос.
+
+        Returns:
+            float: Суммарное время ожидания в секундах.
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(tokens)
+            if wait is None:
+                return waited + self._local.acquire(tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, seconds: float) -> None:
+        """Запрещает запросы всем процессам на seconds секунд (после 429)."""
+        self._local.penalize(seconds)
+        try:
+            blocked_until = time.time() + seconds
+            current = float(self.redis.hget(self.key, "blocked_until") or 0)
+            if blocked_until > current:
+                self.redis.hset(self.key, mapping={"blocked_until": blocked_until, "tokens": 0, "ts": time.time()})
+        except Exception as e:
+            self._use_local(e)
+
+
+def build_rate_limiter(name: str, rate: float, capacity: float):
+    """
+    Создаёт ограничитель согласно conf.RATE_LIMIT_BACKEND ("redis" или "local").
+
+    Args:
+        name (str): Имя ограничителя (часть ключа Redis).
+        rate (float): Запросов в секунду.
+        capacity (float): Сколько запросов можно выполнить подряд без ожидания.
+    """
+    if conf.RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucket(redis_manager.client, name, rate, capacity)
+    return TokenBucket(rate, capacity)